@@ -0,0 +1,140 @@
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+
+def _read_rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def process_tree_rss_mb(root_pid):
+    if not root_pid or not os.path.isdir("/proc"):
+        return 0.0
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                # El nombre del proceso va entre paréntesis y puede tener espacios.
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total_kb = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        total_kb += _read_rss_kb(pid)
+        pending.extend(children.get(pid, []))
+    return total_kb / 1024
+
+
+class DriverPool:
+    def __init__(self, factory, max_uses=50, base_url=None):
+        self.factory = factory
+        self.max_uses = max_uses
+        self.base_url = base_url
+        self._idle = []
+        self._uses = {}
+        self.stats = {
+            "started": 0,
+            "reused": 0,
+            "recycled": 0,
+            "discarded": 0,
+            "startup_seconds": 0.0,
+            "peak_memory_mb": 0.0
+        }
+
+    def acquire(self):
+        while self._idle:
+            driver = self._idle.pop()
+            if self.is_healthy(driver):
+                self.stats["reused"] += 1
+                return driver
+            self._discard(driver)
+            self.stats["discarded"] += 1
+
+        started = time.perf_counter()
+        driver = self.factory()
+        self.stats["startup_seconds"] += time.perf_counter() - started
+        self.stats["started"] += 1
+        self._uses[id(driver)] = 0
+        return driver
+
+    def release(self, driver):
+        self._uses[id(driver)] = self._uses.get(id(driver), 0) + 1
+        self._sample_memory(driver)
+
+        if self._uses[id(driver)] >= self.max_uses:
+            self.stats["recycled"] += 1
+            self._discard(driver)
+            return
+
+        try:
+            self.reset(driver)
+        except WebDriverException:
+            self.stats["discarded"] += 1
+            self._discard(driver)
+            return
+
+        self._idle.append(driver)
+
+    def reset(self, driver):
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.execute_cdp_cmd("Network.clearBrowserCache", {})
+            if self.base_url:
+                driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+                    "origin": self.base_url.rstrip("/"),
+                    "storageTypes": "all"
+                })
+        except (AttributeError, WebDriverException):
+            driver.delete_all_cookies()
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        driver.get("about:blank")
+
+    def is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def close(self):
+        while self._idle:
+            self._discard(self._idle.pop())
+
+    def report(self):
+        average_startup = self.stats["startup_seconds"] / self.stats["started"] if self.stats["started"] else 0.0
+        return dict(
+            self.stats,
+            average_startup_seconds=round(average_startup, 3),
+            startup_seconds_saved=round(average_startup * self.stats["reused"], 3),
+            startup_seconds=round(self.stats["startup_seconds"], 3),
+            peak_memory_mb=round(self.stats["peak_memory_mb"], 1)
+        )
+
+    def _sample_memory(self, driver):
+        try:
+            pid = driver.service.process.pid
+        except AttributeError:
+            return
+        self.stats["peak_memory_mb"] = max(self.stats["peak_memory_mb"], process_tree_rss_mb(pid))
+
+    def _discard(self, driver):
+        self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
@@ -1,20 +1,41 @@
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
+from driver_pool import DriverPool
+from wait_recorder import WaitRecorder
+import json
 import os
 
-def before_all(context):
-    context.base_url = os.environ.get('BASE_URL', 'http://localhost:8080')
-    context.headless = os.environ.get('HEADLESS', 'False').lower() == 'true'
-
-def before_scenario(context, scenario):
+def create_driver(context):
     chrome_options = Options()
     if context.headless:
         chrome_options.add_argument('--headless')
         chrome_options.add_argument('--no-sandbox')
         chrome_options.add_argument('--disable-dev-shm-usage')
-    
-    context.driver = webdriver.Chrome(options=chrome_options)
-    context.driver.maximize_window()
+
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.maximize_window()
+    return driver
+
+def report_path(name):
+    # Con el runner paralelo cada worker escribe su propio archivo.
+    worker_id = os.environ.get('WORKER_ID')
+    if worker_id is not None:
+        name = f"{name}-{worker_id}"
+    return f"reports/{name}.json"
+
+def before_all(context):
+    context.base_url = os.environ.get('BASE_URL', 'http://localhost:8080')
+    context.headless = os.environ.get('HEADLESS', 'False').lower() == 'true'
+    context.driver_pool = DriverPool(
+        lambda: create_driver(context),
+        max_uses=int(os.environ.get('DRIVER_MAX_USES', '50')),
+        base_url=context.base_url
+    )
+    context.wait_recorder = WaitRecorder()
+
+def before_scenario(context, scenario):
+    context.wait_recorder.start_scenario(scenario.name)
+    context.driver = context.driver_pool.acquire()
 
 def after_scenario(context, scenario):
     if hasattr(context, 'driver'):
@@ -24,8 +45,20 @@ def after_scenario(context, scenario):
             screenshot_path = f"{screenshot_dir}/{scenario.name}_{scenario.status}.png"
             context.driver.save_screenshot(screenshot_path)
             print(f"Captura guardada: {screenshot_path}")
-        
-        context.driver.quit()
+
+        context.driver_pool.release(context.driver)
 
 def after_all(context):
-    pass
\ No newline at end of file
+    context.driver_pool.close()
+
+    pool_report = context.driver_pool.report()
+    os.makedirs('reports', exist_ok=True)
+    with open(report_path('driver-pool'), 'w') as f:
+        json.dump(pool_report, f, indent=2)
+
+    print(f"Navegadores iniciados: {pool_report['started']}, reutilizados: {pool_report['reused']}")
+    print(f"Tiempo de arranque ahorrado: {pool_report['startup_seconds_saved']}s")
+    print(f"Memoria máxima de navegador: {pool_report['peak_memory_mb']}MB")
+
+    context.wait_recorder.save(report_path('wait-timings'))
+    print(f"Tiempo total en esperas: {context.wait_recorder.summary()['total_segundos']}s")
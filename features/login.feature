@@ -8,6 +8,7 @@ Característica: Sistema de Login
   Antecedentes:
     Dado que estoy en la página de login
 
+  @cuenta_compartida
   Escenario: Login exitoso con credenciales válidas
     Cuando ingreso el email "usuario@ejemplo.com"
     Y ingreso la contraseña "ContraseñaSegura123!"
@@ -15,6 +16,7 @@ Característica: Sistema de Login
     Entonces debería ser redirigido al dashboard
     Y debería ver el mensaje "Bienvenido"
 
+  @cuenta_compartida
   Escenario: Login fallido con contraseña incorrecta
     Cuando ingreso el email "usuario@ejemplo.com"
     Y ingreso la contraseña "ContraseñaIncorrecta"
@@ -47,6 +49,7 @@ Característica: Sistema de Login
       | 1234567    | La contraseña debe tener mínimo 8 caracteres |
       | test       | La contraseña debe tener mínimo 8 caracteres |
 
+  @cuenta_compartida
   Escenario: Bloqueo de cuenta después de intentos fallidos
     Cuando intento iniciar sesión 3 veces con credenciales incorrectas
     Entonces mi cuenta debería estar bloqueada temporalmente
@@ -1,15 +1,57 @@
 from behave import given, when, then
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
 import time
 
+# Cuenta las peticiones fetch/XHR en curso para saber cuándo la red está en
+# reposo; se inyecta una sola vez por documento. También marca la navegación
+# pendiente (formulario enviado sin JS o redirección): mientras el servidor no
+# responda, el documento anterior sigue en reposo sin peticiones rastreadas.
+TRACK_REQUESTS_SCRIPT = """
+if (!window.__pendingRequestsTracked) {
+    window.__pendingRequestsTracked = true;
+    window.__pendingRequests = 0;
+    window.__navigationPending = false;
+    window.addEventListener('beforeunload', function () { window.__navigationPending = true; });
+    document.addEventListener('submit', function (event) {
+        // Se revisa después de los manejadores de la página: un envío por
+        // fetch llama a preventDefault y no navega.
+        setTimeout(function () {
+            if (!event.defaultPrevented) { window.__navigationPending = true; }
+        }, 0);
+    }, true);
+    var done = function () { window.__pendingRequests--; };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            window.__pendingRequests++;
+            return originalFetch.apply(this, arguments).finally(done);
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        window.__pendingRequests++;
+        this.addEventListener('loadend', done);
+        return originalSend.apply(this, arguments);
+    };
+}
+"""
+
+NETWORK_STATE_SCRIPT = (
+    "return [document.readyState, window.__pendingRequests || 0, "
+    "window.performance ? performance.getEntriesByType('resource').length : 0, "
+    "window.__navigationPending || false];"
+)
+
 class LoginPage:
-    def __init__(self, driver):
+    def __init__(self, driver, recorder=None, timeout=10, poll_frequency=0.05, idle_seconds=0.5):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 10)
+        self.recorder = recorder
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.wait = WebDriverWait(driver, timeout, poll_frequency=poll_frequency)
         self.email_input = (By.ID, "email")
         self.password_input = (By.ID, "password")
         self.login_button = (By.ID, "loginButton")
@@ -31,32 +73,93 @@ class LoginPage:
     
     def click_login(self):
         login_btn = self.wait.until(EC.element_to_be_clickable(self.login_button))
+        previous_url = self.driver.current_url
+        stale = {element.id for element in self._visible(self.error_message) + self._visible(self.welcome_message)}
+        self.driver.execute_script(TRACK_REQUESTS_SCRIPT)
         login_btn.click()
+        return self.wait_for_outcome(previous_url, stale)
+    
+    def wait_for_outcome(self, previous_url, stale_elements=()):
+        # Se resuelve con lo primero que ocurra: cambio de URL, un mensaje
+        # nuevo de error o bienvenida, o la red en reposo sin una navegación
+        # pendiente (si la hay, se espera hasta el timeout).
+        network = self._network_tracker()
+        
+        def outcome(driver):
+            if driver.current_url != previous_url:
+                return "url"
+            for name, locator in (("error", self.error_message), ("welcome", self.welcome_message)):
+                if any(element.id not in stale_elements for element in self._visible(locator)):
+                    return name
+            return "network_idle" if network() else False
+        
+        return self._timed("click_login", outcome)
     
     def get_error_message(self):
-        try:
-            error_element = self.wait.until(EC.presence_of_element_located(self.error_message))
-            return error_element.text
-        except TimeoutException:
-            return None
+        return self._get_text(self.error_message, "get_error_message")
     
     def get_welcome_message(self):
-        try:
-            welcome_element = self.wait.until(EC.presence_of_element_located(self.welcome_message))
-            return welcome_element.text
-        except TimeoutException:
-            return None
+        return self._get_text(self.welcome_message, "get_welcome_message")
     
     def is_on_dashboard(self):
         return "dashboard" in self.driver.current_url.lower()
     
     def is_on_login_page(self):
         return "login" in self.driver.current_url.lower()
+    
+    def _get_text(self, locator, label):
+        # Si el elemento no está, basta con que la página quede en reposo
+        # para saber que no va a aparecer; no hace falta agotar el timeout.
+        network = self._network_tracker()
+        
+        def element_or_idle(driver):
+            elements = self._visible(locator)
+            if elements:
+                return elements[0]
+            return "network_idle" if network() else False
+        
+        result = self._timed(label, element_or_idle)
+        if result in (None, "network_idle"):
+            return None
+        try:
+            return result.text
+        except StaleElementReferenceException:
+            elements = self._visible(locator)
+            return elements[0].text if elements else None
+    
+    def _timed(self, label, condition):
+        started = time.perf_counter()
+        try:
+            result = self.wait.until(condition)
+            outcome = result if isinstance(result, str) else "element"
+        except TimeoutException:
+            result, outcome = None, "timeout"
+        if self.recorder is not None:
+            self.recorder.record(label, time.perf_counter() - started, self.timeout, outcome)
+        return result
+    
+    def _visible(self, locator):
+        try:
+            return [element for element in self.driver.find_elements(*locator) if element.is_displayed()]
+        except StaleElementReferenceException:
+            return []
+    
+    def _network_tracker(self):
+        state = {"resources": None, "since": time.perf_counter()}
+        
+        def is_idle():
+            ready_state, pending, resources, navigating = self.driver.execute_script(NETWORK_STATE_SCRIPT)
+            now = time.perf_counter()
+            if pending or navigating or ready_state != "complete" or resources != state["resources"]:
+                state["resources"], state["since"] = resources, now
+                return False
+            return now - state["since"] >= self.idle_seconds
+        
+        return is_idle
 
 @given('que estoy en la página de login')
 def step_impl(context):
-    context.driver = webdriver.Chrome()
-    context.login_page = LoginPage(context.driver)
+    context.login_page = LoginPage(context.driver, recorder=getattr(context, 'wait_recorder', None))
     context.login_page.navigate_to_login()
 
 @when('ingreso el email "{email}"')
@@ -70,7 +173,6 @@ def step_impl(context, password):
 @when('hago clic en el botón iniciar sesión')
 def step_impl(context):
     context.login_page.click_login()
-    time.sleep(2)
 
 @then('debería ser redirigido al dashboard')
 def step_impl(context):
@@ -96,15 +198,9 @@ def step_impl(context, attempts):
         context.login_page.enter_email("usuario@ejemplo.com")
         context.login_page.enter_password("ContraseñaIncorrecta")
         context.login_page.click_login()
-        time.sleep(1)
 
 @then('mi cuenta debería estar bloqueada temporalmente')
 def step_impl(context):
     context.login_page.enter_email("usuario@ejemplo.com")
     context.login_page.enter_password("ContraseñaCorrecta123!")
-    context.login_page.click_login()
-    time.sleep(1)
-
-def after_scenario(context, scenario):
-    if hasattr(context, 'driver'):
-        context.driver.quit()
\ No newline at end of file
+    context.login_page.click_login()
\ No newline at end of file
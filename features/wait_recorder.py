@@ -0,0 +1,47 @@
+import json
+import os
+
+
+class WaitRecorder:
+    def __init__(self):
+        self.current_scenario = None
+        self.waits = []
+
+    def start_scenario(self, name):
+        self.current_scenario = name
+
+    def record(self, label, elapsed, budget, outcome):
+        self.waits.append({
+            "escenario": self.current_scenario,
+            "espera": label,
+            "segundos": round(elapsed, 3),
+            "presupuesto": budget,
+            "resultado": outcome
+        })
+
+    def summary(self):
+        by_label = {}
+        by_scenario = {}
+        for wait in self.waits:
+            label = by_label.setdefault(wait["espera"], {"esperas": 0, "total": 0.0, "maximo": 0.0, "timeouts": 0})
+            label["esperas"] += 1
+            label["total"] += wait["segundos"]
+            label["maximo"] = max(label["maximo"], wait["segundos"])
+            if wait["resultado"] == "timeout":
+                label["timeouts"] += 1
+            by_scenario[wait["escenario"]] = by_scenario.get(wait["escenario"], 0.0) + wait["segundos"]
+
+        for label in by_label.values():
+            label["promedio"] = round(label["total"] / label["esperas"], 3)
+            label["total"] = round(label["total"], 3)
+
+        return {
+            "total_segundos": round(sum(wait["segundos"] for wait in self.waits), 3),
+            "por_espera": by_label,
+            "por_escenario": {name: round(total, 3) for name, total in by_scenario.items()}
+        }
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"resumen": self.summary(), "esperas": self.waits}, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,205 @@
+import asyncio
+import os
+import smtplib
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import requests
+
+LEVEL_ORDER = {"critical": 0, "warning": 1, "info": 2}
+
+
+def resolve_setting(value, env_var=None):
+    if env_var and os.environ.get(env_var):
+        return os.environ[env_var]
+    if isinstance(value, str):
+        value = os.path.expandvars(value)
+        if "${" in value:
+            return None
+    return value
+
+
+def _metric(alert, section, key):
+    return alert["datos"].get(section, {}).get(key, "N/A")
+
+
+class SlackChannel:
+    name = "slack"
+
+    def __init__(self, config):
+        self.webhook_url = resolve_setting(config.get("webhook_url"), "SLACK_WEBHOOK_URL")
+        self.timeout = config.get("timeout_segundos", 10)
+        self.session = requests.Session()
+
+    def is_configured(self):
+        return bool(self.webhook_url)
+
+    def build_payload(self, alerts):
+        attachments = []
+        for alert in alerts:
+            if alert.get("estado") == "resuelta":
+                color, title = "#27ae60", f"✅ Resuelta: {alert['nombre']}"
+            elif alert["nivel"] == "info":
+                color, title = "#3498db", alert["nombre"]
+            else:
+                color = "#e74c3c" if alert["nivel"] == "critical" else "#f39c12"
+                title = f"🚨 Alerta {alert['nivel'].upper()}: {alert['nombre']}"
+            attachments.append({
+                "color": color,
+                "title": title,
+                "text": alert["mensaje"],
+                "fields": [
+                    {"title": "Timestamp", "value": alert["timestamp"], "short": True},
+                    {"title": "TPS", "value": f"{_metric(alert, 'summary', 'throughput_rps')}", "short": True},
+                    {"title": "Error Rate", "value": f"{_metric(alert, 'summary', 'error_rate')}%", "short": True},
+                    {"title": "Latencia P95", "value": f"{_metric(alert, 'response_times', 'p95')}ms", "short": True}
+                ]
+            })
+
+        return {
+            "text": f"{len(alerts)} alerta(s) del pipeline de pruebas",
+            "attachments": attachments
+        }
+
+    def send(self, payload):
+        response = self.session.post(self.webhook_url, json=payload, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        self.session.close()
+
+
+class EmailChannel:
+    name = "email"
+
+    def __init__(self, config):
+        self.server = config.get("smtp_server")
+        self.port = config.get("puerto", 587)
+        self.use_tls = config.get("usar_tls", True)
+        self.timeout = config.get("timeout_segundos", 10)
+        self.user = resolve_setting(config.get("usuario"), "EMAIL_USER")
+        self.password = resolve_setting(config.get("password"), "EMAIL_PASSWORD")
+        self.recipients = config.get("destinatarios", [])
+        self._connection = None
+
+    def is_configured(self):
+        return bool(self.server and self.recipients)
+
+    def build_payload(self, alerts):
+        alerts = sorted(alerts, key=lambda alert: LEVEL_ORDER.get(alert["nivel"], 2))
+        top_level = alerts[0]["nivel"].upper()
+
+        msg = MIMEMultipart()
+        msg['From'] = self.user or "alertas@localhost"
+        msg['To'] = ", ".join(self.recipients)
+        if len(alerts) == 1:
+            msg['Subject'] = f"[ALERTA {top_level}] {alerts[0]['nombre']}"
+        else:
+            msg['Subject'] = f"[ALERTA {top_level}] {len(alerts)} alertas del pipeline de pruebas"
+
+        sections = []
+        for alert in alerts:
+            sections.append(
+                f"Alerta: {alert['nombre']}\n"
+                f"Nivel: {alert['nivel'].upper()}\n"
+                f"Mensaje: {alert['mensaje']}\n"
+                f"Timestamp: {alert['timestamp']}\n"
+                f"- TPS: {_metric(alert, 'summary', 'throughput_rps')}\n"
+                f"- Tasa de Error: {_metric(alert, 'summary', 'error_rate')}%\n"
+                f"- Latencia P95: {_metric(alert, 'response_times', 'p95')}ms\n"
+            )
+
+        body = (
+            "Alertas de Pipeline de Pruebas\n\n"
+            + "\n".join(sections)
+            + "\nPor favor revisar el dashboard de métricas para más detalles.\n"
+        )
+        msg.attach(MIMEText(body, 'plain'))
+        return msg
+
+    def _connect(self):
+        connection = smtplib.SMTP(self.server, self.port, timeout=self.timeout)
+        if self.use_tls:
+            connection.starttls()
+        if self.user and self.password:
+            connection.login(self.user, self.password)
+        return connection
+
+    def send(self, payload):
+        if self._connection is None:
+            self._connection = self._connect()
+        try:
+            self._connection.send_message(payload, to_addrs=self.recipients)
+        except (smtplib.SMTPException, OSError):
+            # La conexión se descarta para que el reintento abra una nueva.
+            self._drop_connection()
+            raise
+
+    def _drop_connection(self):
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            try:
+                connection.close()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    def close(self):
+        if self._connection is not None:
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection = None
+
+
+class AlertDispatcher:
+    def __init__(self, config):
+        channels_config = config.get("canales", {})
+        delivery = config.get("envio", {})
+        self.retries = delivery.get("reintentos", 3)
+        self.initial_delay = delivery.get("espera_inicial_segundos", 1.0)
+        self.channels = {}
+        if "slack" in channels_config:
+            self.channels["slack"] = SlackChannel(channels_config["slack"])
+        if "email" in channels_config:
+            self.channels["email"] = EmailChannel(channels_config["email"])
+
+    async def dispatch(self, alerts):
+        batches = {}
+        for alert in alerts:
+            for channel_name in alert["canales"]:
+                batches.setdefault(channel_name, []).append(alert)
+
+        tasks = {}
+        for channel_name, batch in batches.items():
+            channel = self.channels.get(channel_name)
+            if channel is None:
+                print(f"Canal de alertas desconocido: {channel_name}")
+                continue
+            if not channel.is_configured():
+                print(f"Canal {channel_name} no configurado")
+                continue
+            tasks[channel_name] = self._send_with_retries(channel, batch)
+
+        results = await asyncio.gather(*tasks.values())
+        return dict(zip(tasks.keys(), results))
+
+    async def _send_with_retries(self, channel, alerts):
+        payload = channel.build_payload(alerts)
+        for attempt in range(self.retries + 1):
+            try:
+                await asyncio.to_thread(channel.send, payload)
+                print(f"[{datetime.now().isoformat()}] {channel.name}: {len(alerts)} alerta(s) enviadas")
+                return True
+            except Exception as e:
+                if attempt == self.retries:
+                    print(f"Error enviando alertas por {channel.name} tras {attempt + 1} intentos: {e}")
+                    return False
+                delay = self.initial_delay * 2 ** attempt
+                print(f"Error enviando alertas por {channel.name} ({e}), reintento en {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def close(self):
+        for channel in self.channels.values():
+            channel.close()
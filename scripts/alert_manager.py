@@ -1,148 +1,68 @@
+import argparse
+import asyncio
 import json
 import yaml
-import requests
-import smtplib
 import os
+import time
 from datetime import datetime
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+
+from alert_dispatcher import AlertDispatcher
+from alert_state import AlertStateStore
+from metrics_store import DEFAULT_PATH, MetricsStore
+from monitor_daemon import MonitorDaemon
+from rule_engine import RuleEngine
 
 class AlertManager:
     def __init__(self, config_file="config/alertas.yml"):
         with open(config_file, 'r', encoding='utf-8') as f:
             self.config = yaml.safe_load(f)
+        
+        self.rule_engine = RuleEngine(self.config["alertas"]["reglas"])
+        self.dispatcher = AlertDispatcher(self.config["alertas"])
+        self.state_store = AlertStateStore(self.config["alertas"].get("estado"))
+        
+        history_config = self.config["alertas"].get("historial", {})
+        self.trend_days = history_config.get("dias_tendencia", 7)
+        self.metrics_store = MetricsStore(history_config.get("archivo", DEFAULT_PATH))
     
     def evaluate_rules(self, metrics_data):
         active_alerts = []
         
-        for rule in self.config["alertas"]["reglas"]:
-            if self._evaluate_condition(rule["condicion"], metrics_data):
-                alert = {
-                    "nombre": rule["nombre"],
-                    "nivel": rule["nivel"],
-                    "mensaje": rule["mensaje"],
-                    "timestamp": datetime.now().isoformat(),
-                    "canales": rule["canales"],
-                    "datos": metrics_data
+        for rule, endpoint in self.rule_engine.evaluate(metrics_data):
+            alert = {
+                "nombre": rule.nombre,
+                "nivel": rule.nivel,
+                "mensaje": rule.mensaje,
+                "timestamp": datetime.now().isoformat(),
+                "canales": rule.canales,
+                "datos": metrics_data
+            }
+            if endpoint is not None:
+                group = metrics_data["endpoint_groups"][endpoint]
+                alert["endpoint"] = endpoint
+                alert["mensaje"] = f"{rule.mensaje} [{endpoint}]"
+                # Los canales muestran TPS, errores y P95 del grupo afectado.
+                alert["datos"] = {
+                    "summary": {"throughput_rps": group.get("throughput_rps"), "error_rate": group.get("error_rate")},
+                    "response_times": {"p95": group.get("p95")},
+                    "endpoint_group": group
                 }
-                active_alerts.append(alert)
+            active_alerts.append(alert)
         
         return active_alerts
     
-    def _evaluate_condition(self, condition, data):
-        try:
-            response_time_p95 = data.get("response_times", {}).get("p95", 0)
-            error_rate = data.get("summary", {}).get("error_rate", 0)
-            throughput = data.get("summary", {}).get("throughput_rps", 0)
-            bdd_success_rate = data.get("bdd_metrics", {}).get("success_rate", 100)
-            
-            return eval(condition)
-        except Exception as e:
-            print(f"Error evaluando condición '{condition}': {e}")
-            return False
-    
-    def send_slack_alert(self, alert):
-        webhook_url = os.environ.get('SLACK_WEBHOOK_URL')
-        if not webhook_url:
-            print("SLACK_WEBHOOK_URL no configurado")
-            return False
-        
-        color = "#e74c3c" if alert["nivel"] == "critical" else "#f39c12"
-        
-        payload = {
-            "attachments": [{
-                "color": color,
-                "title": f"🚨 Alerta {alert['nivel'].upper()}: {alert['nombre']}",
-                "text": alert["mensaje"],
-                "fields": [
-                    {
-                        "title": "Timestamp",
-                        "value": alert["timestamp"],
-                        "short": True
-                    },
-                    {
-                        "title": "TPS",
-                        "value": f"{alert['datos'].get('summary', {}).get('throughput_rps', 'N/A')}",
-                        "short": True
-                    },
-                    {
-                        "title": "Error Rate",
-                        "value": f"{alert['datos'].get('summary', {}).get('error_rate', 'N/A')}%",
-                        "short": True
-                    },
-                    {
-                        "title": "Latencia P95",
-                        "value": f"{alert['datos'].get('response_times', {}).get('p95', 'N/A')}ms",
-                        "short": True
-                    }
-                ]
-            }]
-        }
-        
-        try:
-            response = requests.post(webhook_url, json=payload)
-            return response.status_code == 200
-        except Exception as e:
-            print(f"Error enviando alerta a Slack: {e}")
-            return False
-    
-    def send_email_alert(self, alert):
-        try:
-            smtp_config = self.config["alertas"]["canales"]["email"]
-            
-            msg = MIMEMultipart()
-            msg['From'] = smtp_config["usuario"]
-            msg['Subject'] = f"[ALERTA {alert['nivel'].upper()}] {alert['nombre']}"
-            
-            body = f"""
-            Alerta de Pipeline de Pruebas
-            
-            Nivel: {alert['nivel'].upper()}
-            Mensaje: {alert['mensaje']}
-            Timestamp: {alert['timestamp']}
-            
-            Métricas actuales:
-            - TPS: {alert['datos'].get('summary', {}).get('throughput_rps', 'N/A')}
-            - Tasa de Error: {alert['datos'].get('summary', {}).get('error_rate', 'N/A')}%
-            - Latencia P95: {alert['datos'].get('response_times', {}).get('p95', 'N/A')}ms
-            
-            Por favor revisar el dashboard de métricas para más detalles.
-            """
-            
-            msg.attach(MIMEText(body, 'plain'))
-            
-            server = smtplib.SMTP(smtp_config["smtp_server"], smtp_config["puerto"])
-            server.starttls()
-            server.login(
-                os.environ.get('EMAIL_USER', smtp_config["usuario"]),
-                os.environ.get('EMAIL_PASSWORD')
-            )
-            
-            for destinatario in smtp_config["destinatarios"]:
-                msg['To'] = destinatario
-                server.send_message(msg)
-                del msg['To']
-            
-            server.quit()
-            return True
-            
-        except Exception as e:
-            print(f"Error enviando email: {e}")
-            return False
-    
     def process_alerts(self, alerts):
         for alert in alerts:
-            print(f"Procesando alerta: {alert['nombre']} [{alert['nivel']}]")
-            
-            for canal in alert["canales"]:
-                if canal == "slack":
-                    self.send_slack_alert(alert)
-                elif canal == "email":
-                    self.send_email_alert(alert)
-    
-    def monitor_metrics(self):
-        metrics_file = "reports/performance_metrics.json"
+            print(f"Procesando alerta: {alert['nombre']} [{alert['nivel']}] {alert.get('estado', '')}".rstrip())
         
+        return asyncio.run(self.dispatcher.dispatch(alerts))
+    
+    def close(self):
+        self.dispatcher.close()
+        self.state_store.close()
+        self.metrics_store.close()
+    
+    def monitor_metrics(self, metrics_file="reports/performance_metrics.json"):
         if not os.path.exists(metrics_file):
             print("No hay métricas para monitorear")
             return
@@ -150,24 +70,175 @@ class AlertManager:
         with open(metrics_file, 'r') as f:
             metrics_data = json.load(f)
         
+        self.handle_metrics(metrics_data)
+    
+    def handle_metrics(self, metrics_data):
         alerts = self.evaluate_rules(metrics_data)
+        notifications = self.state_store.process(alerts)
         
         if alerts:
-            print(f"Se generaron {len(alerts)} alertas")
-            self.process_alerts(alerts)
-            
-            alert_log = {
-                "timestamp": datetime.now().isoformat(),
-                "alerts_count": len(alerts),
-                "alerts": alerts
-            }
-            
-            os.makedirs("logs", exist_ok=True)
-            with open("logs/alerts.json", "w") as f:
-                json.dump(alert_log, f, indent=2)
+            print(f"Se generaron {len(alerts)} alertas ({len(self.state_store.active_alerts())} activas)")
         else:
             print("No se generaron alertas")
+        
+        if notifications:
+            print(f"Cambios de estado a notificar: {len(notifications)}")
+            self.metrics_store.record_alerts(notifications)
+            self.process_alerts(notifications)
+        
+        alert_log = {
+            "timestamp": datetime.now().isoformat(),
+            "alerts_count": len(alerts),
+            "alerts": alerts,
+            "notifications": notifications
+        }
+        
+        os.makedirs("logs", exist_ok=True)
+        with open("logs/alerts.json", "w") as f:
+            json.dump(alert_log, f, indent=2)
+    
+    def watch_live(self, live_file, interval=10, idle_timeout=60):
+        # Evalúa las reglas sobre el JSON en vivo que publica el locustfile
+        # (LIVE_METRICS_FILE) mientras la prueba lo siga actualizando.
+        last_mtime = None
+        last_change = time.time()
+        print(f"Vigilando métricas en vivo: {live_file}")
+        while time.time() - last_change < idle_timeout:
+            if os.path.exists(live_file):
+                mtime = os.path.getmtime(live_file)
+                if mtime != last_mtime:
+                    last_mtime, last_change = mtime, time.time()
+                    try:
+                        with open(live_file, 'r') as f:
+                            metrics_data = json.load(f)
+                    except ValueError:
+                        metrics_data = None
+                    if metrics_data is not None:
+                        self.handle_metrics(metrics_data)
+            time.sleep(interval)
+        print("Las métricas en vivo dejaron de actualizarse")
+    
+    def build_daily_report(self, metrics_file="reports/performance_metrics.json"):
+        report_config = self.config["alertas"].get("programacion", {}).get("reportes_diarios", {})
+        since = time.time() - 24 * 3600
+        events = self.state_store.events_since(since)
+        
+        counts = {}
+        for event in events:
+            counts[event["event"]] = counts.get(event["event"], 0) + 1
+        
+        lines = [
+            f"Alertas activas: {len(self.state_store.active_alerts())}",
+            f"Últimas 24h: {counts.get('fired', 0)} disparadas, {counts.get('escalated', 0)} escaladas, "
+            f"{counts.get('resolved', 0)} resueltas, {counts.get('suppressed', 0)} suprimidas"
+        ]
+        
+        metrics_data = {}
+        if report_config.get("incluir_metricas", True) and os.path.exists(metrics_file):
+            with open(metrics_file, 'r') as f:
+                metrics_data = json.load(f)
+            lines.append(
+                f"Última ejecución: {metrics_data.get('overall_status', 'N/A')} - "
+                f"TPS {metrics_data.get('summary', {}).get('throughput_rps', 'N/A')}, "
+                f"P95 {metrics_data.get('response_times', {}).get('p95', 'N/A')}ms, "
+                f"errores {metrics_data.get('summary', {}).get('error_rate', 'N/A')}%"
+            )
+        
+        if report_config.get("incluir_tendencias", False):
+            lines.extend(self.trend_lines())
+        
+        return {
+            "nombre": "Reporte diario",
+            "nivel": "info",
+            "estado": "reporte",
+            "mensaje": "\n".join(lines),
+            "timestamp": datetime.now().isoformat(),
+            "canales": report_config.get("canales", ["slack", "email"]),
+            "datos": metrics_data
+        }
+    
+    def trend_lines(self):
+        lines = []
+        labels = {"p95": ("Latencia P95", "ms"), "tps": ("TPS", ""), "error_rate": ("Tasa de error", "%")}
+        for metric, (label, unit) in labels.items():
+            trend = self.metrics_store.summarize_trend(metric, days=self.trend_days)
+            if trend is None:
+                continue
+            lines.append(
+                f"{label} ({self.trend_days} días, {trend['runs']} ejecuciones): "
+                f"{trend['first']:.2f}{unit} → {trend['last']:.2f}{unit} ({trend['change_pct']:+.1f}%)"
+            )
+        
+        for endpoint in self.metrics_store.endpoints():
+            trend = self.metrics_store.summarize_trend("p95", endpoint, days=self.trend_days)
+            if trend is not None and trend["runs"] > 1:
+                lines.append(f"  P95 {endpoint}: {trend['first']:.2f}ms → {trend['last']:.2f}ms ({trend['change_pct']:+.1f}%)")
+        
+        frequent = list(self.metrics_store.alert_counts(days=self.trend_days).items())[:3]
+        if frequent:
+            lines.append("Alertas más frecuentes: " + ", ".join(f"{rule} ({count})" for rule, count in frequent))
+        
+        if not lines:
+            lines.append("Sin historial para calcular tendencias")
+        return lines
+    
+    def send_daily_report(self):
+        report = self.build_daily_report()
+        print(f"Enviando reporte diario:\n{report['mensaje']}")
+        return asyncio.run(self.dispatcher.dispatch([report]))
+
+def load_rule_engine(config_file):
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return RuleEngine(yaml.safe_load(f)["alertas"]["reglas"])
+
+def backtest(rule_engine, snapshots):
+    # Solo evalúa las reglas: no abre el estado de alertas ni el historial.
+    started = time.perf_counter()
+    series = rule_engine.evaluate_series(snapshots)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    results = {}
+    for rule_name, fired in series.items():
+        results[rule_name] = {
+            "disparos": sum(fired),
+            "indices": [index for index, value in enumerate(fired) if value]
+        }
+    return results, elapsed_ms
+
+def load_snapshots(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(".jsonl"):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
 
 if __name__ == "__main__":
-    manager = AlertManager()
-    manager.monitor_metrics()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Gestor de alertas del pipeline de pruebas")
+    parser.add_argument("--config", default="config/alertas.yml")
+    parser.add_argument("--backtest", metavar="ARCHIVO",
+                        help="Evalúa las reglas sobre una serie de métricas (JSON o JSON Lines) sin enviar alertas")
+    parser.add_argument("--monitor", action="store_true",
+                        help="Modo continuo según la sección 'programacion' de la configuración")
+    parser.add_argument("--live", metavar="ARCHIVO",
+                        help="Evalúa las reglas durante la prueba sobre el JSON de LIVE_METRICS_FILE")
+    args = parser.parse_args()
+    
+    if args.monitor:
+        MonitorDaemon(AlertManager, args.config).run()
+        raise SystemExit(0)
+    
+    if args.backtest:
+        snapshots = load_snapshots(args.backtest)
+        results, elapsed_ms = backtest(load_rule_engine(args.config), snapshots)
+        print(f"Backtest de {len(snapshots)} snapshots en {elapsed_ms:.1f}ms")
+        for rule_name, result in results.items():
+            print(f"  {rule_name}: {result['disparos']} disparos")
+        raise SystemExit(0)
+    
+    manager = AlertManager(args.config)
+    try:
+        if args.live:
+            manager.watch_live(args.live)
+        else:
+            manager.monitor_metrics()
+    finally:
+        manager.close()
\ No newline at end of file
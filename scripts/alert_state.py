@@ -0,0 +1,220 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_state (
+    rule TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    status TEXT NOT NULL,
+    level TEXT NOT NULL,
+    first_fired REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    last_notified REAL,
+    resolved_at REAL,
+    notified_status TEXT,
+    fire_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (rule, fingerprint)
+);
+CREATE INDEX IF NOT EXISTS idx_alert_state_status ON alert_state (status);
+CREATE TABLE IF NOT EXISTS channel_budget (
+    channel TEXT PRIMARY KEY,
+    window_start REAL NOT NULL,
+    sent INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS alert_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    rule TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    event TEXT NOT NULL,
+    level TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_alert_events_timestamp ON alert_events (timestamp);
+"""
+
+
+def alert_fingerprint(alert):
+    key = f"{alert['nombre']}|{alert.get('endpoint', '')}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+class AlertStateStore:
+    def __init__(self, config=None):
+        config = config or {}
+        self.path = config.get("archivo", "logs/alert_state.db")
+        self.cooldown = config.get("cooldown_minutos", 30) * 60
+        self.escalation = config.get("escalar_warning_minutos", 60) * 60
+        self.escalation_channels = config.get("canales_escalamiento", ["slack", "email"])
+        self.rate_window = config.get("ventana_limite_minutos", 60) * 60
+        self.channel_limits = config.get("limite_por_canal", {})
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def process(self, alerts, now=None):
+        now = now if now is not None else time.time()
+        notifications = []
+        seen = set()
+
+        with self.connection:
+            for alert in alerts:
+                fingerprint = alert_fingerprint(alert)
+                seen.add((alert["nombre"], fingerprint))
+                notification = self._fire(alert, fingerprint, now)
+                if notification is not None:
+                    notifications.append(notification)
+
+            for row in self.connection.execute("SELECT * FROM alert_state WHERE status = 'firing'").fetchall():
+                if (row["rule"], row["fingerprint"]) not in seen:
+                    notification = self._resolve(row, now)
+                    if notification is not None:
+                        notifications.append(notification)
+
+            limited = (self._apply_rate_limits(notification, now) for notification in notifications)
+            notifications = [notification for notification in limited if notification is not None]
+
+        return notifications
+
+    def _fire(self, alert, fingerprint, now):
+        key = (alert["nombre"], fingerprint)
+        row = self.connection.execute(
+            "SELECT * FROM alert_state WHERE rule = ? AND fingerprint = ?", key
+        ).fetchone()
+
+        if row is None:
+            self.connection.execute(
+                "INSERT INTO alert_state (rule, fingerprint, status, level, first_fired, last_seen, "
+                "last_notified, notified_status, fire_count) VALUES (?, ?, 'firing', ?, ?, ?, ?, 'firing', 1)",
+                (*key, alert["nivel"], now, now, now)
+            )
+            self._log_event(now, *key, "fired", alert["nivel"])
+            return dict(alert, estado="disparada")
+
+        if row["status"] == "resolved":
+            if row["resolved_at"] and now - row["resolved_at"] < self.cooldown:
+                # Dentro del cooldown se considera la misma incidencia
+                # (flapping): se reabre sin notificar. notified_status queda en
+                # 'resolved' hasta que se avise que sigue activa.
+                self.connection.execute(
+                    "UPDATE alert_state SET status = 'firing', level = ?, first_fired = ?, last_seen = ?, "
+                    "resolved_at = NULL, fire_count = fire_count + 1 WHERE rule = ? AND fingerprint = ?",
+                    (alert["nivel"], now, now, *key)
+                )
+                self._log_event(now, *key, "suppressed", alert["nivel"])
+                return None
+
+            self.connection.execute(
+                "UPDATE alert_state SET status = 'firing', level = ?, first_fired = ?, last_seen = ?, "
+                "last_notified = ?, notified_status = 'firing', resolved_at = NULL, fire_count = fire_count + 1 "
+                "WHERE rule = ? AND fingerprint = ?",
+                (alert["nivel"], now, now, now, *key)
+            )
+            self._log_event(now, *key, "fired", alert["nivel"])
+            return dict(alert, estado="disparada")
+
+        self.connection.execute(
+            "UPDATE alert_state SET last_seen = ?, fire_count = fire_count + 1 WHERE rule = ? AND fingerprint = ?",
+            (now, *key)
+        )
+
+        if row["notified_status"] != "firing":
+            # Se reabrió en silencio tras avisar que estaba resuelta: si sigue
+            # activa pasado el cooldown, se vuelve a notificar.
+            if now - (row["last_notified"] or row["first_fired"]) < self.cooldown:
+                return None
+            self.connection.execute(
+                "UPDATE alert_state SET last_notified = ?, notified_status = 'firing' WHERE rule = ? AND fingerprint = ?",
+                (now, *key)
+            )
+            self._log_event(now, *key, "fired", row["level"])
+            return dict(alert, estado="disparada")
+
+        if row["level"] == "warning" and now - row["first_fired"] >= self.escalation:
+            self.connection.execute(
+                "UPDATE alert_state SET level = 'critical', last_notified = ?, notified_status = 'firing' "
+                "WHERE rule = ? AND fingerprint = ?",
+                (now, *key)
+            )
+            self._log_event(now, *key, "escalated", "critical")
+            minutes = int((now - row["first_fired"]) // 60)
+            return dict(
+                alert,
+                nivel="critical",
+                estado="escalada",
+                canales=sorted(set(alert["canales"]) | set(self.escalation_channels)),
+                mensaje=f"{alert['mensaje']} (escalada: activa hace {minutes} minutos)"
+            )
+        return None
+
+    def _resolve(self, row, now):
+        notify = row["notified_status"] == "firing"
+        self.connection.execute(
+            "UPDATE alert_state SET status = 'resolved', resolved_at = ?, "
+            "last_notified = CASE WHEN ? THEN ? ELSE last_notified END, "
+            "notified_status = CASE WHEN ? THEN 'resolved' ELSE notified_status END "
+            "WHERE rule = ? AND fingerprint = ?",
+            (now, notify, now, notify, row["rule"], row["fingerprint"])
+        )
+        self._log_event(now, row["rule"], row["fingerprint"], "resolved", row["level"])
+        if not notify:
+            return None
+        return {
+            "nombre": row["rule"],
+            "nivel": row["level"],
+            "estado": "resuelta",
+            "mensaje": f"Resuelta: {row['rule']}",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)),
+            "canales": list(self.escalation_channels if row["level"] == "critical" else ["slack"]),
+            "datos": {}
+        }
+
+    def _apply_rate_limits(self, notification, now):
+        allowed = []
+        for channel in notification["canales"]:
+            limit = self.channel_limits.get(channel)
+            if limit is None:
+                allowed.append(channel)
+                continue
+
+            row = self.connection.execute(
+                "SELECT window_start, sent FROM channel_budget WHERE channel = ?", (channel,)
+            ).fetchone()
+            if row is None or now - row["window_start"] >= self.rate_window:
+                window_start, sent = now, 0
+            else:
+                window_start, sent = row["window_start"], row["sent"]
+
+            if sent >= limit:
+                self._log_event(now, notification["nombre"], channel, "rate_limited", notification["nivel"])
+                continue
+            self.connection.execute(
+                "INSERT OR REPLACE INTO channel_budget (channel, window_start, sent) VALUES (?, ?, ?)",
+                (channel, window_start, sent + 1)
+            )
+            allowed.append(channel)
+
+        if not allowed:
+            return None
+        return dict(notification, canales=allowed)
+
+    def _log_event(self, now, rule, fingerprint, event, level):
+        self.connection.execute(
+            "INSERT INTO alert_events (timestamp, rule, fingerprint, event, level) VALUES (?, ?, ?, ?, ?)",
+            (now, rule, fingerprint, event, level)
+        )
+
+    def active_alerts(self):
+        return [dict(row) for row in self.connection.execute("SELECT * FROM alert_state WHERE status = 'firing'")]
+
+    def events_since(self, timestamp):
+        return [dict(row) for row in self.connection.execute(
+            "SELECT * FROM alert_events WHERE timestamp >= ? ORDER BY timestamp", (timestamp,)
+        )]
+
+    def close(self):
+        self.connection.close()
@@ -1,8 +1,37 @@
 import csv
 import json
 import os
+import sys
+from collections import Counter
 from datetime import datetime
-import statistics
+
+from latency_histogram import LatencyHistogram
+from locust_csv_stream import CsvChunkReader
+from metrics_store import MetricsStore
+from throughput import AGGREGATED, ThroughputSeries
+
+PERFORMANCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "performance")
+sys.path.insert(0, PERFORMANCE_DIR)
+from performance_config import ENDPOINT_GROUPS, PERFORMANCE_THRESHOLDS, SESSION_ENDPOINTS
+
+LOCUST_PERCENTILE_COLUMNS = [
+    (50.0, "50%"),
+    (66.0, "66%"),
+    (75.0, "75%"),
+    (80.0, "80%"),
+    (90.0, "90%"),
+    (95.0, "95%"),
+    (98.0, "98%"),
+    (99.0, "99%"),
+    (99.9, "99.9%"),
+    (99.99, "99.99%"),
+    (100.0, "100%")
+]
+
+def _percentile(values, percentile):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percentile / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
 
 class PerformanceAnalyzer:
     def __init__(self):
@@ -13,49 +42,418 @@ class PerformanceAnalyzer:
             "error_rate_max": 5.0,
             "min_throughput": 10.0
         }
+        self.endpoint_groups = ENDPOINT_GROUPS
+        self.endpoint_thresholds = PERFORMANCE_THRESHOLDS
     
-    def analyze_csv_results(self, csv_file):
-        metrics = {
+    def _empty_metrics(self):
+        return {
             "total_requests": 0,
             "failed_requests": 0,
-            "response_times": [],
+            "histogram": LatencyHistogram(),
+            "response_time_sum": 0.0,
             "throughput": 0,
-            "error_rate": 0
+            "error_rate": 0,
+            "endpoints": {}
         }
+    
+    def analyze_csv_results(self, csv_file):
+        metrics = self._empty_metrics()
         
         if not os.path.exists(csv_file):
             print(f"Archivo no encontrado: {csv_file}")
             return metrics
         
-        with open(csv_file, 'r') as file:
-            reader = csv.DictReader(file)
-            for row in reader:
-                if row['Type'] == 'GET' or row['Type'] == 'POST':
-                    metrics["total_requests"] += int(row['Request Count'])
-                    metrics["failed_requests"] += int(row['Failure Count'])
-                    
-                    if row['Average Response Time']:
-                        avg_time = float(row['Average Response Time'])
-                        metrics["response_times"].append(avg_time)
+        for chunk in CsvChunkReader(csv_file):
+            self.ingest_stats_chunk(metrics, chunk)
         
         if metrics["total_requests"] > 0:
             metrics["error_rate"] = (metrics["failed_requests"] / metrics["total_requests"]) * 100
-            metrics["throughput"] = metrics["total_requests"] / 60
         
         return metrics
     
-    def calculate_percentiles(self, response_times):
-        if not response_times:
-            return {"p50": 0, "p95": 0, "p99": 0}
+    def ingest_stats_chunk(self, metrics, chunk):
+        columns = ("Type", "Name", "Request Count", "Failure Count", "Average Response Time", "Requests/s")
+        rows = zip(*(chunk[column] for column in columns))
+        for index, (request_type, name, request_count, failure_count, average, rps) in enumerate(rows):
+            if name == AGGREGATED and rps:
+                metrics["throughput"] = float(rps)
+            if request_type != 'GET' and request_type != 'POST':
+                continue
+            request_count = int(request_count)
+            metrics["total_requests"] += request_count
+            metrics["failed_requests"] += int(failure_count)
+            
+            if average:
+                metrics["response_time_sum"] += float(average) * request_count
+            
+            endpoint = self._endpoint(metrics, name)
+            endpoint["requests"] += request_count
+            endpoint["failures"] += int(failure_count)
+            endpoint["throughput"] += float(rps or 0)
+            
+            row = {column: chunk[column][index] for _, column in LOCUST_PERCENTILE_COLUMNS if column in chunk}
+            self._record_locust_percentiles(metrics["histogram"], row, request_count)
+            self._record_locust_percentiles(endpoint["histogram"], row, request_count)
+    
+    def _endpoint(self, metrics, name):
+        endpoint = metrics["endpoints"].get(name)
+        if endpoint is None:
+            endpoint = metrics["endpoints"][name] = {
+                "requests": 0,
+                "failures": 0,
+                "throughput": 0.0,
+                "histogram": LatencyHistogram()
+            }
+        return endpoint
+    
+    def endpoint_group(self, name):
+        for group, prefixes in self.endpoint_groups.items():
+            if any(name.startswith(prefix) for prefix in prefixes):
+                return group
+        return None
+    
+    def analyze_request_throughput(self, log_file):
+        series = ThroughputSeries()
+        for chunk in CsvChunkReader(log_file, ["timestamp", "name", "success"]):
+            series.ingest_request_chunk(chunk)
+        return series
+    
+    def _window_chunks(self, log_file, columns, window=None):
+        for chunk in CsvChunkReader(log_file, columns):
+            if window is not None:
+                start, end = window[0], window[1] + 1
+                keep = [start <= float(timestamp) < end for timestamp in chunk["timestamp"]]
+                chunk = {
+                    column: [value for value, kept in zip(values, keep) if kept]
+                    for column, values in chunk.items()
+                }
+            yield chunk
+    
+    def analyze_request_latency(self, log_file, metrics, window=None):
+        # Reconstruye desde el log los histogramas de las compuertas (total,
+        # por endpoint y corregidos) con solo las peticiones de la ventana,
+        # para que los percentiles no mezclen el calentamiento y la bajada.
+        # Las peticiones y fallas por endpoint salen de las mismas filas.
+        columns = ["timestamp", "name", "response_time", "success"]
+        with open(log_file, newline="", encoding="utf-8-sig") as f:
+            header = next(csv.reader(f), [])
+        # Los logs anteriores a la columna corregida solo aportan la cruda.
+        if "corrected_response_time" in header:
+            columns += ["corrected_response_time", "expected_interval"]
+        histogram = LatencyHistogram()
+        endpoints = {}
+        corrected_endpoints = {}
+        failures = Counter()
+        
+        for chunk in self._window_chunks(log_file, columns, window):
+            failures.update(name for name, success in zip(chunk["name"], chunk["success"]) if success == "0")
+            for (name, response_time), count in Counter(zip(chunk["name"], chunk["response_time"])).items():
+                endpoint_histogram = endpoints.get(name)
+                if endpoint_histogram is None:
+                    endpoint_histogram = endpoints[name] = LatencyHistogram()
+                endpoint_histogram.record(float(response_time), count)
+            if "corrected_response_time" not in chunk:
+                continue
+            corrected_rows = zip(chunk["name"], chunk["corrected_response_time"], chunk["expected_interval"])
+            for (name, corrected_time, expected_interval), count in Counter(corrected_rows).items():
+                if not corrected_time:
+                    continue
+                endpoint_histogram = corrected_endpoints.get(name)
+                if endpoint_histogram is None:
+                    endpoint_histogram = corrected_endpoints[name] = LatencyHistogram()
+                endpoint_histogram.record_corrected(float(corrected_time), float(expected_interval or 0), count)
+        
+        # Un endpoint sin peticiones en la ventana no se evalúa con los
+        # histogramas de toda la ejecución reconstruidos desde el CSV.
+        for name in [name for name in metrics["endpoints"] if name not in endpoints]:
+            del metrics["endpoints"][name]
+        
+        for name, endpoint_histogram in endpoints.items():
+            histogram.merge(endpoint_histogram)
+            endpoint = self._endpoint(metrics, name)
+            endpoint["histogram"] = endpoint_histogram
+            endpoint["requests"] = endpoint_histogram.total_count
+            endpoint["failures"] = failures[name]
+        
+        corrected = LatencyHistogram()
+        for name, endpoint in metrics["endpoints"].items():
+            endpoint.pop("corrected_histogram", None)
+            if name in corrected_endpoints:
+                endpoint["corrected_histogram"] = corrected_endpoints[name]
+                corrected.merge(corrected_endpoints[name])
+        metrics["corrected_histogram"] = corrected if corrected.total_count else None
+        metrics["histogram"] = histogram
+        return metrics
+    
+    def analyze_history_file(self, history_file):
+        endpoints = ThroughputSeries()
+        totals = ThroughputSeries()
+        
+        if not os.path.exists(history_file):
+            return totals
+        
+        # El historial trae contadores acumulados: el TPS de cada intervalo es
+        # la diferencia con la fila anterior del mismo endpoint. Las filas por
+        # endpoint solo existen con --csv-full-history.
+        last_totals = {}
+        columns = ["Timestamp", "User Count", "Name", "Total Request Count", "Total Failure Count"]
+        for chunk in CsvChunkReader(history_file, columns):
+            for timestamp, users, name, total, failures in zip(*(chunk[column] for column in columns)):
+                second = int(timestamp)
+                total = int(total or 0)
+                failures = int(failures or 0)
+                previous_total, previous_failures = last_totals.get(name, (0, 0))
+                last_totals[name] = (total, failures)
+                
+                if name == AGGREGATED:
+                    endpoints.set_users(second, int(users or 0))
+                    totals.set_users(second, int(users or 0))
+                    totals.add_total(second, total - previous_total, failures - previous_failures)
+                else:
+                    endpoints.add(second, name, total - previous_total, failures - previous_failures)
+        
+        return endpoints if endpoints.endpoints() else totals
+    
+    def apply_steady_state(self, metrics, series):
+        summaries = series.summarize_all()
+        if not summaries:
+            return metrics
+        
+        steady = summaries[AGGREGATED]
+        metrics["throughput"] = steady["mean_tps"]
+        metrics["throughput_detail"] = summaries
+        # Series completas (incluyen calentamiento y bajada) para graficar el
+        # TPS por segundo y en ventana deslizante de cada endpoint.
+        metrics["throughput_series"] = {
+            "start": series.bounds()[0],
+            "window_seconds": series.window_seconds,
+            "endpoints": {
+                name: {
+                    "per_second": series.per_second(name),
+                    "sliding_window": [round(value, 2) for value in series.sliding_window(name)]
+                }
+                for name in summaries
+            }
+        }
+        for name, detail in summaries.items():
+            if name in metrics["endpoints"]:
+                metrics["endpoints"][name]["throughput"] = detail["mean_tps"]
+        if steady["requests"]:
+            metrics["error_rate"] = steady["error_rate"]
+        return metrics
+    
+    def _record_locust_percentiles(self, histogram, row, request_count):
+        # El CSV de Locust solo trae percentiles por endpoint: se reparte el
+        # conteo de cada tramo entre percentiles sobre su valor superior.
+        previous = 0.0
+        for percentile, column in LOCUST_PERCENTILE_COLUMNS:
+            value = row.get(column)
+            if not value or value == "N/A":
+                continue
+            count = round(request_count * percentile / 100.0) - round(request_count * previous / 100.0)
+            histogram.record(float(value), count)
+            previous = percentile
+    
+    def analyze_resources(self, resource_file, window=None):
+        general = self.endpoint_thresholds["general"]
+        samples = {}
+        columns = ["timestamp", "role", "cpu_percent", "max_process_cpu", "memory_percent", "rss_mb"]
+        for chunk in CsvChunkReader(resource_file, columns):
+            for timestamp, role, cpu, max_cpu, memory, rss in zip(*(chunk[column] for column in columns)):
+                # Solo cuenta el tramo estable de la prueba, con los mismos
+                # timestamps (epoch) que el log de peticiones.
+                if window is not None and not window[0] <= float(timestamp) < window[1] + 1:
+                    continue
+                role_samples = samples.setdefault(role, {"cpu": [], "max_cpu": [], "memory": [], "rss": []})
+                role_samples["cpu"].append(float(cpu))
+                role_samples["memory"].append(float(memory))
+                role_samples["rss"].append(float(rss))
+                if max_cpu:
+                    role_samples["max_cpu"].append(float(max_cpu))
+        
+        if not samples:
+            return None
+        
+        roles = {}
+        for role, values in samples.items():
+            roles[role] = {
+                "samples": len(values["cpu"]),
+                "cpu_mean": round(sum(values["cpu"]) / len(values["cpu"]), 2),
+                "cpu_p95": round(_percentile(values["cpu"], 95), 2),
+                "memory_max": round(max(values["memory"]), 2),
+                "rss_max_mb": round(max(values["rss"]), 1)
+            }
+            if values["max_cpu"]:
+                roles[role]["max_process_cpu_p90"] = round(_percentile(values["max_cpu"], 90), 2)
+        
+        # Los umbrales se aplican a la aplicación bajo prueba si se pudo
+        # identificar; si no, al equipo completo.
+        source = "target" if "target" in roles else "system"
+        resources = {
+            "source": source,
+            "cpu_p95": roles.get(source, {}).get("cpu_p95", 0.0),
+            "memory_max": roles.get(source, {}).get("memory_max", 0.0),
+            "roles": roles,
+            "load_generator_bottleneck": False
+        }
+        
+        generator = roles.get("load_generator")
+        system = roles.get("system")
+        if generator is not None:
+            if generator.get("max_process_cpu_p90", 0.0) >= general["max_load_generator_cpu"]:
+                resources["load_generator_bottleneck"] = True
+                resources["bottleneck_reason"] = (
+                    f"un proceso de Locust usó {generator['max_process_cpu_p90']}% de un núcleo (P90)"
+                )
+            elif system is not None and system["cpu_p95"] >= 95 and generator["cpu_mean"] > roles.get("target", {}).get("cpu_mean", 0.0):
+                resources["load_generator_bottleneck"] = True
+                resources["bottleneck_reason"] = "la CPU del equipo se saturó y Locust consumió más que la aplicación"
+        
+        return resources
+    
+    def load_endpoint_histograms(self, latency_file, section="endpoints"):
+        if not os.path.exists(latency_file):
+            return None
+        
+        with open(latency_file, 'r') as f:
+            data = json.load(f)
+        
+        return {
+            name: LatencyHistogram.from_dict(endpoint_histogram)
+            for name, endpoint_histogram in data.get(section, {}).items()
+        }
+    
+    def load_run_counters(self, latency_file):
+        if not os.path.exists(latency_file):
+            return {}
+        
+        with open(latency_file, 'r') as f:
+            data = json.load(f)
+        return {"sessions": data.get("sessions"), "arrivals": data.get("arrivals")}
+    
+    def summarize_sessions(self, counters, endpoints):
+        # Las peticiones con token en caché y los logins de sesión nueva se
+        # reportan por separado: mezclados, el costo del login se diluye.
+        attempts = counters["hits"] + counters["logins"]
+        sessions = dict(counters, hit_rate=round(counters["hits"] / attempts * 100, 2) if attempts else 0.0)
+        for kind, names in SESSION_ENDPOINTS.items():
+            histogram = LatencyHistogram()
+            for name in names:
+                if name in endpoints:
+                    histogram.merge(endpoints[name]["histogram"])
+            if not histogram.total_count:
+                continue
+            values = histogram.percentiles([50, 95, 99])
+            sessions[f"{kind}_latency"] = {
+                "requests": histogram.total_count,
+                "p50": round(values[50], 2),
+                "p95": round(values[95], 2),
+                "p99": round(values[99], 2)
+            }
+        return sessions
+    
+    def summarize_arrivals(self, arrivals):
+        # Con tasa de llegadas fija, una llegada tardía o perdida significa que
+        # el sistema no sostuvo la tasa objetivo aunque el TPS parezca bueno.
+        general = self.endpoint_thresholds["general"]
+        expected = arrivals["scheduled"] + arrivals["missed"]
+        late_pct = arrivals["late"] / expected * 100 if expected else 0.0
+        summary = {
+            "target_rps": arrivals["target_rps"],
+            "scheduled": arrivals["scheduled"],
+            "late": arrivals["late"],
+            "missed": arrivals["missed"],
+            "late_pct": round(late_pct, 2),
+            "missed_pct": round(arrivals["missed"] / expected * 100, 2) if expected else 0.0,
+            "avg_lateness_ms": round(arrivals["lateness_sum"] / arrivals["late"] * 1000, 2) if arrivals["late"] else 0.0,
+            "max_lateness_ms": round(arrivals["max_lateness"] * 1000, 2)
+        }
+        summary["passed"] = arrivals["missed"] == 0 and late_pct <= general["max_late_arrival_pct"]
+        return summary
+    
+    def load_latency_samples(self, latency_file, metrics=None):
+        endpoint_histograms = self.load_endpoint_histograms(latency_file)
+        if endpoint_histograms is None:
+            return None
+        
+        histogram = LatencyHistogram()
+        for name, endpoint_histogram in endpoint_histograms.items():
+            histogram.merge(endpoint_histogram)
+            if metrics is not None:
+                # Los histogramas crudos reemplazan a los reconstruidos desde
+                # los percentiles del CSV.
+                endpoint = self._endpoint(metrics, name)
+                endpoint["histogram"] = endpoint_histogram
+                endpoint["requests"] = endpoint["requests"] or endpoint_histogram.total_count
+        
+        if metrics is not None:
+            # Latencia desde la hora en que cada petición debió enviarse: es la
+            # que viven los usuarios cuando el servidor se detiene.
+            corrected = LatencyHistogram()
+            for name, endpoint_histogram in self.load_endpoint_histograms(latency_file, "corrected_endpoints").items():
+                corrected.merge(endpoint_histogram)
+                self._endpoint(metrics, name)["corrected_histogram"] = endpoint_histogram
+            if corrected.total_count:
+                metrics["corrected_histogram"] = corrected
+        return histogram
+    
+    def analyze_reports(self, directory="reports"):
+        # Recorrido completo de main() sobre los archivos de un directorio.
+        csv_file = os.path.join(directory, "performance_stats.csv")
+        latency_file = os.path.join(directory, "performance_latency.json")
+        request_log = os.path.join(directory, "performance_requests.csv")
+        history_file = os.path.join(directory, "performance_stats_history.csv")
+        resource_file = os.path.join(directory, "performance_resources.csv")
+        metrics = self.analyze_csv_results(csv_file)
+        
+        if os.path.exists(request_log):
+            series = self.analyze_request_throughput(request_log)
+        else:
+            series = self.analyze_history_file(history_file)
+        self.apply_steady_state(metrics, series)
+        
+        steady_window = None
+        if "throughput_detail" in metrics:
+            steady = metrics["throughput_detail"][AGGREGATED]
+            steady_window = (steady["steady_start"], steady["steady_end"])
         
-        sorted_times = sorted(response_times)
+        if os.path.exists(resource_file):
+            metrics["resources"] = self.analyze_resources(resource_file, steady_window)
+        
+        raw_histogram = self.load_latency_samples(latency_file, metrics)
+        run_counters = self.load_run_counters(latency_file)
+        metrics["sessions"] = run_counters.get("sessions")
+        metrics["arrivals"] = run_counters.get("arrivals")
+        # Con log de peticiones, las compuertas de latencia usan el mismo tramo
+        # estable que el TPS; sin él, los histogramas del JSON cubren toda la
+        # ejecución y el reporte lo indica.
+        metrics["latency_window"] = "full_run"
+        if os.path.exists(request_log):
+            self.analyze_request_latency(request_log, metrics, steady_window)
+            if steady_window is not None:
+                metrics["latency_window"] = "steady_state"
+        elif raw_histogram is not None and raw_histogram.total_count:
+            metrics["histogram"] = raw_histogram
+        return metrics
+    
+    def calculate_percentiles(self, histogram):
+        values = histogram.percentiles([50, 95, 99, 99.9])
         return {
-            "p50": statistics.median(sorted_times),
-            "p95": sorted_times[int(len(sorted_times) * 0.95)],
-            "p99": sorted_times[int(len(sorted_times) * 0.99)]
+            "p50": values[50],
+            "p95": values[95],
+            "p99": values[99],
+            "p999": values[99.9],
+            "samples": histogram.total_count,
+            "relative_error": histogram.relative_accuracy
         }
     
     def generate_metrics_json(self, metrics, percentiles):
+        # Las compuertas de percentiles usan la latencia corregida cuando la
+        # hay; la cruda se sigue reportando para comparar.
+        gated = percentiles
+        if metrics.get("corrected_histogram") is not None:
+            gated = self.calculate_percentiles(metrics["corrected_histogram"])
+        
         report = {
             "timestamp": datetime.now().isoformat(),
             "summary": {
@@ -67,33 +465,154 @@ class PerformanceAnalyzer:
             "response_times": {
                 "p50": round(percentiles["p50"], 2),
                 "p95": round(percentiles["p95"], 2),
-                "p99": round(percentiles["p99"], 2)
+                "p99": round(percentiles["p99"], 2),
+                "p999": round(percentiles["p999"], 2),
+                "samples": percentiles["samples"],
+                "relative_error": percentiles["relative_error"],
+                "window": metrics.get("latency_window", "full_run")
             },
             "quality_gates": {
-                "p50_passed": percentiles["p50"] <= self.thresholds["response_time_p50"],
-                "p95_passed": percentiles["p95"] <= self.thresholds["response_time_p95"],
-                "p99_passed": percentiles["p99"] <= self.thresholds["response_time_p99"],
+                "p50_passed": gated["p50"] <= self.thresholds["response_time_p50"],
+                "p95_passed": gated["p95"] <= self.thresholds["response_time_p95"],
+                "p99_passed": gated["p99"] <= self.thresholds["response_time_p99"],
                 "error_rate_passed": metrics["error_rate"] <= self.thresholds["error_rate_max"],
                 "throughput_passed": metrics["throughput"] >= self.thresholds["min_throughput"]
             },
             "indicators": {
                 "TPS": round(metrics["throughput"], 2),
-                "latencia_promedio": round(sum(metrics["response_times"]) / len(metrics["response_times"]), 2) if metrics["response_times"] else 0,
+                "latencia_promedio": round(metrics["response_time_sum"] / metrics["total_requests"], 2) if metrics["total_requests"] else 0,
                 "tasa_error": round(metrics["error_rate"], 2),
                 "usuarios_concurrentes": 50
             }
         }
         
-        all_passed = all(report["quality_gates"].values())
+        if gated is not percentiles:
+            report["response_times_corrected"] = {
+                "p50": round(gated["p50"], 2),
+                "p95": round(gated["p95"], 2),
+                "p99": round(gated["p99"], 2),
+                "p999": round(gated["p999"], 2),
+                "samples": gated["samples"],
+                "window": metrics.get("latency_window", "full_run")
+            }
+        
+        report["endpoints"], report["endpoint_groups"] = self.evaluate_endpoints(metrics["endpoints"])
+        
+        if metrics.get("resources"):
+            general = self.endpoint_thresholds["general"]
+            report["resources"] = metrics["resources"]
+            # Sin la aplicación identificada, la CPU del equipo incluye a
+            # Locust, Chrome y behave: se reporta solo como información.
+            if metrics["resources"]["source"] == "target":
+                report["quality_gates"]["cpu_usage_passed"] = metrics["resources"]["cpu_p95"] <= general["max_cpu_usage"]
+                report["quality_gates"]["memory_usage_passed"] = metrics["resources"]["memory_max"] <= general["max_memory_usage"]
+        
+        if metrics.get("arrivals"):
+            report["arrivals"] = self.summarize_arrivals(metrics["arrivals"])
+            report["quality_gates"]["arrival_rate_passed"] = report["arrivals"]["passed"]
+        
+        if metrics.get("sessions"):
+            report["sessions"] = self.summarize_sessions(metrics["sessions"], metrics["endpoints"])
+        
+        if "throughput_detail" in metrics:
+            steady = metrics["throughput_detail"][AGGREGATED]
+            report["summary"]["sustained_tps"] = round(steady["sustained_tps"], 2)
+            report["throughput"] = {
+                name: {key: round(value, 2) if isinstance(value, float) else value for key, value in detail.items()}
+                for name, detail in metrics["throughput_detail"].items()
+            }
+            report["throughput_series"] = metrics["throughput_series"]
+        
+        # Un endpoint lento no queda oculto detrás de otro rápido: cada uno
+        # debe cumplir el bloque de umbrales de su grupo.
+        all_passed = all(report["quality_gates"].values()) and all(
+            endpoint.get("status", "PASS") == "PASS" for endpoint in report["endpoints"].values()
+        )
         report["overall_status"] = "PASS" if all_passed else "FAIL"
         
         return report
     
+    def evaluate_endpoints(self, endpoints):
+        endpoint_report = {}
+        groups = {}
+        for name, endpoint in sorted(endpoints.items()):
+            if not endpoint["histogram"].total_count:
+                continue
+            group = self.endpoint_group(name)
+            endpoint_report[name] = self.summarize_endpoint(endpoint, group)
+            if group is not None:
+                groups.setdefault(group, []).append(name)
+        
+        group_report = {}
+        for group, names in groups.items():
+            combined = {"requests": 0, "failures": 0, "throughput": 0.0, "histogram": LatencyHistogram()}
+            for name in names:
+                combined["requests"] += endpoints[name]["requests"]
+                combined["failures"] += endpoints[name]["failures"]
+                combined["throughput"] += endpoints[name]["throughput"]
+                combined["histogram"].merge(endpoints[name]["histogram"])
+                if "corrected_histogram" in endpoints[name]:
+                    combined.setdefault("corrected_histogram", LatencyHistogram()).merge(endpoints[name]["corrected_histogram"])
+            group_report[group] = dict(self.summarize_endpoint(combined, group), endpoints=names)
+            # El grupo falla si alguno de sus endpoints falla.
+            if any(endpoint_report[name].get("status") == "FAIL" for name in names):
+                group_report[group]["status"] = "FAIL"
+        
+        return endpoint_report, group_report
+    
+    def summarize_endpoint(self, endpoint, group):
+        histogram = endpoint["histogram"]
+        values = histogram.percentiles([50, 95, 99, 99.9])
+        error_rate = endpoint["failures"] / endpoint["requests"] * 100 if endpoint["requests"] else 0.0
+        summary = {
+            "group": group,
+            "requests": endpoint["requests"],
+            "failures": endpoint["failures"],
+            "error_rate": round(error_rate, 2),
+            "success_rate": round(100.0 - error_rate, 2),
+            "throughput_rps": round(endpoint["throughput"], 2),
+            "p50": round(values[50], 2),
+            "p95": round(values[95], 2),
+            "p99": round(values[99], 2),
+            "p999": round(values[99.9], 2),
+            "max": round(histogram.max or 0.0, 2)
+        }
+        
+        gated_values, gated_max = values, histogram.max or 0.0
+        corrected = endpoint.get("corrected_histogram")
+        if corrected is not None and corrected.total_count:
+            gated_values, gated_max = corrected.percentiles([50, 95, 99, 99.9]), corrected.max or 0.0
+            summary["corrected"] = {
+                "p50": round(gated_values[50], 2),
+                "p95": round(gated_values[95], 2),
+                "p99": round(gated_values[99], 2),
+                "p999": round(gated_values[99.9], 2),
+                "max": round(gated_max, 2)
+            }
+        
+        thresholds = self.endpoint_thresholds.get(group)
+        if thresholds is None:
+            return summary
+        
+        gates = {
+            "p50_passed": gated_values[50] <= thresholds["p50"],
+            "p95_passed": gated_values[95] <= thresholds["p95"],
+            "p99_passed": gated_values[99] <= thresholds["p99"],
+            "max_response_time_passed": gated_max <= thresholds["max_response_time"],
+            "success_rate_passed": summary["success_rate"] >= thresholds["min_success_rate"]
+        }
+        summary["quality_gates"] = gates
+        summary["gates_failed"] = sum(not passed for passed in gates.values())
+        summary["status"] = "PASS" if all(gates.values()) else "FAIL"
+        return summary
+    
     def create_dashboard_data(self, report):
         dashboard_data = {
             "performance_metrics": {
                 "TPS": {
                     "value": report["indicators"]["TPS"],
+                    "sustained": report["summary"].get("sustained_tps"),
+                    "series": report.get("throughput_series", {}).get("endpoints", {}).get(AGGREGATED),
                     "threshold": self.thresholds["min_throughput"],
                     "status": "good" if report["quality_gates"]["throughput_passed"] else "critical"
                 },
@@ -101,12 +620,24 @@ class PerformanceAnalyzer:
                     "p50": report["response_times"]["p50"],
                     "p95": report["response_times"]["p95"],
                     "p99": report["response_times"]["p99"],
+                    "p999": report["response_times"]["p999"],
+                    "corrected": report.get("response_times_corrected"),
                     "status": "good" if report["quality_gates"]["p95_passed"] else "warning"
                 },
                 "errores": {
                     "rate": report["summary"]["error_rate"],
                     "threshold": self.thresholds["error_rate_max"],
                     "status": "good" if report["quality_gates"]["error_rate_passed"] else "critical"
+                },
+                "grupos": {
+                    group: {
+                        "p95": summary["p95"],
+                        "threshold_p95": self.endpoint_thresholds[group]["p95"],
+                        "success_rate": summary["success_rate"],
+                        "throughput_rps": summary["throughput_rps"],
+                        "status": "good" if summary["status"] == "PASS" else "critical"
+                    }
+                    for group, summary in report.get("endpoint_groups", {}).items()
                 }
             },
             "alerts": [],
@@ -120,11 +651,48 @@ class PerformanceAnalyzer:
             })
         
         if not report["quality_gates"]["p95_passed"]:
+            gated = report.get("response_times_corrected", report["response_times"])
+            label = " (corregida por omisión coordinada)" if "response_times_corrected" in report else ""
             dashboard_data["alerts"].append({
                 "level": "warning",
-                "message": f"Latencia P95 alta: {report['response_times']['p95']}ms > {self.thresholds['response_time_p95']}ms"
+                "message": f"Latencia P95 alta{label}: {gated['p95']}ms > {self.thresholds['response_time_p95']}ms"
+            })
+        
+        arrivals = report.get("arrivals")
+        if arrivals and not arrivals["passed"]:
+            dashboard_data["alerts"].append({
+                "level": "critical",
+                "message": f"No se sostuvo la tasa de {arrivals['target_rps']:g} llegadas/s: {arrivals['late_pct']}% tardías "
+                           f"(máx. {arrivals['max_lateness_ms']}ms), {arrivals['missed']} perdidas"
             })
         
+        for group, summary in report.get("endpoint_groups", {}).items():
+            if summary.get("status") == "FAIL":
+                failed = [gate for gate, passed in summary["quality_gates"].items() if not passed]
+                dashboard_data["alerts"].append({
+                    "level": "critical",
+                    "message": f"Umbrales de '{group}' incumplidos ({', '.join(failed)}): P95 {summary['p95']}ms, éxito {summary['success_rate']}%"
+                })
+        
+        resources = report.get("resources")
+        if resources:
+            general = self.endpoint_thresholds["general"]
+            if not report["quality_gates"].get("cpu_usage_passed", True):
+                dashboard_data["alerts"].append({
+                    "level": "warning",
+                    "message": f"CPU alta ({resources['source']}): P95 {resources['cpu_p95']}% > {general['max_cpu_usage']}%"
+                })
+            if not report["quality_gates"].get("memory_usage_passed", True):
+                dashboard_data["alerts"].append({
+                    "level": "warning",
+                    "message": f"Memoria alta ({resources['source']}): {resources['memory_max']}% > {general['max_memory_usage']}%"
+                })
+            if resources["load_generator_bottleneck"]:
+                dashboard_data["alerts"].append({
+                    "level": "warning",
+                    "message": f"El generador de carga fue el cuello de botella: {resources['bottleneck_reason']}. Los resultados subestiman la capacidad del sistema"
+                })
+        
         if not report["quality_gates"]["error_rate_passed"]:
             dashboard_data["alerts"].append({
                 "level": "critical",
@@ -135,12 +703,10 @@ class PerformanceAnalyzer:
 
 def main():
     analyzer = PerformanceAnalyzer()
+    metrics = analyzer.analyze_reports("reports")
     
-    csv_file = "reports/performance_stats.csv"
-    metrics = analyzer.analyze_csv_results(csv_file)
-    
-    if metrics["response_times"]:
-        percentiles = analyzer.calculate_percentiles(metrics["response_times"])
+    if metrics["histogram"].total_count:
+        percentiles = analyzer.calculate_percentiles(metrics["histogram"])
         report = analyzer.generate_metrics_json(metrics, percentiles)
         dashboard_data = analyzer.create_dashboard_data(report)
         
@@ -152,11 +718,34 @@ def main():
         with open("reports/dashboard_data.json", "w") as f:
             json.dump(dashboard_data, f, indent=2)
         
+        # Los JSON anteriores se sobrescriben en cada ejecución; el historial
+        # conserva todas para las tendencias.
+        store = MetricsStore()
+        store.record_run(report)
+        store.close()
+        
         print(f"Estado general: {report['overall_status']}")
         print(f"TPS: {report['indicators']['TPS']}")
         print(f"Latencia P95: {report['response_times']['p95']}ms")
+        if report["response_times"]["window"] == "full_run":
+            print("Latencia medida sobre toda la ejecución (incluye calentamiento y bajada); "
+                  "con REQUEST_LOG se evalúa solo el tramo estable")
+        if "response_times_corrected" in report:
+            corrected = report["response_times_corrected"]
+            print(f"Latencia corregida por omisión coordinada: P95 {corrected['p95']}ms, P99 {corrected['p99']}ms "
+                  f"(cruda: P99 {report['response_times']['p99']}ms)")
+        print(f"Latencia P99.9: {report['response_times']['p999']}ms (±{percentiles['relative_error'] * 100:.0f}%, {percentiles['samples']} muestras)")
         print(f"Tasa de error: {report['summary']['error_rate']}%")
         
+        resources = report.get("resources")
+        if resources and resources["source"] != "target":
+            print(f"CPU del equipo (informativo, sin --target): P95 {resources['cpu_p95']}%, memoria máx. {resources['memory_max']}%")
+        
+        sessions = report.get("sessions")
+        if sessions and "hit_latency" in sessions and "miss_latency" in sessions:
+            print(f"Sesiones reutilizadas: {sessions['hit_rate']}% - P95 con token en caché "
+                  f"{sessions['hit_latency']['p95']}ms, P95 de login nuevo {sessions['miss_latency']['p95']}ms")
+        
         if dashboard_data["alerts"]:
             print("Alertas generadas:")
             for alert in dashboard_data["alerts"]:
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCUSTFILE = os.path.join(SCRIPTS_DIR, "..", "tests", "performance", "locustfile.py")
+STUB_SERVER = os.path.join(SCRIPTS_DIR, "login_stub_server.py")
+MODES = ("standard", "fast")
+
+
+def run_mode(mode, host, users, duration):
+    # Se ejecuta en un proceso propio por modo: el locustfile elige las clases
+    # de usuario al importarse según LOCUST_MODE.
+    os.environ["LOCUST_MODE"] = mode
+    os.environ.setdefault("LATENCY_OUTPUT", os.devnull)
+    import importlib.util
+    import gevent
+    from locust import constant, events
+    from locust.env import Environment
+    from locust.user.users import User
+
+    spec = importlib.util.spec_from_file_location("locustfile", LOCUSTFILE)
+    locustfile = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(locustfile)
+
+    # Sin tiempo de espera: cada usuario envía peticiones tan rápido como el
+    # generador puede, que es lo que se quiere medir.
+    user_classes = [
+        type(value.__name__, (value,), {"wait_time": constant(0), "__module__": value.__module__})
+        for value in vars(locustfile).values()
+        if isinstance(value, type) and issubclass(value, User) and not value.abstract and value.__module__ == "locustfile"
+    ]
+
+    environment = Environment(user_classes=user_classes, host=host, events=events)
+    runner = environment.create_local_runner()
+    runner.start(users, spawn_rate=users)
+    gevent.sleep(min(2.0, duration / 4))
+
+    # Se descarta el arranque: solo cuenta el tramo con todos los usuarios activos.
+    requests_before = environment.stats.total.num_requests
+    failures_before = environment.stats.total.num_failures
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    gevent.sleep(duration)
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    elapsed = time.perf_counter() - started
+    requests = environment.stats.total.num_requests - requests_before
+    failures = environment.stats.total.num_failures - failures_before
+    runner.quit()
+
+    cpu_seconds = (usage_after.ru_utime - usage_before.ru_utime) + (usage_after.ru_stime - usage_before.ru_stime)
+    print(json.dumps({
+        "mode": mode,
+        "user_classes": [user_class.__name__ for user_class in user_classes],
+        "users": users,
+        "requests": requests,
+        "failures": failures,
+        "elapsed_seconds": round(elapsed, 2),
+        "cpu_seconds": round(cpu_seconds, 2),
+        "rps": round(requests / elapsed, 1),
+        "rps_per_core": round(requests / cpu_seconds, 1) if cpu_seconds else None
+    }))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara peticiones por segundo por núcleo del generador entre HttpUser y FastHttpUser")
+    parser.add_argument("--host", help="Servidor objetivo; por defecto se levanta scripts/login_stub_server.py")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=15.0, help="Segundos medidos por modo")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--output", default="reports/load_generator_benchmark.json")
+    parser.add_argument("--run-mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_mode:
+        run_mode(args.run_mode, args.host, args.users, args.duration)
+        return
+
+    server = None
+    host = args.host
+    if host is None:
+        port = _free_port()
+        # Sin bloqueo de cuenta: la tarea de contraseña inválida se repite
+        # miles de veces con el mismo email.
+        server = subprocess.Popen([sys.executable, STUB_SERVER, "--port", str(port), "--max-attempts", "0"],
+                                  stdout=subprocess.DEVNULL)
+        host = f"http://127.0.0.1:{port}"
+        time.sleep(0.5)
+
+    results = []
+    try:
+        for mode in args.modes:
+            print(f"Modo '{mode}': {args.users} usuarios durante {args.duration:.0f}s contra {host}")
+            output = subprocess.run(
+                [sys.executable, __file__, "--run-mode", mode, "--host", host,
+                 "--users", str(args.users), "--duration", str(args.duration)],
+                check=True, stdout=subprocess.PIPE, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(f"  {result['requests']} peticiones, {result['rps']} RPS, "
+                  f"{result['cpu_seconds']}s de CPU -> {result['rps_per_core']} RPS por núcleo")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    # RPS por núcleo = peticiones / segundos de CPU del generador, así el
+    # resultado no depende de que el servidor objetivo sea el límite.
+    by_mode = {result["mode"]: result for result in results}
+    if "standard" in by_mode and "fast" in by_mode and by_mode["standard"]["rps_per_core"]:
+        speedup = by_mode["fast"]["rps_per_core"] / by_mode["standard"]["rps_per_core"]
+        print(f"FastHttpUser rinde {speedup:.1f}x peticiones por núcleo respecto a HttpUser")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"host": host, "results": results}, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
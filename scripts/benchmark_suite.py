@@ -0,0 +1,306 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(SCRIPTS_DIR)
+ALERT_CONFIG = os.path.join(ROOT_DIR, "config", "alertas.yml")
+PERFORMANCE_DIR = os.path.join(ROOT_DIR, "tests", "performance")
+sys.path.insert(0, PERFORMANCE_DIR)
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_OUTPUT = "reports/benchmarks/results.json"
+DEFAULT_DATA_DIR = "reports/benchmarks/data"
+
+
+def _analyze(analyzer, metrics):
+    percentiles = analyzer.calculate_percentiles(metrics["histogram"])
+    report = analyzer.generate_metrics_json(metrics, percentiles)
+    return report, analyzer.create_dashboard_data(report)
+
+
+def stage_analyzer_request_log(data_dir, rows, context):
+    from analyze_performance import PerformanceAnalyzer
+    analyzer = PerformanceAnalyzer()
+    # El mismo recorrido que main(): TPS y latencia de la fase estable, con
+    # dos lecturas del log de peticiones.
+    _analyze(analyzer, analyzer.analyze_reports(data_dir))
+    return rows
+
+
+def stage_analyzer_history(data_dir, rows, context):
+    from analyze_performance import PerformanceAnalyzer
+    analyzer = PerformanceAnalyzer()
+    metrics = analyzer.analyze_csv_results(os.path.join(data_dir, "performance_stats.csv"))
+    analyzer.apply_steady_state(metrics, analyzer.analyze_history_file(os.path.join(data_dir, "performance_stats_history.csv")))
+    _analyze(analyzer, metrics)
+    return rows
+
+
+def stage_html_report(data_dir, rows, context):
+    from generate_report import generate_html_report
+    summary = generate_html_report(os.path.join(data_dir, "behave-results.json"), "bdd-report.html", cache_file=None)
+    return summary["total"]
+
+
+def setup_alert_manager(data_dir, rows):
+    from alert_manager import AlertManager
+    return AlertManager(ALERT_CONFIG)
+
+
+def stage_alert_rules(data_dir, rows, manager):
+    evaluated = 0
+    # Una evaluación por snapshot, como en el monitoreo continuo.
+    with open(os.path.join(data_dir, "metric_snapshots.jsonl"), encoding="utf-8") as f:
+        for line in f:
+            manager.evaluate_rules(json.loads(line))
+            evaluated += 1
+    return evaluated
+
+
+def setup_rule_engine(data_dir, rows):
+    from alert_manager import load_rule_engine
+    return load_rule_engine(ALERT_CONFIG)
+
+
+def stage_alert_backtest(data_dir, rows, rule_engine):
+    from alert_manager import backtest, load_snapshots
+    snapshots = load_snapshots(os.path.join(data_dir, "metric_snapshots.jsonl"))
+    backtest(rule_engine, snapshots)
+    return len(snapshots)
+
+
+def prepare_quality_gates(data_dir, rows):
+    # Entradas de check_quality_gates en la carpeta de trabajo: el reporte del
+    # analizador, los histogramas y una línea base de la misma distribución.
+    from analyze_performance import PerformanceAnalyzer
+    from regression import load_run, save_baseline
+    analyzer = PerformanceAnalyzer()
+    metrics = analyzer.analyze_csv_results(os.path.join(data_dir, "performance_stats.csv"))
+    analyzer.apply_steady_state(metrics, analyzer.analyze_history_file(os.path.join(data_dir, "performance_stats_history.csv")))
+    report, dashboard_data = _analyze(analyzer, metrics)
+
+    os.makedirs("reports", exist_ok=True)
+    with open("reports/performance_metrics.json", "w") as f:
+        json.dump(report, f)
+    with open("reports/dashboard_data.json", "w") as f:
+        json.dump(dashboard_data, f)
+    shutil.copyfile(os.path.join(data_dir, "performance_latency.json"), "reports/performance_latency.json")
+    save_baseline(load_run(os.path.join(data_dir, "baseline_latency.json"), "reports/performance_metrics.json"),
+                  "baseline.json")
+
+
+def stage_quality_gates(data_dir, rows, context):
+    from check_quality_gates import check_quality_gates, check_regression
+    check_quality_gates()
+    check_regression("baseline.json")
+    return rows
+
+
+def stage_metrics_history(data_dir, rows, context):
+    from metrics_store import MetricsStore
+    store = MetricsStore(os.path.join(data_dir, "metrics_history.db"))
+    points = len(store.trend("p95", days=90))
+    for endpoint in store.endpoints():
+        store.summarize_trend("p95", endpoint, days=90)
+        store.summarize_trend("p95", endpoint, days=90, branch="main")
+        points += len(store.trend("p99", endpoint, days=90))
+    store.close()
+    return points
+
+
+# nombre -> (prepare, setup, etapa). prepare escribe archivos de entrada en
+# un proceso aparte, así no cuenta ni en el tiempo ni en el pico de memoria;
+# setup corre en el proceso medido pero fuera del cronómetro.
+STAGES = {
+    "analyzer_request_log": (None, None, stage_analyzer_request_log),
+    "analyzer_history": (None, None, stage_analyzer_history),
+    "html_report": (None, None, stage_html_report),
+    "alert_rules": (None, setup_alert_manager, stage_alert_rules),
+    "alert_backtest": (None, setup_rule_engine, stage_alert_backtest),
+    "quality_gates": (prepare_quality_gates, None, stage_quality_gates),
+    "metrics_history": (None, None, stage_metrics_history)
+}
+
+
+def run_stage(name, data_dir, rows, prepare_only=False):
+    # Proceso hijo en la carpeta de trabajo de la etapa; los mensajes de los
+    # scripts se descartan y el resultado se imprime como JSON.
+    prepare, setup, stage = STAGES[name]
+    data_dir = os.path.abspath(data_dir)
+    os.chdir(os.path.join(data_dir, f"work-{name}"))
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        if prepare_only:
+            prepare(data_dir, rows)
+            return
+        context = setup(data_dir, rows) if setup is not None else None
+        started = time.perf_counter()
+        processed = stage(data_dir, rows, context)
+        elapsed = time.perf_counter() - started
+        if hasattr(context, "close"):
+            context.close()
+
+    print(json.dumps({"stage": name, "rows": rows, "processed": processed, "seconds": elapsed}))
+
+
+def measure(name, data_dir, rows):
+    work_dir = os.path.join(data_dir, f"work-{name}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    os.makedirs(work_dir)
+    command = [sys.executable, os.path.abspath(__file__), "--run-stage", name, "--rows", str(rows), "--data-dir", data_dir]
+    if STAGES[name][0] is not None:
+        subprocess.run(command + ["--prepare-only"], check=True)
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    output = process.stdout.read()
+    process.stdout.close()
+    # wait4 da el pico de memoria de este hijo en particular (ru_maxrss en KB).
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"La etapa '{name}' con {rows} filas terminó con código {process.returncode}")
+    shutil.rmtree(work_dir, ignore_errors=True)
+    result = json.loads(output.strip().splitlines()[-1])
+    result["peak_rss_mb"] = round(usage.ru_maxrss / 1024, 1)
+    return result
+
+
+def run_suite(sizes, stages, data_root, repeat):
+    from metrics_store import current_branch, current_commit
+    from synthetic_data import generate
+
+    results = []
+    for rows in sizes:
+        data_dir = os.path.join(data_root, str(rows))
+        started = time.perf_counter()
+        if generate(data_dir, rows):
+            print(f"Datos sintéticos de {rows} filas generados en {time.perf_counter() - started:.1f}s ({data_dir})")
+
+        for name in stages:
+            runs = [measure(name, data_dir, rows) for _ in range(repeat)]
+            seconds = sorted(run["seconds"] for run in runs)[len(runs) // 2]
+            result = {
+                "stage": name,
+                "rows": rows,
+                "processed": runs[0]["processed"],
+                "seconds": round(seconds, 4),
+                "seconds_runs": [round(run["seconds"], 4) for run in runs],
+                "rows_per_second": round(rows / seconds, 1) if seconds else None,
+                "peak_rss_mb": max(run["peak_rss_mb"] for run in runs)
+            }
+            results.append(result)
+            print(f"  {name:<22} {rows:>9} filas  {result['seconds']:>9.3f}s  "
+                  f"{result['rows_per_second'] or 0:>12,.0f} filas/s  {result['peak_rss_mb']:>7.1f}MB")
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "commit": current_commit(),
+        "branch": current_branch(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "repeat": repeat,
+        "results": results
+    }
+
+
+def compare_results(baseline, current, tolerance_pct=10.0, min_seconds=0.05, min_memory_mb=5.0):
+    # Una etapa es más lenta si supera la tolerancia relativa y además la
+    # diferencia absoluta pasa min_seconds; así el ruido de las etapas de
+    # milisegundos no marca regresiones.
+    previous = {(result["stage"], result["rows"]): result for result in baseline["results"]}
+    comparisons = []
+    for result in current["results"]:
+        before = previous.get((result["stage"], result["rows"]))
+        if before is None:
+            continue
+        time_change = (result["seconds"] - before["seconds"]) / before["seconds"] * 100 if before["seconds"] else 0.0
+        memory_change = (result["peak_rss_mb"] - before["peak_rss_mb"]) / before["peak_rss_mb"] * 100 if before["peak_rss_mb"] else 0.0
+        comparisons.append({
+            "stage": result["stage"],
+            "rows": result["rows"],
+            "baseline_seconds": before["seconds"],
+            "current_seconds": result["seconds"],
+            "time_change_pct": round(time_change, 1),
+            "baseline_peak_rss_mb": before["peak_rss_mb"],
+            "current_peak_rss_mb": result["peak_rss_mb"],
+            "memory_change_pct": round(memory_change, 1),
+            "slower": time_change > tolerance_pct and result["seconds"] - before["seconds"] > min_seconds,
+            "more_memory": memory_change > tolerance_pct and result["peak_rss_mb"] - before["peak_rss_mb"] > min_memory_mb
+        })
+    return comparisons
+
+
+def print_comparison(comparisons, baseline, current, tolerance_pct):
+    print(f"Comparación {(baseline.get('commit') or '?')[:10]} → {(current.get('commit') or '?')[:10]} "
+          f"(tolerancia {tolerance_pct}%)")
+    regressions = 0
+    for comparison in comparisons:
+        flags = []
+        if comparison["slower"]:
+            flags.append("MÁS LENTO")
+        if comparison["more_memory"]:
+            flags.append("MÁS MEMORIA")
+        regressions += bool(flags)
+        status = "✗ " + ", ".join(flags) if flags else "✓"
+        print(f"  {comparison['stage']:<22} {comparison['rows']:>9}  "
+              f"{comparison['baseline_seconds']:.3f}s → {comparison['current_seconds']:.3f}s ({comparison['time_change_pct']:+.1f}%)  "
+              f"{comparison['baseline_peak_rss_mb']:.0f} → {comparison['current_peak_rss_mb']:.0f}MB  {status}")
+    if not comparisons:
+        print("  Sin etapas en común para comparar")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del analizador, reportes, alertas y umbrales con datos sintéticos")
+    parser.add_argument("--sizes", type=lambda value: int(float(value)), nargs="+", default=DEFAULT_SIZES,
+                        help="Filas por archivo sintético (10^3 a 10^7, p. ej. 1e3 1e5 1e7)")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3, help="Ejecuciones por etapa; se guarda la mediana")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", metavar="ARCHIVO", help="Resultados de otro commit contra los que comparar")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "ACTUAL"), help="Solo compara dos archivos de resultados")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Aumento porcentual permitido")
+    parser.add_argument("--min-seconds", type=float, default=0.05, help="Diferencia absoluta mínima para marcar lentitud")
+    parser.add_argument("--run-stage", choices=list(STAGES), help=argparse.SUPPRESS)
+    parser.add_argument("--rows", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--prepare-only", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        run_stage(args.run_stage, args.data_dir, args.rows, args.prepare_only)
+        return
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+    else:
+        print(f"Etapas: {', '.join(args.stages)}; tamaños: {', '.join(str(size) for size in args.sizes)}")
+        current = run_suite(args.sizes, args.stages, args.data_dir, max(1, args.repeat))
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"Resultados guardados en {args.output}")
+        if not args.baseline:
+            return
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    comparisons = compare_results(baseline, current, args.tolerance, args.min_seconds)
+    if print_comparison(comparisons, baseline, current, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,18 @@
+import argparse
 import json
 import os
 import sys
+import time
+from datetime import datetime
+
+from regression import compare_runs, load_baseline, load_run, save_baseline
+
+PERFORMANCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "performance")
+sys.path.insert(0, PERFORMANCE_DIR)
+from performance_config import REGRESSION_SETTINGS
+
+LATENCY_FILE = "reports/performance_latency.json"
+METRICS_FILE = "reports/performance_metrics.json"
 
 def check_quality_gates():
     print("Verificando umbrales de calidad...")
@@ -26,7 +38,19 @@ def check_quality_gates():
         status = "✓ PASS" if passed else "✗ FAIL"
         print(f"  {gate}: {status}")
         gate_results.append(passed)
-    
+
+    endpoints = performance_data.get("endpoints", {})
+    gated = {name: endpoint for name, endpoint in endpoints.items() if "quality_gates" in endpoint}
+    if gated:
+        print("\nVerificación por endpoint:")
+    for name, endpoint in gated.items():
+        status = "✓ PASS" if endpoint["status"] == "PASS" else "✗ FAIL"
+        print(f"  {name} [{endpoint['group']}]: {status} P95 {endpoint['p95']}ms, éxito {endpoint['success_rate']}%")
+        for gate, passed in endpoint["quality_gates"].items():
+            if not passed:
+                print(f"    {gate}: ✗ FAIL")
+        gate_results.append(endpoint["status"] == "PASS")
+
     if dashboard_file and os.path.exists(dashboard_file):
         with open(dashboard_file, 'r') as f:
             dashboard_data = json.load(f)
@@ -47,6 +71,57 @@ def check_quality_gates():
         print("✗ Algunos umbrales de calidad no se cumplieron")
         return False
 
+def check_regression(baseline_file):
+    print(f"\nComparando contra la línea base: {baseline_file}")
+    
+    if not os.path.exists(baseline_file):
+        print("  Sin línea base, se omite la verificación de regresión")
+        return True
+    if not os.path.exists(LATENCY_FILE):
+        print(f"ERROR: No se encontró {LATENCY_FILE} con los histogramas de latencia")
+        return False
+    
+    started = time.perf_counter()
+    result = compare_runs(load_baseline(baseline_file), load_run(LATENCY_FILE, METRICS_FILE), REGRESSION_SETTINGS)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    if result["status"] == "SKIP":
+        print(f"  - SKIP: {result['reason']}; registrar una línea base para este perfil")
+    
+    for name, endpoint in result["endpoints"].items():
+        if endpoint["status"] == "SKIP":
+            print(f"  {name}: - SKIP ({endpoint['reason']})")
+            continue
+        status = "✓ PASS" if endpoint["status"] == "PASS" else "✗ FAIL"
+        print(
+            f"  {name}: {status} P50 {endpoint['baseline_p50']} → {endpoint['current_p50']}ms "
+            f"({endpoint['p50_change_pct']:+.1f}%), P95 {endpoint['baseline_p95']} → {endpoint['current_p95']}ms "
+            f"({endpoint['p95_change_pct']:+.1f}%), p={endpoint['p_value']:.2g}, delta={endpoint['effect_size']:+.3f}"
+        )
+    
+    throughput = result["throughput"]
+    if throughput["status"] == "SKIP":
+        print(f"  throughput: - SKIP ({throughput['reason']})")
+    else:
+        status = "✓ PASS" if throughput["status"] == "PASS" else "✗ FAIL"
+        print(f"  throughput: {status} {throughput['baseline']} → {throughput['current']} TPS ({throughput['change_pct']:+.1f}%)")
+    
+    print(f"Regresión evaluada en {elapsed_ms:.1f}ms")
+    
+    os.makedirs("reports", exist_ok=True)
+    with open("reports/regression_report.json", "w") as f:
+        json.dump(result, f, indent=2)
+    
+    return result["status"] != "FAIL"
+
+def update_baseline(baseline_file):
+    if not os.path.exists(LATENCY_FILE):
+        print(f"ERROR: No se encontró {LATENCY_FILE} para actualizar la línea base")
+        return False
+    save_baseline(load_run(LATENCY_FILE, METRICS_FILE), baseline_file)
+    print(f"Línea base actualizada: {baseline_file}")
+    return True
+
 def generate_quality_report():
     report_html = """
     <!DOCTYPE html>
@@ -75,10 +150,21 @@ def generate_quality_report():
     
     os.makedirs("reports", exist_ok=True)
     with open("reports/quality-report.html", "w", encoding="utf-8") as f:
-        f.write(report_html.format(timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        f.write(report_html.replace("{timestamp}", datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verificación de umbrales de calidad")
+    parser.add_argument("--baseline", metavar="ARCHIVO",
+                        help="Compara la distribución de latencias por endpoint contra una ejecución base")
+    parser.add_argument("--update-baseline", metavar="ARCHIVO",
+                        help="Guarda la ejecución actual como línea base")
+    args = parser.parse_args()
+    
     success = check_quality_gates()
+    if args.baseline:
+        success = check_regression(args.baseline) and success
+    if args.update_baseline and success:
+        update_baseline(args.update_baseline)
     generate_quality_report()
     
     if not success:
@@ -0,0 +1,141 @@
+import argparse
+import csv
+import json
+import mmap
+import os
+import struct
+
+# Encabezado: firma, versión, ancho de cada registro y cantidad de registros.
+HEADER = struct.Struct("<4sHHQ")
+MAGIC = b"LCRT"
+VERSION = 1
+DEFAULT_TABLE = "data/credentials.tbl"
+
+
+def login_body(email, password):
+    return json.dumps({"email": email, "password": password}, separators=(",", ":")).encode("utf-8")
+
+
+def build_table(make_rows, output):
+    # Dos pasadas sobre el origen para no tener el millón de cuentas en
+    # memoria: la primera fija el ancho del registro, la segunda escribe.
+    # Cada registro es el cuerpo JSON del login completado con espacios (sigue
+    # siendo JSON válido) y terminado en salto de línea.
+    count = 0
+    width = 0
+    for email, password in make_rows():
+        count += 1
+        width = max(width, len(login_body(email, password)) + 1)
+    if width > 0xFFFF:
+        raise ValueError("Registro demasiado largo para la tabla de credenciales")
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, count))
+        for email, password in make_rows():
+            f.write(login_body(email, password).ljust(width - 1, b" ") + b"\n")
+    return count, width
+
+
+def read_csv_accounts(source):
+    with open(source, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            yield row["email"], row["password"]
+
+
+def generated_accounts(count):
+    # Mismo patrón que las cuentas usuarioN@ejemplo.com del servidor simulado.
+    for i in range(1, count + 1):
+        yield f"usuario{i}@ejemplo.com", f"Password{i}!23"
+
+
+class CredentialTable:
+    """Tabla de credenciales de ancho fijo mapeada en memoria y compartida entre procesos."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            # El mapeo es de solo lectura: todos los workers comparten las
+            # mismas páginas del caché del sistema, sin copias por proceso.
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.mm.close()
+            raise ValueError(f"{path} no es una tabla de credenciales válida")
+        if len(self.mm) < HEADER.size + self.width * self.count:
+            self.mm.close()
+            raise ValueError(f"{path} está truncado")
+
+    def __len__(self):
+        return self.count
+
+    def body(self, index):
+        offset = HEADER.size + index * self.width
+        return self.mm[offset:offset + self.width - 1]
+
+    def credentials(self, index):
+        return json.loads(self.body(index))
+
+    def items(self):
+        for index in range(self.count):
+            credentials = self.credentials(index)
+            yield credentials["email"], credentials["password"]
+
+    def close(self):
+        self.mm.close()
+
+
+class CredentialFeeder:
+    """Reparte cuentas de una CredentialTable sin repetirlas dentro de la partición del worker."""
+
+    def __init__(self, table):
+        self.table = table
+        self.partition(0, 1)
+
+    def partition(self, worker_index, worker_count):
+        # Cada worker recibe un tramo contiguo y disjunto de la tabla.
+        worker_index %= worker_count
+        self.start = len(self.table) * worker_index // worker_count
+        self.stop = len(self.table) * (worker_index + 1) // worker_count
+        if self.stop == self.start:
+            raise ValueError(f"La tabla de {len(self.table)} cuentas no alcanza para {worker_count} workers")
+        self.position = self.start
+        self.wraps = 0
+
+    def claim(self):
+        # Los usuarios de un worker son greenlets de un mismo hilo, así que el
+        # contador no necesita lock.
+        index = self.position
+        self.position += 1
+        if self.position == self.stop:
+            self.position = self.start
+            self.wraps += 1
+        return index
+
+    def next_body(self):
+        return self.table.body(self.claim())
+
+    def bodies(self):
+        return iter(self.next_body, None)
+
+    @property
+    def claimed(self):
+        return self.wraps * (self.stop - self.start) + self.position - self.start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construye la tabla de credenciales de ancho fijo para el locustfile")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--source", help="CSV con columnas email y password")
+    source.add_argument("--generate", type=int, metavar="N", help="Genera N cuentas usuarioN@ejemplo.com")
+    parser.add_argument("--output", default=DEFAULT_TABLE)
+    args = parser.parse_args()
+
+    if args.source:
+        count, width = build_table(lambda: read_csv_accounts(args.source), args.output)
+    else:
+        count, width = build_table(lambda: generated_accounts(args.generate), args.output)
+    print(f"Tabla de credenciales: {count} cuentas de {width} bytes en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
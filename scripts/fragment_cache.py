@@ -0,0 +1,89 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fragments (
+    key TEXT PRIMARY KEY,
+    content TEXT NOT NULL,
+    passed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_fragments_last_used ON fragments (last_used);
+"""
+
+
+class FragmentCache:
+    """Fragmentos HTML ya renderizados, indexados por el hash de su JSON de entrada."""
+
+    def __init__(self, path, max_bytes=128 * 1024 * 1024, version=""):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._used = []
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def key(self, kind, content):
+        # La versión del renderizador forma parte de la clave: si cambia la
+        # plantilla, los fragmentos anteriores dejan de coincidir.
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{self.version}|{kind}|".encode("utf-8"))
+        digest.update(content.encode("utf-8") if isinstance(content, str) else content)
+        return digest.hexdigest()
+
+    def get(self, key):
+        row = self.connection.execute(
+            "SELECT content, passed, failed FROM fragments WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.append(key)
+        return row
+
+    def put(self, key, content, passed=0, failed=0):
+        self.connection.execute(
+            "INSERT OR REPLACE INTO fragments (key, content, passed, failed, size, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, content, passed, failed, len(content), time.time())
+        )
+
+    def size(self):
+        return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM fragments").fetchone()[0]
+
+    def evict(self):
+        # LRU por tamaño: se borran los fragmentos usados hace más tiempo
+        # hasta quedar bajo el límite.
+        excess = self.size() - self.max_bytes
+        if excess <= 0:
+            return 0
+        evicted = 0
+        rows = self.connection.execute("SELECT key, size FROM fragments ORDER BY last_used").fetchall()
+        for key, size in rows:
+            if excess <= 0:
+                break
+            self.connection.execute("DELETE FROM fragments WHERE key = ?", (key,))
+            excess -= size
+            evicted += 1
+        return evicted
+
+    def close(self):
+        now = time.time()
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE fragments SET last_used = ? WHERE key = ?", ((now, key) for key in self._used)
+            )
+            evicted = self.evict()
+        if evicted:
+            self.connection.execute("VACUUM")
+        self.connection.close()
+        return evicted
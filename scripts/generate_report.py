@@ -1,200 +1,390 @@
+import argparse
+import html
 import json
 import os
+import shutil
+import tempfile
 from datetime import datetime
 import subprocess
 
-def generate_html_report():
-    report_data = {
-        "titulo": "Reporte de Pruebas BDD",
-        "fecha": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "resumen": {
-            "total": 0,
-            "pasadas": 0,
-            "falladas": 0,
-            "omitidas": 0
-        },
-        "escenarios": []
-    }
+from fragment_cache import FragmentCache
+
+CHUNK_SIZE = 1024 * 1024
+PAGE_SIZE = 100
+CACHE_FILE = "reports/.report-cache/fragments.db"
+# Se incrementa al cambiar render_scenario para invalidar la caché.
+RENDER_VERSION = "1"
+
+HEADER_TEMPLATE = """<!DOCTYPE html>
+<html lang="es">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{titulo}</title>
+    <style>
+        body {{
+            font-family: Arial, sans-serif;
+            margin: 20px;
+            background-color: #f5f5f5;
+        }}
+        .header {{
+            background-color: #2c3e50;
+            color: white;
+            padding: 20px;
+            border-radius: 5px;
+        }}
+        .summary {{
+            display: flex;
+            gap: 20px;
+            margin: 20px 0;
+        }}
+        .summary-card {{
+            background: white;
+            padding: 15px;
+            border-radius: 5px;
+            flex: 1;
+            text-align: center;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        .passed {{ color: #27ae60; }}
+        .failed {{ color: #e74c3c; }}
+        .skipped {{ color: #95a5a6; }}
+        .toolbar {{
+            display: flex;
+            gap: 10px;
+            align-items: center;
+            margin: 10px 0;
+        }}
+        .scenario {{
+            background: white;
+            margin: 10px 0;
+            padding: 15px;
+            border-radius: 5px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }}
+        .scenario-header {{
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            cursor: pointer;
+        }}
+        #scenarios:not(.ready) > .scenario:nth-child(n+{first_hidden}) {{
+            display: none;
+        }}
+        .feature {{
+            color: #7f8c8d;
+            font-size: 12px;
+        }}
+        .steps {{
+            margin-left: 20px;
+            margin-top: 10px;
+        }}
+        .step {{
+            padding: 5px 0;
+            border-left: 3px solid #ecf0f1;
+            padding-left: 10px;
+            margin: 5px 0;
+        }}
+        .step.passed {{
+            border-left-color: #27ae60;
+        }}
+        .step.failed {{
+            border-left-color: #e74c3c;
+        }}
+        .error {{
+            background: #ffe4e4;
+            padding: 10px;
+            margin: 5px 0;
+            border-radius: 3px;
+            font-size: 12px;
+            white-space: pre-wrap;
+        }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>{titulo}</h1>
+        <p>Generado: {fecha}</p>
+    </div>
     
-    result_file = "reports/behave-results.json"
-    if os.path.exists(result_file):
-        with open(result_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
-            
-            for feature in results:
-                for scenario in feature.get('elements', []):
-                    report_data["resumen"]["total"] += 1
-                    
-                    scenario_data = {
-                        "nombre": scenario.get('name', 'Sin nombre'),
-                        "estado": "pasado",
-                        "duracion": 0,
-                        "pasos": []
-                    }
-                    
-                    for step in scenario.get('steps', []):
-                        step_duration = step.get('result', {}).get('duration', 0)
-                        scenario_data["duracion"] += step_duration
-                        
-                        step_data = {
-                            "nombre": step.get('name', ''),
-                            "estado": step.get('result', {}).get('status', 'skipped')
-                        }
-                        
-                        if step_data["estado"] == "failed":
-                            scenario_data["estado"] = "fallado"
-                            step_data["error"] = step.get('result', {}).get('error_message', '')
-                        
-                        scenario_data["pasos"].append(step_data)
-                    
-                    if scenario_data["estado"] == "pasado":
-                        report_data["resumen"]["pasadas"] += 1
-                    else:
-                        report_data["resumen"]["falladas"] += 1
-                    
-                    report_data["escenarios"].append(scenario_data)
+    <div class="summary">
+        <div class="summary-card">
+            <h3>Total</h3>
+            <h2>{total}</h2>
+        </div>
+        <div class="summary-card">
+            <h3 class="passed">Pasadas</h3>
+            <h2 class="passed">{pasadas}</h2>
+        </div>
+        <div class="summary-card">
+            <h3 class="failed">Falladas</h3>
+            <h2 class="failed">{falladas}</h2>
+        </div>
+    </div>
     
-    html_template = """
-    <!DOCTYPE html>
-    <html lang="es">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{titulo}</title>
-        <style>
-            body {{
-                font-family: Arial, sans-serif;
-                margin: 20px;
-                background-color: #f5f5f5;
-            }}
-            .header {{
-                background-color: #2c3e50;
-                color: white;
-                padding: 20px;
-                border-radius: 5px;
-            }}
-            .summary {{
-                display: flex;
-                gap: 20px;
-                margin: 20px 0;
-            }}
-            .summary-card {{
-                background: white;
-                padding: 15px;
-                border-radius: 5px;
-                flex: 1;
-                text-align: center;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .passed {{ color: #27ae60; }}
-            .failed {{ color: #e74c3c; }}
-            .skipped {{ color: #95a5a6; }}
-            .scenario {{
-                background: white;
-                margin: 10px 0;
-                padding: 15px;
-                border-radius: 5px;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .scenario-header {{
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 10px;
-            }}
-            .steps {{
-                margin-left: 20px;
-            }}
-            .step {{
-                padding: 5px 0;
-                border-left: 3px solid #ecf0f1;
-                padding-left: 10px;
-                margin: 5px 0;
-            }}
-            .step.passed {{
-                border-left-color: #27ae60;
-            }}
-            .step.failed {{
-                border-left-color: #e74c3c;
-            }}
-            .error {{
-                background: #ffe4e4;
-                padding: 10px;
-                margin: 5px 0;
-                border-radius: 3px;
-                font-size: 12px;
+    <div class="toolbar">
+        <select id="filter">
+            <option value="all">Todos los escenarios</option>
+            <option value="failed">Solo fallados</option>
+        </select>
+        <button id="prev">Anterior</button>
+        <span id="page-info"></span>
+        <button id="next">Siguiente</button>
+    </div>
+    
+    <div class="scenarios" id="scenarios">
+"""
+
+# Los pasos de cada escenario van en un <template>: el navegador no los
+# dibuja hasta que se expande el escenario, y solo la página actual de
+# escenarios es visible.
+FOOTER_TEMPLATE = """    </div>
+    <script>
+        (function () {{
+            var pageSize = {page_size};
+            var page = 0;
+            var all = Array.prototype.slice.call(document.querySelectorAll("#scenarios > .scenario"));
+            var filter = document.getElementById("filter");
+            var selected = all;
+
+            function render() {{
+                var pages = Math.max(1, Math.ceil(selected.length / pageSize));
+                page = Math.min(page, pages - 1);
+                all.forEach(function (element) {{ element.hidden = true; }});
+                selected.slice(page * pageSize, (page + 1) * pageSize).forEach(function (element) {{
+                    element.hidden = false;
+                }});
+                document.getElementById("scenarios").classList.add("ready");
+                document.getElementById("page-info").textContent =
+                    "Página " + (page + 1) + " de " + pages + " (" + selected.length + " escenarios)";
             }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>{titulo}</h1>
-            <p>Generado: {fecha}</p>
-        </div>
+
+            filter.addEventListener("change", function () {{
+                selected = filter.value === "failed"
+                    ? all.filter(function (element) {{ return element.dataset.status === "failed"; }})
+                    : all;
+                page = 0;
+                render();
+            }});
+            document.getElementById("prev").addEventListener("click", function () {{
+                page = Math.max(0, page - 1);
+                render();
+            }});
+            document.getElementById("next").addEventListener("click", function () {{
+                page += 1;
+                render();
+            }});
+            document.getElementById("scenarios").addEventListener("click", function (event) {{
+                var header = event.target.closest(".scenario-header");
+                if (!header) {{
+                    return;
+                }}
+                var scenario = header.parentNode;
+                var steps = scenario.querySelector(".steps");
+                if (steps) {{
+                    steps.hidden = !steps.hidden;
+                    return;
+                }}
+                var template = scenario.querySelector("template");
+                scenario.appendChild(template.content.cloneNode(true));
+            }});
+
+            render();
+        }})();
+    </script>
+</body>
+</html>
+"""
+
+
+def iter_json_array(path, chunk_size=CHUNK_SIZE, raw=False):
+    # Lee un arreglo JSON elemento por elemento: solo se mantiene en memoria
+    # el elemento actual (un feature) y el bloque de texto pendiente. Con
+    # raw=True también entrega el texto original de cada elemento.
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer:
+            return
+        if not buffer.startswith('['):
+            raise ValueError(f"Se esperaba un arreglo JSON en {path}")
+        position = 1
+        eof = False
         
-        <div class="summary">
-            <div class="summary-card">
-                <h3>Total</h3>
-                <h2>{total}</h2>
-            </div>
-            <div class="summary-card">
-                <h3 class="passed">Pasadas</h3>
-                <h2 class="passed">{pasadas}</h2>
-            </div>
-            <div class="summary-card">
-                <h3 class="failed">Falladas</h3>
-                <h2 class="failed">{falladas}</h2>
-            </div>
-        </div>
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position == len(buffer):
+                if eof:
+                    return
+                chunk = f.read(chunk_size)
+                buffer, position, eof = chunk, 0, not chunk
+                continue
+            if buffer[position] == ']':
+                return
+            
+            start = position
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # Elemento incompleto: se lee al menos lo que ya hay en el
+                # búfer para que un feature grande no se decodifique de nuevo
+                # en cada bloque.
+                chunk = f.read(max(chunk_size, len(buffer) - position))
+                buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+                continue
+            
+            yield (item, buffer[start:position]) if raw else item
+            if position > chunk_size:
+                buffer, position = buffer[position:], 0
+
+
+def iter_feature_elements(feature):
+    # Cada escenario se entrega junto con los pasos del background que lo
+    # precede en el JSON de behave.
+    background_steps = []
+    for element in feature.get('elements', []):
+        if element.get('type') == 'background':
+            background_steps = element.get('steps', [])
+            continue
+        yield background_steps, element
+        background_steps = []
+
+
+def build_scenario(feature_name, background_steps, element):
+    scenario_data = {
+        "feature": feature_name,
+        "nombre": element.get('name', 'Sin nombre'),
+        "estado": "pasado",
+        "duracion": 0,
+        "pasos": []
+    }
+    
+    for step in background_steps + element.get('steps', []):
+        result = step.get('result', {})
+        scenario_data["duracion"] += result.get('duration', 0)
         
-        <div class="scenarios">
-            {scenarios_html}
-        </div>
-    </body>
-    </html>
-    """
+        step_data = {
+            "nombre": f"{step.get('keyword', '')} {step.get('name', '')}".strip(),
+            "estado": result.get('status', 'skipped')
+        }
+        
+        if step_data["estado"] == "failed":
+            scenario_data["estado"] = "fallado"
+            error = result.get('error_message', '')
+            step_data["error"] = "\n".join(error) if isinstance(error, list) else error
+        
+        scenario_data["pasos"].append(step_data)
     
-    scenarios_html = ""
-    for scenario in report_data["escenarios"]:
-        status_class = "passed" if scenario["estado"] == "pasado" else "failed"
-        steps_html = ""
+    return scenario_data
+
+
+def iter_scenarios(result_file):
+    for feature in iter_json_array(result_file):
+        for background_steps, element in iter_feature_elements(feature):
+            yield build_scenario(feature.get('name', ''), background_steps, element)
+
+
+def render_scenario(scenario):
+    status_class = "passed" if scenario["estado"] == "pasado" else "failed"
+    parts = [
+        f'<div class="scenario" data-status="{status_class}">',
+        '<div class="scenario-header">',
+        f'<div><h3>{html.escape(scenario["nombre"])}</h3>'
+        f'<span class="feature">{html.escape(scenario["feature"])} · {scenario["duracion"]:.2f}s</span></div>',
+        f'<span class="{status_class}">{"✓" if scenario["estado"] == "pasado" else "✗"} {scenario["estado"].upper()}</span>',
+        '</div>',
+        '<template><div class="steps">'
+    ]
+    for step in scenario["pasos"]:
+        step_class = "passed" if step["estado"] == "passed" else "failed" if step["estado"] == "failed" else "skipped"
+        parts.append(f'<div class="step {step_class}">{html.escape(step["nombre"])}')
+        if step.get("error"):
+            parts.append(f'<div class="error">{html.escape(step["error"])}</div>')
+        parts.append('</div>')
+    parts.append('</div></template></div>\n')
+    return "".join(parts)
+
+
+def render_feature(feature, cache=None):
+    feature_name = feature.get('name', '')
+    fragments = []
+    passed = failed = 0
+    
+    for background_steps, element in iter_feature_elements(feature):
+        cached = None
+        if cache is not None:
+            key = cache.key("scenario", json.dumps([feature_name, background_steps, element]))
+            cached = cache.get(key)
         
-        for step in scenario["pasos"]:
-            step_class = "passed" if step["estado"] == "passed" else "failed"
-            error_html = f'<div class="error">{step.get("error", "")}</div>' if step.get("error") else ""
-            steps_html += f'''
-                <div class="step {step_class}">
-                    {step["nombre"]}
-                    {error_html}
-                </div>
-            '''
+        if cached is not None:
+            fragment, scenario_passed, scenario_failed = cached
+        else:
+            scenario = build_scenario(feature_name, background_steps, element)
+            fragment = render_scenario(scenario)
+            scenario_passed = int(scenario["estado"] == "pasado")
+            scenario_failed = 1 - scenario_passed
+            if cache is not None:
+                cache.put(key, fragment, scenario_passed, scenario_failed)
         
-        scenarios_html += f'''
-            <div class="scenario">
-                <div class="scenario-header">
-                    <h3>{scenario["nombre"]}</h3>
-                    <span class="{status_class}">{"✓" if scenario["estado"] == "pasado" else "✗"} {scenario["estado"].upper()}</span>
-                </div>
-                <div class="steps">
-                    {steps_html}
-                </div>
-            </div>
-        '''
+        fragments.append(fragment)
+        passed += scenario_passed
+        failed += scenario_failed
     
-    html_content = html_template.format(
-        titulo=report_data["titulo"],
-        fecha=report_data["fecha"],
-        total=report_data["resumen"]["total"],
-        pasadas=report_data["resumen"]["pasadas"],
-        falladas=report_data["resumen"]["falladas"],
-        scenarios_html=scenarios_html
-    )
+    return "".join(fragments), passed, failed
+
+
+def generate_html_report(result_file="reports/behave-results.json", output_file="reports/bdd-report.html",
+                         cache_file=CACHE_FILE):
+    summary = {"total": 0, "pasadas": 0, "falladas": 0, "omitidas": 0}
+    
+    output_dir = os.path.dirname(output_file) or "."
+    os.makedirs(output_dir, exist_ok=True)
+    cache = FragmentCache(cache_file, version=RENDER_VERSION) if cache_file else None
     
-    os.makedirs("reports", exist_ok=True)
-    with open("reports/bdd-report.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
+    # Los escenarios se escriben a un archivo temporal mientras se cuentan;
+    # el resumen va al principio de la página, así que se arma al final.
+    # Un feature cuyo JSON no cambió se copia entero desde la caché; en uno
+    # que cambió solo se vuelven a renderizar los escenarios distintos.
+    with tempfile.TemporaryFile("w+", encoding="utf-8", dir=output_dir) as body:
+        if os.path.exists(result_file):
+            for feature, raw_feature in iter_json_array(result_file, raw=True):
+                cached = None
+                if cache is not None:
+                    key = cache.key("feature", raw_feature)
+                    cached = cache.get(key)
+                
+                if cached is not None:
+                    fragment, passed, failed = cached
+                else:
+                    fragment, passed, failed = render_feature(feature, cache)
+                    if cache is not None:
+                        cache.put(key, fragment, passed, failed)
+                
+                body.write(fragment)
+                summary["total"] += passed + failed
+                summary["pasadas"] += passed
+                summary["falladas"] += failed
+        
+        body.seek(0)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(HEADER_TEMPLATE.format(
+                titulo="Reporte de Pruebas BDD",
+                fecha=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                first_hidden=PAGE_SIZE + 1,
+                **summary
+            ))
+            shutil.copyfileobj(body, f, CHUNK_SIZE)
+            f.write(FOOTER_TEMPLATE.format(page_size=PAGE_SIZE))
+    
+    if cache is not None:
+        print(f"Fragmentos reutilizados: {cache.hits}, renderizados: {cache.misses}")
+        cache.close()
     
-    print("Reporte HTML generado: reports/bdd-report.html")
+    print(f"Reporte HTML generado: {output_file} ({summary['total']} escenarios)")
+    return summary
 
 def generate_allure_report():
     try:
@@ -211,5 +401,12 @@ def generate_allure_report():
         print("Allure no está instalado. Instálelo con: npm install -g allure-commandline")
 
 if __name__ == "__main__":
-    generate_html_report()
+    parser = argparse.ArgumentParser(description="Generador de reportes de pruebas BDD")
+    parser.add_argument("--results", default="reports/behave-results.json")
+    parser.add_argument("--output", default="reports/bdd-report.html")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Renderiza todo el reporte sin usar la caché de fragmentos")
+    args = parser.parse_args()
+    
+    generate_html_report(args.results, args.output, None if args.no_cache else CACHE_FILE)
     generate_allure_report()
\ No newline at end of file
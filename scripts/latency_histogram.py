@@ -0,0 +1,152 @@
+import math
+
+
+class LatencyHistogram:
+    """Histograma logarítmico de latencias (estilo DDSketch).
+
+    Cada valor registrado cae en un bucket cuyo representante tiene un error
+    relativo máximo de ``relative_accuracy``. El número de buckets depende
+    solo del rango [min_value, max_value], por lo que la memoria es fija sin
+    importar cuántas muestras se registren, y dos histogramas con la misma
+    configuración se pueden combinar sumando sus contadores.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=0.01, max_value=3600000.0):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy debe estar entre 0 y 1")
+        if not 0 < min_value < max_value:
+            raise ValueError("Se requiere 0 < min_value < max_value")
+
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._offset = int(math.ceil(math.log(min_value) / self._log_gamma))
+        bucket_count = int(math.ceil(math.log(max_value) / self._log_gamma)) - self._offset + 1
+        self._counts = [0] * (bucket_count + 1)
+
+        self.total_count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        if value <= self.min_value:
+            return 0
+        if value >= self.max_value:
+            return len(self._counts) - 1
+        return int(math.ceil(math.log(value) / self._log_gamma)) - self._offset + 1
+
+    def _value_at(self, index):
+        if index == 0:
+            return self.min_value
+        exponent = index + self._offset - 1
+        return 2 * self._gamma ** exponent / (self._gamma + 1)
+
+    def record(self, value, count=1):
+        if count <= 0:
+            return
+        value = float(value)
+        self._counts[self._index(value)] += count
+        self.total_count += count
+        self.sum += value * count
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def record_corrected(self, value, expected_interval, count=1):
+        # Corrección de omisión coordinada (como recordValueWithExpectedInterval
+        # de HdrHistogram): si la respuesta tardó más que el intervalo con que
+        # el usuario habría enviado peticiones, se agregan las muestras de las
+        # peticiones que no salieron mientras esperaba.
+        self.record(value, count)
+        if expected_interval <= 0:
+            return
+        missing = value - expected_interval
+        while missing >= expected_interval:
+            self.record(missing, count)
+            missing -= expected_interval
+
+    def merge(self, other):
+        if not self.is_compatible(other):
+            raise ValueError("No se pueden combinar histogramas con distinta configuración")
+        for index, count in enumerate(other._counts):
+            if count:
+                self._counts[index] += count
+        self.total_count += other.total_count
+        self.sum += other.sum
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    def is_compatible(self, other):
+        return (
+            self.relative_accuracy == other.relative_accuracy
+            and self.min_value == other.min_value
+            and self.max_value == other.max_value
+        )
+
+    def mean(self):
+        return self.sum / self.total_count if self.total_count else 0.0
+
+    def percentile(self, percentile):
+        return self.percentiles([percentile])[percentile]
+
+    def percentiles(self, percentiles):
+        results = {p: 0.0 for p in percentiles}
+        if not self.total_count:
+            return results
+
+        pending = sorted(percentiles)
+        position = 0
+        cumulative = 0
+        for index, count in enumerate(self._counts):
+            if not count:
+                continue
+            cumulative += count
+            while position < len(pending) and cumulative > pending[position] / 100.0 * (self.total_count - 1):
+                results[pending[position]] = self._clamp(self._value_at(index))
+                position += 1
+            if position == len(pending):
+                break
+        return results
+
+    def _clamp(self, value):
+        return min(max(value, self.min), self.max)
+
+    def buckets(self):
+        for index, count in enumerate(self._counts):
+            if count:
+                yield self._value_at(index), count
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "min_value": self.min_value,
+            "max_value": self.max_value,
+            "total_count": self.total_count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "counts": {str(index): count for index, count in enumerate(self._counts) if count}
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls(
+            relative_accuracy=data["relative_accuracy"],
+            min_value=data["min_value"],
+            max_value=data["max_value"]
+        )
+        for index, count in data.get("counts", {}).items():
+            histogram._counts[int(index)] += count
+        histogram.total_count = data.get("total_count", 0)
+        histogram.sum = data.get("sum", 0.0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        return histogram
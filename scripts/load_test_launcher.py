@@ -0,0 +1,117 @@
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+import sys
+
+PERFORMANCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "performance")
+sys.path.insert(0, PERFORMANCE_DIR)
+from load_shapes import get_profile, parse_duration
+
+
+def build_master_command(args, workers):
+    return [
+        "locust", "-f", args.locustfile,
+        "--master", "--headless",
+        "--expect-workers", str(workers),
+        "--master-bind-port", str(args.master_port),
+        "--host", args.host,
+        "--csv", args.csv_prefix,
+        "--csv-full-history",
+        "--html", args.html
+    ]
+
+
+def build_worker_command(args):
+    return [
+        "locust", "-f", args.locustfile,
+        "--worker",
+        "--master-host", "127.0.0.1",
+        "--master-port", str(args.master_port)
+    ]
+
+
+def merge_request_logs(pattern, output):
+    parts = sorted(glob.glob(pattern))
+    if not parts:
+        return
+
+    with open(output, "wb") as merged:
+        for index, part in enumerate(parts):
+            with open(part, "rb") as f:
+                header = f.readline()
+                if index == 0:
+                    merged.write(header)
+                shutil.copyfileobj(f, merged, 1024 * 1024)
+            os.remove(part)
+    print(f"Log de peticiones combinado: {output} ({len(parts)} workers)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lanza una prueba de carga distribuida según un perfil de LOAD_TEST_SCENARIOS")
+    parser.add_argument("--profile", default="smoke")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="http://localhost:8080")
+    parser.add_argument("--locustfile", default=os.path.join("tests", "performance", "locustfile.py"))
+    parser.add_argument("--csv-prefix", default="reports/performance")
+    parser.add_argument("--html", default="reports/performance-report.html")
+    parser.add_argument("--master-port", type=int, default=5557)
+    parser.add_argument("--request-log", default=os.environ.get("REQUEST_LOG"))
+    parser.add_argument("--mode", choices=["standard", "fast"], default=os.environ.get("LOCUST_MODE", "standard"),
+                        help="Clases de usuario: HttpUser (standard) o FastHttpUser (fast)")
+    parser.add_argument("--arrival-rate", type=float, default=float(os.environ.get("ARRIVAL_RATE", "0")),
+                        help="Iteraciones por segundo a sostener (modelo abierto); el perfil solo aporta la duración")
+    parser.add_argument("--session-users", action="store_true", default=os.environ.get("SESSION_USERS") == "1",
+                        help="Agrega SessionUser (usuarios que reutilizan su token) a la mezcla del perfil")
+    args = parser.parse_args()
+
+    profile = get_profile(args.profile)
+    duration = parse_duration(profile["duration"])
+    workers = max(1, args.workers)
+    print(f"Perfil '{args.profile}': {profile['users']} usuarios, {profile['spawn_rate']}/s, "
+          f"{profile['duration']} con {workers} workers")
+
+    os.makedirs(os.path.dirname(args.csv_prefix) or ".", exist_ok=True)
+    env = dict(os.environ, LOAD_PROFILE=args.profile, LOCUST_MODE=args.mode)
+    if args.arrival_rate:
+        env["ARRIVAL_RATE"] = str(args.arrival_rate)
+        print(f"Tasa de llegadas: {args.arrival_rate:g}/s; los usuarios se dimensionan con la latencia medida")
+    if args.session_users:
+        env["SESSION_USERS"] = "1"
+        print("Usuarios con sesión activados: la mezcla de peticiones no es comparable con líneas base sin ellos")
+    env.pop("REQUEST_LOG", None)
+
+    master = subprocess.Popen(build_master_command(args, workers), env=env)
+
+    worker_processes = []
+    for worker_id in range(workers):
+        worker_env = dict(env)
+        if args.request_log:
+            # Cada worker escribe su propio log; se combinan al terminar.
+            worker_env["REQUEST_LOG"] = f"{args.request_log}.worker-{worker_id}"
+        worker_processes.append(subprocess.Popen(build_worker_command(args), env=worker_env))
+
+    try:
+        # Margen para el arranque de los workers y el envío final de estadísticas.
+        exit_code = master.wait(timeout=duration + 120)
+    except subprocess.TimeoutExpired:
+        print("El master no terminó a tiempo, deteniendo la prueba")
+        master.terminate()
+        exit_code = master.wait()
+
+    for process in worker_processes:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.terminate()
+            process.wait()
+
+    if args.request_log:
+        merge_request_logs(f"{args.request_log}.worker-*", args.request_log)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
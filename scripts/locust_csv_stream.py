@@ -0,0 +1,110 @@
+import csv
+import io
+import os
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+REQUEST_LOG_COLUMNS = ["timestamp", "type", "name", "response_time", "success", "corrected_response_time", "expected_interval"]
+
+
+class CsvChunkReader:
+    """Lee un CSV grande por bloques de bytes y entrega columnas.
+
+    Cada iteración devuelve un dict ``columna -> lista de strings`` con solo
+    las columnas pedidas, de modo que la memoria queda acotada por
+    ``chunk_bytes`` y no por el tamaño del archivo. ``offset`` guarda la
+    posición en bytes del último bloque completo para poder retomar la
+    lectura más tarde; con ``follow`` una última línea sin salto de línea se
+    considera a medio escribir y se deja para la siguiente lectura.
+    """
+
+    def __init__(self, path, columns=None, chunk_bytes=DEFAULT_CHUNK_BYTES, offset=0, follow=False):
+        self.path = path
+        self.columns = columns
+        self.chunk_bytes = chunk_bytes
+        self.offset = offset
+        self.follow = follow
+        self.header = None
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            header_line = f.readline()
+            if not header_line:
+                return
+            self.header = next(csv.reader([header_line.decode("utf-8-sig")]))
+
+            columns = self.columns or self.header
+            missing = [column for column in columns if column not in self.header]
+            if missing:
+                raise ValueError(f"Columnas no encontradas en {self.path}: {', '.join(missing)}")
+            indexes = [self.header.index(column) for column in columns]
+
+            if self.offset > f.tell():
+                f.seek(self.offset)
+            self.offset = f.tell()
+
+            while True:
+                lines = f.readlines(self.chunk_bytes)
+                if not lines:
+                    break
+                if self.follow and not lines[-1].endswith(b"\n"):
+                    lines.pop()
+                    if not lines:
+                        break
+                    f.seek(self.offset + sum(len(line) for line in lines))
+
+                self.offset = f.tell()
+                chunk = self._parse_block(b"".join(lines).decode("utf-8"), columns, indexes)
+                if chunk:
+                    yield chunk
+
+    def _parse_block(self, text, columns, indexes):
+        width = len(self.header)
+        # Camino rápido: sin comillas cada fila tiene exactamente ``width``
+        # campos, así que el bloque se parte una sola vez y cada columna es
+        # un slice con paso ``width``.
+        if "\r\n" in text:
+            text = text.replace("\r\n", "\n")
+        if '"' not in text and "\r" not in text:
+            body = text[:-1] if text.endswith("\n") else text
+            rows = body.count("\n") + 1
+            fields = body.replace("\n", ",").split(",")
+            if len(fields) == rows * width:
+                return {column: fields[index::width] for column, index in zip(columns, indexes)}
+
+        rows = list(csv.reader(io.StringIO(text)))
+        if not rows:
+            return None
+        return {
+            column: [row[index] if index < len(row) else "" for row in rows]
+            for column, index in zip(columns, indexes)
+        }
+
+
+class RequestLogWriter:
+    def __init__(self, path, buffer_size=1024 * 1024):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", buffering=buffer_size, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file, lineterminator="\n")
+        if new_file:
+            self._writer.writerow(REQUEST_LOG_COLUMNS)
+
+    def write(self, timestamp, request_type, name, response_time, success, corrected=None):
+        # ``corrected`` es el par (latencia, intervalo esperado) de la
+        # corrección de omisión coordinada; sin usuario asociado queda vacío.
+        corrected_time, expected_interval = corrected if corrected is not None else (None, None)
+        self._writer.writerow((
+            f"{timestamp:.3f}",
+            request_type,
+            name,
+            f"{response_time:.1f}",
+            "1" if success else "0",
+            f"{corrected_time:.1f}" if corrected_time is not None else "",
+            f"{expected_interval:.1f}" if expected_interval is not None else ""
+        ))
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,409 @@
+import argparse
+import asyncio
+import html
+import json
+import math
+import random
+import re
+import secrets
+import signal
+import time
+from collections import OrderedDict
+
+from credential_feeder import CredentialTable
+from latency_histogram import LatencyHistogram
+
+# Cuentas de features/login.feature, three_amigos_session.md y el locustfile.
+DEFAULT_USERS = dict(
+    [("usuario@ejemplo.com", "ContraseñaSegura123!"), ("juan@email.com", "MiClave123!")]
+    + [(f"usuario{i}@ejemplo.com", f"Password{i}!23") for i in range(1, 11)]
+)
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+MIN_PASSWORD_LENGTH = 8
+REMEMBER_SECONDS = 30 * 24 * 3600
+
+MESSAGES = {
+    "invalid_email": "Formato de email inválido",
+    "short_password": "La contraseña debe tener mínimo 8 caracteres",
+    "invalid_credentials": "Email o contraseña incorrectos",
+    "locked": "Cuenta bloqueada temporalmente. Intente en 15 minutos",
+    "injected": "Error inyectado por el servidor de prueba"
+}
+
+REASONS = {
+    200: "OK", 302: "Found", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+    423: "Locked", 500: "Internal Server Error", 502: "Bad Gateway", 503: "Service Unavailable",
+    504: "Gateway Timeout"
+}
+
+# Grupo de latencia y errores de cada ruta; coinciden con ENDPOINT_GROUPS
+# salvo "page", que agrupa las páginas HTML de las pruebas BDD.
+ROUTE_GROUPS = {
+    "/api/login": "login",
+    "/api/session": "session",
+    "/login": "page",
+    "/dashboard": "page"
+}
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="UTF-8"><title>Iniciar sesión</title></head>
+<body>
+    <h1>Iniciar sesión</h1>
+    <form id="loginForm" novalidate onsubmit="return false;">
+        <input id="email" type="email" placeholder="Email">
+        <input id="password" type="password" placeholder="Contraseña">
+        <label><input id="remember" type="checkbox"> Recordar sesión</label>
+        <button id="loginButton" type="button">Iniciar sesión</button>
+    </form>
+    <div id="messages"></div>
+    <script>
+    // Cada respuesta crea un elemento nuevo para que las pruebas detecten
+    // el mensaje sin confundirlo con el del intento anterior.
+    function show(className, text) {
+        var messages = document.getElementById('messages');
+        messages.innerHTML = '';
+        var element = document.createElement('div');
+        element.className = className;
+        element.textContent = text;
+        messages.appendChild(element);
+    }
+    document.getElementById('loginButton').addEventListener('click', function () {
+        fetch('/api/login', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            credentials: 'same-origin',
+            body: JSON.stringify({
+                email: document.getElementById('email').value,
+                password: document.getElementById('password').value,
+                remember: document.getElementById('remember').checked
+            })
+        }).then(function (response) {
+            return response.json().then(function (data) { return [response.status, data]; });
+        }).then(function (result) {
+            if (result[0] === 200) {
+                window.location.href = result[1].redirect;
+            } else {
+                show(result[0] === 423 ? 'welcome-message' : 'error-message', result[1].error);
+            }
+        }).catch(function () {
+            show('error-message', 'Error de conexión');
+        });
+    });
+    </script>
+</body>
+</html>
+""".encode("utf-8")
+
+DASHBOARD_PAGE = """<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="UTF-8"><title>Dashboard</title></head>
+<body><h1 class="welcome-message">Bienvenido, {email}</h1></body>
+</html>
+"""
+
+
+def parse_distribution(spec, rng):
+    # fixed:MS, uniform:MIN:MAX, normal:MEDIA:DESVIO, lognormal:MEDIANA:SIGMA,
+    # exponential:MEDIA. Todos los valores en milisegundos.
+    kind, _, values = spec.partition(":")
+    try:
+        params = [float(value) for value in values.split(":")] if values else []
+    except ValueError:
+        raise ValueError(f"Parámetros no numéricos en la distribución '{spec}'")
+    expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}
+    if kind not in expected:
+        raise ValueError(f"Distribución desconocida '{kind}'; use {', '.join(expected)}")
+    if len(params) != expected[kind]:
+        raise ValueError(f"La distribución '{kind}' requiere {expected[kind]} parámetros")
+
+    if kind == "fixed":
+        value = params[0]
+        return lambda: value
+    if kind == "uniform":
+        low, high = params
+        return lambda: rng.uniform(low, high)
+    if kind == "normal":
+        mean, deviation = params
+        return lambda: max(0.0, rng.gauss(mean, deviation))
+    if kind == "lognormal":
+        if params[0] <= 0:
+            raise ValueError("La mediana de 'lognormal' debe ser mayor que 0")
+        mu, sigma = math.log(params[0]), params[1]
+        return lambda: rng.lognormvariate(mu, sigma)
+    mean = params[0]
+    return lambda: rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+
+
+def parse_assignment(value):
+    group, separator, spec = value.partition("=")
+    if not separator:
+        raise ValueError(f"Se esperaba GRUPO=VALOR, recibido '{value}'")
+    return group.strip(), spec.strip()
+
+
+class LoginStubServer:
+    """Sustituto local del servicio de login para pruebas BDD y de carga sin la aplicación real."""
+
+    def __init__(self, users=None, latencies=None, errors=None, max_attempts=3, lockout_seconds=900,
+                 session_seconds=1800, max_sessions=100000, seed=None, audit_log=None):
+        self.users = users if users is not None else DEFAULT_USERS
+        self.rng = random.Random(seed)
+        self.latencies = {group: parse_distribution(spec, self.rng) for group, spec in (latencies or {}).items()}
+        self.errors = errors or {}
+        self.max_attempts = max_attempts
+        self.lockout_seconds = lockout_seconds
+        self.session_seconds = session_seconds
+        self.max_sessions = max_sessions
+        self.audit = open(audit_log, "a", buffering=64 * 1024, encoding="utf-8") if audit_log else None
+        self.server = None
+        self.reset()
+
+    def reset(self):
+        self.failures = {}
+        self.locked_until = {}
+        self.sessions = OrderedDict()
+        self.counts = {}
+        self.injected_errors = {}
+        self.injected_latency = {}
+        self.started = time.time()
+
+    async def handle_connection(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        ip = peer[0] if peer else "-"
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head[:-4].split(b"\r\n")
+                method, path, version = lines[0].decode("latin-1").split(" ", 2)
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(b":")
+                    headers[name.strip().lower()] = value.strip().decode("latin-1")
+                length = int(headers.get(b"content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                status, extra_headers, content_type, payload = await self.dispatch(method, path.split("?", 1)[0], headers, body, ip)
+                keep_alive = version == "HTTP/1.1" and headers.get(b"connection", "").lower() != "close"
+                head_lines = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(payload)}"
+                ]
+                head_lines.extend(extra_headers)
+                if not keep_alive:
+                    head_lines.append("Connection: close")
+                writer.write(("\r\n".join(head_lines) + "\r\n\r\n").encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, path, headers, body, ip):
+        if path == "/__stats":
+            return 200, [], "application/json", json.dumps(self.stats(), indent=2).encode("utf-8")
+        if path == "/__reset" and method == "POST":
+            self.reset()
+            return 200, [], "application/json", b'{"reset": true}'
+
+        group = ROUTE_GROUPS.get(path)
+        if group is None:
+            if path == "/":
+                return 302, ["Location: /login"], "text/plain", b""
+            return self._count(path, 404, "text/plain", b"No encontrado")
+
+        delay = self.latencies.get(group) or self.latencies.get("*")
+        if delay is not None:
+            milliseconds = delay()
+            histogram = self.injected_latency.get(group)
+            if histogram is None:
+                histogram = self.injected_latency[group] = LatencyHistogram()
+            histogram.record(milliseconds)
+            if milliseconds > 0:
+                await asyncio.sleep(milliseconds / 1000.0)
+
+        error = self.errors.get(group) or self.errors.get("*")
+        if error is not None and self.rng.random() * 100 < error[0]:
+            self.injected_errors[group] = self.injected_errors.get(group, 0) + 1
+            return self._json(path, error[1], {"error": MESSAGES["injected"]})
+
+        if path == "/api/login" and method == "POST":
+            return self.login(body, ip)
+        if path == "/api/session":
+            email = self._session_email(headers)
+            if email is None:
+                return self._json(path, 401, {"authenticated": False})
+            return self._json(path, 200, {"authenticated": True, "email": email})
+        if path == "/dashboard":
+            email = self._session_email(headers)
+            if email is None:
+                return self._count(path, 302, "text/plain", b"", ["Location: /login"])
+            page = DASHBOARD_PAGE.replace("{email}", html.escape(email)).encode("utf-8")
+            return self._count(path, 200, "text/html; charset=utf-8", page)
+        return self._count(path, 200, "text/html; charset=utf-8", LOGIN_PAGE)
+
+    def login(self, body, ip):
+        path = "/api/login"
+        try:
+            data = json.loads(body)
+            email = str(data.get("email", ""))
+            password = str(data.get("password", ""))
+        except (ValueError, AttributeError):
+            return self._json(path, 400, {"error": "Cuerpo JSON inválido"})
+
+        if not EMAIL_PATTERN.match(email):
+            return self._json(path, 400, {"error": MESSAGES["invalid_email"]})
+        if len(password) < MIN_PASSWORD_LENGTH:
+            return self._json(path, 400, {"error": MESSAGES["short_password"]})
+
+        # El bloqueo es por IP y email combinados; el mensaje es el mismo
+        # exista o no la cuenta.
+        now = time.time()
+        key = (ip, email)
+        locked_until = self.locked_until.get(key)
+        if locked_until is not None:
+            if now < locked_until:
+                self._audit(now, ip, email, "bloqueada")
+                return self._json(path, 423, {"error": MESSAGES["locked"]})
+            del self.locked_until[key]
+
+        if self.users.get(email) != password:
+            failures = self.failures.get(key, 0) + 1
+            if self.max_attempts and failures >= self.max_attempts:
+                self.locked_until[key] = now + self.lockout_seconds
+                self.failures.pop(key, None)
+            else:
+                self.failures[key] = failures
+            self._audit(now, ip, email, "fallido")
+            return self._json(path, 401, {"error": MESSAGES["invalid_credentials"]})
+
+        self.failures.pop(key, None)
+        max_age = REMEMBER_SECONDS if data.get("remember") else self.session_seconds
+        token = secrets.token_hex(16)
+        self.sessions[token] = (email, now + max_age)
+        if len(self.sessions) > self.max_sessions:
+            self.sessions.popitem(last=False)
+        self._audit(now, ip, email, "exitoso")
+        return self._json(path, 200, {"token": token, "expires_in": max_age, "redirect": "/dashboard"},
+                          [f"Set-Cookie: session={token}; Path=/; Max-Age={max_age}; HttpOnly"])
+
+    def _session_email(self, headers):
+        token = None
+        authorization = headers.get(b"authorization", "")
+        if authorization.startswith("Bearer "):
+            token = authorization[7:]
+        else:
+            for cookie in headers.get(b"cookie", "").split(";"):
+                name, _, value = cookie.strip().partition("=")
+                if name == "session":
+                    token = value
+        session = self.sessions.get(token) if token else None
+        if session is None:
+            return None
+        if session[1] < time.time():
+            del self.sessions[token]
+            return None
+        return session[0]
+
+    def _json(self, path, status, data, extra_headers=()):
+        return self._count(path, status, "application/json", json.dumps(data).encode("utf-8"), extra_headers)
+
+    def _count(self, path, status, content_type, payload, extra_headers=()):
+        key = (path, status)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        return status, list(extra_headers), content_type, payload
+
+    def _audit(self, now, ip, email, result):
+        if self.audit is not None:
+            self.audit.write(f"{now:.3f},{ip},{email},{result}\n")
+
+    def stats(self):
+        # Verdad conocida para contrastar con lo que miden Locust y el
+        # analizador: respuestas por ruta y estado, y la latencia inyectada.
+        routes = {}
+        for (path, status), count in sorted(self.counts.items()):
+            route = routes.setdefault(path, {"requests": 0, "status": {}})
+            route["requests"] += count
+            route["status"][str(status)] = count
+        latency = {}
+        for group, histogram in self.injected_latency.items():
+            values = histogram.percentiles((50, 95, 99))
+            latency[group] = {"count": histogram.total_count, "p50": round(values[50], 2),
+                              "p95": round(values[95], 2), "p99": round(values[99], 2)}
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "routes": routes,
+            "injected_errors": self.injected_errors,
+            "injected_latency_ms": latency,
+            "active_sessions": len(self.sessions),
+            "locked_accounts": len(self.locked_until)
+        }
+
+    async def start(self, host, port):
+        self.server = await asyncio.start_server(self.handle_connection, host, port, backlog=2048)
+        return self.server
+
+    def close(self):
+        if self.audit is not None:
+            self.audit.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local que reproduce el servicio de login para pruebas sin la aplicación real")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", action="append", default=[], metavar="GRUPO=DIST",
+                        help="Latencia por grupo (login, session, page o *), p. ej. login=lognormal:120:0.4")
+    parser.add_argument("--errors", action="append", default=[], metavar="GRUPO=PCT[:ESTADO]",
+                        help="Porcentaje de errores inyectados por grupo, p. ej. login=2:503")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Intentos fallidos antes del bloqueo (0 lo desactiva)")
+    parser.add_argument("--lockout-seconds", type=float, default=900)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--audit-log", help="Archivo donde registrar cada intento de login")
+    parser.add_argument("--credentials", help="Tabla de scripts/credential_feeder.py con cuentas adicionales")
+    args = parser.parse_args()
+
+    try:
+        latencies = dict(parse_assignment(value) for value in args.latency)
+        errors = {}
+        for value in args.errors:
+            group, spec = parse_assignment(value)
+            percent, _, status = spec.partition(":")
+            errors[group] = (float(percent), int(status) if status else 500)
+        users = None
+        if args.credentials:
+            table = CredentialTable(args.credentials)
+            users = dict(DEFAULT_USERS)
+            users.update(table.items())
+            table.close()
+            print(f"{len(users)} cuentas cargadas")
+        stub = LoginStubServer(users=users, latencies=latencies, errors=errors, max_attempts=args.max_attempts,
+                               lockout_seconds=args.lockout_seconds, seed=args.seed, audit_log=args.audit_log)
+    except ValueError as e:
+        parser.error(str(e))
+
+    def stop(*_):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+
+    async def run():
+        server = await stub.start(args.host, args.port)
+        print(f"Servidor de login de prueba en http://{args.host}:{args.port} (estadísticas en /__stats)")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.close()
+
+
+if __name__ == "__main__":
+    main()
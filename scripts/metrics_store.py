@@ -0,0 +1,224 @@
+import argparse
+import os
+import sqlite3
+import subprocess
+import time
+from datetime import datetime
+
+DEFAULT_PATH = os.environ.get("METRICS_HISTORY_DB", "reports/metrics_history.db")
+
+RUN_METRICS = ("tps", "sustained_tps", "error_rate", "p50", "p95", "p99", "p999")
+ENDPOINT_METRICS = ("requests", "failures", "error_rate", "p50", "p95", "p99", "p999")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    branch TEXT NOT NULL,
+    commit_sha TEXT,
+    status TEXT,
+    total_requests INTEGER,
+    failed_requests INTEGER,
+    tps REAL,
+    sustained_tps REAL,
+    error_rate REAL,
+    p50 REAL,
+    p95 REAL,
+    p99 REAL,
+    p999 REAL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (timestamp);
+CREATE INDEX IF NOT EXISTS idx_runs_branch_timestamp ON runs (branch, timestamp);
+CREATE TABLE IF NOT EXISTS endpoint_metrics (
+    endpoint TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    branch TEXT NOT NULL,
+    requests INTEGER,
+    failures INTEGER,
+    error_rate REAL,
+    p50 REAL,
+    p95 REAL,
+    p99 REAL,
+    p999 REAL,
+    PRIMARY KEY (endpoint, timestamp, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_endpoint_metrics_branch ON endpoint_metrics (endpoint, branch, timestamp);
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    branch TEXT NOT NULL,
+    rule TEXT NOT NULL,
+    level TEXT NOT NULL,
+    state TEXT,
+    endpoint TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON alerts (timestamp);
+"""
+
+
+def current_branch():
+    # En GitHub Actions la rama viene en el entorno; en local se pregunta a git.
+    for variable in ("GITHUB_HEAD_REF", "GITHUB_REF_NAME"):
+        if os.environ.get(variable):
+            return os.environ[variable]
+    try:
+        result = subprocess.run(["git", "rev-parse", "--abbrev-ref", "HEAD"],
+                                capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return "local"
+    return result.stdout.strip() or "local"
+
+
+def current_commit():
+    if os.environ.get("GITHUB_SHA"):
+        return os.environ["GITHUB_SHA"]
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def _timestamp(value):
+    if value is None:
+        return time.time()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+
+class MetricsStore:
+    """Historial de ejecuciones en SQLite: solo se insertan filas, nunca se reescriben."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def record_run(self, report, branch=None, commit=None):
+        branch = branch or current_branch()
+        commit = commit if commit is not None else current_commit()
+        timestamp = _timestamp(report.get("timestamp"))
+        summary = report.get("summary", {})
+        response_times = report.get("response_times", {})
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (timestamp, branch, commit_sha, status, total_requests, failed_requests, "
+                "tps, sustained_tps, error_rate, p50, p95, p99, p999) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (timestamp, branch, commit, report.get("overall_status"),
+                 summary.get("total_requests"), summary.get("failed_requests"),
+                 summary.get("throughput_rps"), summary.get("sustained_tps"), summary.get("error_rate"),
+                 response_times.get("p50"), response_times.get("p95"),
+                 response_times.get("p99"), response_times.get("p999"))
+            )
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO endpoint_metrics (endpoint, timestamp, run_id, branch, requests, failures, "
+                "error_rate, p50, p95, p99, p999) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (name, timestamp, run_id, branch, *(values.get(metric) for metric in ENDPOINT_METRICS))
+                    for name, values in report.get("endpoints", {}).items()
+                ]
+            )
+        return run_id
+
+    def record_alerts(self, alerts, branch=None, timestamp=None):
+        if not alerts:
+            return
+        branch = branch or current_branch()
+        timestamp = _timestamp(timestamp)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO alerts (timestamp, branch, rule, level, state, endpoint) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (timestamp, branch, alert["nombre"], alert["nivel"], alert.get("estado"), alert.get("endpoint"))
+                    for alert in alerts
+                ]
+            )
+
+    def trend(self, metric="p95", endpoint=None, days=90, branch=None, now=None):
+        allowed = ENDPOINT_METRICS if endpoint else RUN_METRICS
+        if metric not in allowed:
+            raise ValueError(f"Métrica desconocida '{metric}', opciones: {', '.join(allowed)}")
+
+        since = _timestamp(now) - days * 86400
+        # El nombre de la columna sale de la lista blanca de arriba; los
+        # valores van siempre como parámetros.
+        if endpoint:
+            query = f"SELECT timestamp, {metric} AS value FROM endpoint_metrics WHERE endpoint = ? AND timestamp >= ?"
+            params = [endpoint, since]
+        else:
+            query = f"SELECT timestamp, {metric} AS value FROM runs WHERE timestamp >= ?"
+            params = [since]
+        if branch:
+            query += " AND branch = ?"
+            params.append(branch)
+        query += " ORDER BY timestamp"
+
+        return [(row["timestamp"], row["value"]) for row in self.connection.execute(query, params)
+                if row["value"] is not None]
+
+    def summarize_trend(self, metric="p95", endpoint=None, days=7, branch=None, now=None):
+        points = self.trend(metric, endpoint, days, branch, now)
+        if not points:
+            return None
+        values = [value for _, value in points]
+        first, last = values[0], values[-1]
+        return {
+            "metric": metric,
+            "endpoint": endpoint,
+            "runs": len(values),
+            "first": first,
+            "last": last,
+            "min": min(values),
+            "max": max(values),
+            "mean": sum(values) / len(values),
+            "change_pct": (last - first) / first * 100 if first else 0.0
+        }
+
+    def endpoints(self):
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT endpoint FROM endpoint_metrics ORDER BY endpoint")]
+
+    def alert_counts(self, days=7, now=None):
+        since = _timestamp(now) - days * 86400
+        return {
+            row["rule"]: row["count"]
+            for row in self.connection.execute(
+                "SELECT rule, COUNT(*) AS count FROM alerts WHERE timestamp >= ? AND COALESCE(state, '') != 'resuelta' "
+                "GROUP BY rule ORDER BY count DESC", (since,)
+            )
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta el historial de métricas de performance")
+    parser.add_argument("--db", default=DEFAULT_PATH)
+    parser.add_argument("--metric", default="p95")
+    parser.add_argument("--endpoint", help="Endpoint de Locust, p. ej. 'Login - Credenciales Válidas'")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--branch")
+    args = parser.parse_args()
+
+    store = MetricsStore(args.db)
+    started = time.perf_counter()
+    points = store.trend(args.metric, args.endpoint, args.days, args.branch)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    target = args.endpoint or "general"
+    print(f"Tendencia {args.metric} ({target}) últimos {args.days} días: {len(points)} ejecuciones en {elapsed_ms:.1f}ms")
+    for timestamp, value in points:
+        print(f"  {datetime.fromtimestamp(timestamp):%Y-%m-%d %H:%M}  {value:.2f}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import json
+import os
+import signal
+import threading
+import unicodedata
+from datetime import datetime, timedelta
+
+from locust_csv_stream import CsvChunkReader
+
+WEEKDAYS = {
+    "lunes": 0,
+    "martes": 1,
+    "miercoles": 2,
+    "jueves": 3,
+    "viernes": 4,
+    "sabado": 5,
+    "domingo": 6
+}
+
+CONFIG_POLL_SECONDS = 60
+# Columnas de percentiles del historial de Locust y su clave en el reporte.
+HISTORY_PERCENTILES = {"50%": "p50", "95%": "p95", "99%": "p99", "99.9%": "p999"}
+# Secciones del reporte que quedan desactualizadas cuando el historial trae
+# datos más recientes de la prueba en curso.
+STALE_WITH_HISTORY = ("response_times_corrected",)
+
+
+def _normalize_day(name):
+    without_accents = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return WEEKDAYS[without_accents.strip().lower()]
+
+
+def _parse_time(value):
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+class MonitorSchedule:
+    def __init__(self, config):
+        continuous = config.get("verificacion_continua", {})
+        daily = config.get("reportes_diarios", {})
+
+        self.interval = timedelta(minutes=continuous.get("intervalo_minutos", 15))
+        start, end = continuous.get("horario_activo", "00:00-23:59").split("-")
+        self.active_start = _parse_time(start)
+        self.active_end = _parse_time(end)
+        self.active_days = {_normalize_day(day) for day in continuous.get("dias_activos", WEEKDAYS)}
+        self.report_time = _parse_time(daily["hora"]) if daily.get("hora") else None
+
+    def is_active(self, moment):
+        minutes = moment.hour * 60 + moment.minute
+        return moment.weekday() in self.active_days and self.active_start <= minutes <= self.active_end
+
+    def next_check(self, after):
+        # Las verificaciones se alinean al inicio del horario activo de cada
+        # día: 08:00, 08:15, 08:30... para que el calendario sea predecible.
+        day = after.replace(hour=0, minute=0, second=0, microsecond=0)
+        for _ in range(8):
+            if day.weekday() in self.active_days:
+                window_start = day + timedelta(minutes=self.active_start)
+                window_end = day + timedelta(minutes=self.active_end)
+                if after < window_start:
+                    return window_start
+                if after < window_end:
+                    elapsed = (after - window_start) // self.interval + 1
+                    candidate = window_start + elapsed * self.interval
+                    if candidate <= window_end:
+                        return candidate
+            day += timedelta(days=1)
+        return None
+
+    def next_report(self, after):
+        if self.report_time is None:
+            return None
+        day = after.replace(hour=0, minute=0, second=0, microsecond=0)
+        for _ in range(8):
+            candidate = day + timedelta(minutes=self.report_time)
+            if day.weekday() in self.active_days and candidate > after:
+                return candidate
+            day += timedelta(days=1)
+        return None
+
+
+class HistoryTail:
+    """Lee solo las filas nuevas del historial de Locust desde la última pasada."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.inode = None
+
+    def read_latest_snapshot(self):
+        if not os.path.exists(self.path):
+            return None
+
+        stat = os.stat(self.path)
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            # Archivo nuevo o truncado: una nueva prueba empezó.
+            self.inode, self.offset = stat.st_ino, 0
+        if stat.st_size == self.offset:
+            return None
+
+        columns = ["Name", "Requests/s", "Failures/s", *HISTORY_PERCENTILES, "Total Request Count", "Total Failure Count"]
+        reader = CsvChunkReader(self.path, columns, offset=self.offset, follow=True)
+        latest = None
+        for chunk in reader:
+            for index, name in enumerate(chunk["Name"]):
+                if name == "Aggregated":
+                    latest = {column: chunk[column][index] for column in columns}
+        self.offset = reader.offset
+
+        if latest is None:
+            return None
+        return self._to_snapshot(latest)
+
+    def _to_snapshot(self, row):
+        def number(value):
+            return float(value) if value not in ("", "N/A") else 0.0
+
+        total = number(row["Total Request Count"])
+        return {
+            "timestamp": datetime.now().isoformat(),
+            "origen": "historial",
+            "summary": {
+                "throughput_rps": number(row["Requests/s"]),
+                "error_rate": number(row["Total Failure Count"]) / total * 100 if total else 0.0
+            },
+            "response_times": {key: number(row[column]) for column, key in HISTORY_PERCENTILES.items()}
+        }
+
+
+def merge_snapshot(metrics, snapshot):
+    if not snapshot:
+        return dict(metrics)
+    merged = {key: value for key, value in metrics.items() if key not in STALE_WITH_HISTORY}
+    for key, value in snapshot.items():
+        # Los percentiles se reemplazan completos: mezclar un P95 nuevo con
+        # el P99 del reporte anterior dispararía reglas con datos viejos.
+        if key != "response_times" and isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = dict(merged[key], **value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class MonitorDaemon:
+    def __init__(self, manager_factory, config_file, metrics_file="reports/performance_metrics.json",
+                 history_file="reports/performance_stats_history.csv"):
+        self.manager_factory = manager_factory
+        self.config_file = config_file
+        self.metrics_file = metrics_file
+        self.history = HistoryTail(history_file)
+        self.running = False
+        self._stopped = threading.Event()
+        self.manager = None
+        self.schedule = None
+        self._config_mtime = None
+        self._metrics_mtime = None
+        self._metrics_data = {}
+
+    def _load(self):
+        mtime = os.path.getmtime(self.config_file)
+        if mtime == self._config_mtime:
+            return False
+        try:
+            manager = self.manager_factory(self.config_file)
+            schedule = MonitorSchedule(manager.config["alertas"].get("programacion", {}))
+        except Exception as e:
+            if self.manager is None:
+                raise
+            print(f"Configuración inválida, se mantiene la anterior: {e}")
+            self._config_mtime = mtime
+            return False
+
+        if self.manager is not None:
+            self.manager.close()
+            print(f"Configuración recargada: {self.config_file}")
+        self.manager, self.schedule, self._config_mtime = manager, schedule, mtime
+        return True
+
+    def stop(self, *args):
+        # Solo se marca la detención: el ciclo termina la tarea en curso y
+        # sale sin que el handler de SIGTERM interrumpa una notificación.
+        self.running = False
+        self._stopped.set()
+
+    def check(self):
+        changed = False
+
+        if os.path.exists(self.metrics_file):
+            mtime = os.path.getmtime(self.metrics_file)
+            if mtime != self._metrics_mtime:
+                self._metrics_mtime = mtime
+                with open(self.metrics_file, "r") as f:
+                    self._metrics_data = json.load(f)
+                changed = True
+
+        snapshot = self.history.read_latest_snapshot()
+
+        if not changed and snapshot is None:
+            print(f"[{datetime.now():%H:%M}] Sin métricas nuevas")
+            return
+
+        # Una sola evaluación por verificación: el estado de alertas resuelve
+        # las que faltan en el lote, y el historial no trae endpoint_groups ni
+        # bdd_metrics. Sus valores, más recientes, se superponen al reporte.
+        self.manager.handle_metrics(merge_snapshot(self._metrics_data, snapshot))
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        self.running = True
+        self._stopped.clear()
+        self._load()
+
+        now = datetime.now()
+        next_check = now if self.schedule.is_active(now) else self.schedule.next_check(now)
+        next_report = self.schedule.next_report(now)
+        print(f"Monitor iniciado. Próxima verificación: {next_check}, próximo reporte: {next_report}")
+
+        try:
+            while self.running:
+                now = datetime.now()
+                due = [moment for moment in (next_check, next_report) if moment is not None]
+                if not due:
+                    print("La programación no tiene verificaciones activas")
+                    break
+
+                wait = (min(due) - now).total_seconds()
+                if wait > 0:
+                    # Se duerme hasta la próxima tarea, despertando como mucho
+                    # cada minuto para detectar cambios en la configuración.
+                    if self._stopped.wait(min(wait, CONFIG_POLL_SECONDS)):
+                        break
+                    if self._load():
+                        now = datetime.now()
+                        next_check = self.schedule.next_check(now)
+                        next_report = self.schedule.next_report(now)
+                    continue
+
+                if next_check is not None and next_check <= now:
+                    self.check()
+                    next_check = self.schedule.next_check(now)
+                if next_report is not None and next_report <= now:
+                    self.manager.send_daily_report()
+                    next_report = self.schedule.next_report(now)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.manager.close()
+            print("Monitor detenido")
@@ -0,0 +1,174 @@
+import json
+import math
+import os
+from datetime import datetime
+
+from latency_histogram import LatencyHistogram
+
+
+def mann_whitney_u(baseline, current):
+    """Prueba U de Mann-Whitney sobre dos histogramas con la misma configuración.
+
+    Las muestras de un mismo bucket se tratan como empates, por lo que el
+    costo depende del número de buckets y no del de muestras. Devuelve U del
+    run actual, el z con corrección por empates y el p-valor unilateral
+    (H1: el run actual es más lento).
+    """
+    if not baseline.is_compatible(current):
+        raise ValueError("Los histogramas deben tener la misma configuración")
+
+    n1, n2 = baseline.total_count, current.total_count
+    if not n1 or not n2:
+        return None
+
+    # Rango promedio de cada bucket en la muestra combinada, recorriendo los
+    # buckets en orden ascendente de latencia.
+    rank_sum = 0.0
+    ties = 0.0
+    position = 0
+    for baseline_count, current_count in zip(baseline._counts, current._counts):
+        total = baseline_count + current_count
+        if not total:
+            continue
+        average_rank = position + (total + 1) / 2.0
+        rank_sum += current_count * average_rank
+        ties += total ** 3 - total
+        position += total
+
+    u = rank_sum - n2 * (n2 + 1) / 2.0
+    n = n1 + n2
+    mean = n1 * n2 / 2.0
+    variance = n1 * n2 / 12.0 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return {"u": u, "z": 0.0, "p_value": 1.0, "effect_size": 0.0}
+
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return {
+        "u": u,
+        "z": z,
+        "p_value": 0.5 * math.erfc(z / math.sqrt(2)),
+        # Delta de Cliff: P(actual > base) - P(actual < base), entre -1 y 1.
+        "effect_size": 2.0 * u / (n1 * n2) - 1.0
+    }
+
+
+def compare_endpoint(baseline, current, settings):
+    result = {
+        "baseline_samples": baseline.total_count,
+        "current_samples": current.total_count
+    }
+    if min(baseline.total_count, current.total_count) < settings["min_samples"]:
+        result["status"] = "SKIP"
+        result["reason"] = f"menos de {settings['min_samples']} muestras"
+        return result
+
+    test = mann_whitney_u(baseline, current)
+    baseline_values = baseline.percentiles([50, 95])
+    current_values = current.percentiles([50, 95])
+    result.update({
+        "p_value": test["p_value"],
+        "effect_size": round(test["effect_size"], 4),
+        "baseline_p50": round(baseline_values[50], 2),
+        "current_p50": round(current_values[50], 2),
+        "baseline_p95": round(baseline_values[95], 2),
+        "current_p95": round(current_values[95], 2),
+        "p50_change_pct": _change(baseline_values[50], current_values[50]),
+        "p95_change_pct": _change(baseline_values[95], current_values[95])
+    })
+
+    # Con millones de muestras cualquier diferencia es significativa: además
+    # del p-valor se exige un tamaño de efecto mínimo.
+    regressed = test["p_value"] < settings["alpha"] and test["effect_size"] >= settings["min_effect_size"]
+    result["status"] = "FAIL" if regressed else "PASS"
+    return result
+
+
+def _change(baseline_value, current_value):
+    if not baseline_value:
+        return 0.0
+    return round((current_value - baseline_value) / baseline_value * 100, 2)
+
+
+def compare_runs(baseline, current, settings):
+    # Con otro perfil (usuarios, tasa de llegadas o usuarios de sesión) ni la
+    # latencia ni el throughput son comparables: se omite todo.
+    if baseline.get("profile") != current.get("profile"):
+        reason = f"perfil distinto ({baseline.get('profile')} vs {current.get('profile')})"
+        return {
+            "baseline_timestamp": baseline.get("timestamp"),
+            "endpoints": {},
+            "throughput": {"status": "SKIP", "reason": reason},
+            "status": "SKIP",
+            "reason": reason
+        }
+
+    endpoints = {}
+    for name, current_histogram in sorted(current["histograms"].items()):
+        baseline_histogram = baseline["histograms"].get(name)
+        if baseline_histogram is None:
+            endpoints[name] = {"status": "SKIP", "reason": "sin datos en la línea base"}
+            continue
+        endpoints[name] = compare_endpoint(baseline_histogram, current_histogram, settings)
+
+    throughput = {"status": "SKIP", "reason": "sin throughput en la línea base"}
+    if baseline.get("throughput") and current.get("throughput") is not None:
+        change = _change(baseline["throughput"], current["throughput"])
+        throughput = {
+            "baseline": baseline["throughput"],
+            "current": current["throughput"],
+            "change_pct": change,
+            "status": "FAIL" if -change > settings["max_throughput_drop_pct"] else "PASS"
+        }
+
+    statuses = [result["status"] for result in endpoints.values()] + [throughput["status"]]
+    return {
+        "baseline_timestamp": baseline.get("timestamp"),
+        "endpoints": endpoints,
+        "throughput": throughput,
+        "status": "FAIL" if "FAIL" in statuses else "PASS"
+    }
+
+
+def load_run(latency_file, metrics_file):
+    with open(latency_file, 'r') as f:
+        latency_data = json.load(f)
+
+    throughput = None
+    if os.path.exists(metrics_file):
+        with open(metrics_file, 'r') as f:
+            summary = json.load(f).get("summary", {})
+        throughput = summary.get("sustained_tps", summary.get("throughput_rps"))
+
+    # El perfil lo escribe el locustfile: LOAD_PROFILE solo existe en el
+    # entorno de la prueba, no en el de este paso.
+    profile = latency_data.get("profile", os.environ.get("LOAD_PROFILE"))
+    if latency_data.get("arrival_rate"):
+        profile = f"{profile}@{latency_data['arrival_rate']:g}/s"
+    # Con usuarios de sesión la mezcla de peticiones es otra: no se compara
+    # contra una línea base sin ellos.
+    if latency_data.get("session_users"):
+        profile = f"{profile}+sesiones"
+
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "profile": profile,
+        "throughput": throughput,
+        "histograms": {
+            name: LatencyHistogram.from_dict(data) for name, data in latency_data.get("endpoints", {}).items()
+        }
+    }
+
+
+def load_baseline(path):
+    with open(path, 'r') as f:
+        data = json.load(f)
+    data["histograms"] = {name: LatencyHistogram.from_dict(value) for name, value in data.pop("endpoints", {}).items()}
+    return data
+
+
+def save_baseline(run, path):
+    data = {key: value for key, value in run.items() if key != "histograms"}
+    data["endpoints"] = {name: histogram.to_dict() for name, histogram in run["histograms"].items()}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
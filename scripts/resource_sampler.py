@@ -0,0 +1,240 @@
+import argparse
+import csv
+import os
+import re
+import resource
+import signal
+import subprocess
+import sys
+import time
+
+RESOURCE_COLUMNS = ["timestamp", "role", "cpu_percent", "max_process_cpu", "rss_mb", "memory_percent", "processes"]
+
+ROLE_PATTERNS = {
+    "browser": r"chrome|chromium|chromedriver|firefox|geckodriver",
+    "load_generator": r"locust",
+    "bdd": r"behave"
+}
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CPU_COUNT = os.cpu_count() or 1
+
+
+class _ProcFile:
+    # Los archivos de /proc se mantienen abiertos y se releen con pread:
+    # abrirlos en cada muestra es la mayor parte del costo.
+    def __init__(self, path):
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self, size=4096):
+        return os.pread(self.fd, size, 0)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ResourceSampler:
+    """Muestrea CPU y memoria del sistema y de los procesos agrupados por rol."""
+
+    def __init__(self, target_pattern=None, target_pids=None, rescan_seconds=1.0):
+        self.patterns = {}
+        if target_pattern:
+            self.patterns["target"] = re.compile(target_pattern)
+        self.patterns.update({role: re.compile(pattern) for role, pattern in ROLE_PATTERNS.items()})
+        self.target_pids = set(target_pids or [])
+        self.rescan_seconds = rescan_seconds
+        self.own_pid = os.getpid()
+
+        self.stat = _ProcFile("/proc/stat")
+        self.meminfo = _ProcFile("/proc/meminfo")
+        self.memory_total = self._read_meminfo()[0]
+        self.processes = {}
+        self.last_scan = 0.0
+        self.last_system = None
+
+    def _read_meminfo(self):
+        values = {}
+        for line in self.meminfo.read().split(b"\n")[:8]:
+            key, _, rest = line.partition(b":")
+            if key in (b"MemTotal", b"MemAvailable"):
+                values[key] = int(rest.split()[0]) * 1024
+        return values[b"MemTotal"], values[b"MemAvailable"]
+
+    def _read_system_cpu(self):
+        fields = self.stat.read(512).split(b"\n", 1)[0].split()[1:]
+        values = [int(value) for value in fields]
+        idle = values[3] + (values[4] if len(values) > 4 else 0)
+        return sum(values) - idle, sum(values)
+
+    def _classify(self, pid):
+        if pid in self.target_pids:
+            return "target"
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                command = f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+        except OSError:
+            return None
+        for role, pattern in self.patterns.items():
+            if pattern.search(command):
+                return role
+        return None
+
+    def scan(self, now):
+        self.last_scan = now
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            if pid == self.own_pid or pid in self.processes:
+                continue
+            role = self._classify(pid)
+            if role is None:
+                continue
+            try:
+                self.processes[pid] = {"role": role, "file": _ProcFile(f"/proc/{pid}/stat"), "ticks": None}
+            except OSError:
+                continue
+
+    def _read_process(self, pid, process):
+        try:
+            data = process["file"].read(1024)
+        except OSError:
+            data = b""
+        if not data:
+            process["file"].close()
+            del self.processes[pid]
+            return None
+        # El nombre del proceso va entre paréntesis y puede contener espacios.
+        fields = data[data.rindex(b")") + 2:].split()
+        ticks = int(fields[11]) + int(fields[12])
+        rss = int(fields[21]) * PAGE_SIZE
+        return ticks, rss
+
+    def sample(self, now=None):
+        now = now if now is not None else time.time()
+        if now - self.last_scan >= self.rescan_seconds:
+            self.scan(now)
+
+        busy, total = self._read_system_cpu()
+        memory_total, memory_available = self._read_meminfo()
+        system_cpu = None
+        if self.last_system is not None and total > self.last_system[1]:
+            system_cpu = (busy - self.last_system[0]) / (total - self.last_system[1]) * 100
+        self.last_system = (busy, total, now)
+
+        roles = {}
+        for pid, process in list(self.processes.items()):
+            values = self._read_process(pid, process)
+            if values is None:
+                continue
+            ticks, rss = values
+            previous = process["ticks"]
+            process["ticks"] = (ticks, now)
+            role = roles.setdefault(process["role"], {"cpu": 0.0, "max_cpu": 0.0, "rss": 0, "processes": 0})
+            role["rss"] += rss
+            role["processes"] += 1
+            if previous is not None and now > previous[1]:
+                # Porcentaje de un núcleo: un worker de Locust satura al llegar a 100.
+                cpu = (ticks - previous[0]) / CLOCK_TICKS / (now - previous[1]) * 100
+                role["cpu"] += cpu
+                role["max_cpu"] = max(role["max_cpu"], cpu)
+
+        rows = []
+        if system_cpu is not None:
+            used = memory_total - memory_available
+            rows.append((now, "system", system_cpu, None, used, used / memory_total * 100, None))
+        for name, role in sorted(roles.items()):
+            rows.append((now, name, role["cpu"] / CPU_COUNT, role["max_cpu"], role["rss"],
+                         role["rss"] / memory_total * 100, role["processes"]))
+        return rows
+
+    def close(self):
+        self.stat.close()
+        self.meminfo.close()
+        for process in self.processes.values():
+            process["file"].close()
+        self.processes = {}
+
+
+class ResourceLogWriter:
+    def __init__(self, path, buffer_size=64 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "w", buffering=buffer_size, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file, lineterminator="\n")
+        self._writer.writerow(RESOURCE_COLUMNS)
+
+    def write(self, rows):
+        for timestamp, role, cpu, max_cpu, rss, memory_percent, processes in rows:
+            self._writer.writerow((
+                f"{timestamp:.3f}",
+                role,
+                f"{cpu:.1f}",
+                "" if max_cpu is None else f"{max_cpu:.1f}",
+                f"{rss / 1048576:.1f}",
+                f"{memory_percent:.1f}",
+                "" if processes is None else processes
+            ))
+
+    def close(self):
+        self._file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Muestrea CPU y memoria durante una prueba. Los argumentos después de '--' son el comando a ejecutar."
+    )
+    parser.add_argument("--output", default="reports/performance_resources.csv")
+    parser.add_argument("--interval", type=float, default=0.2, help="Segundos entre muestras")
+    parser.add_argument("--target", help="Expresión regular sobre la línea de comando de la aplicación bajo prueba")
+    parser.add_argument("--target-pid", type=int, action="append", default=[])
+    argv = sys.argv[1:]
+    command = []
+    if "--" in argv:
+        command = argv[argv.index("--") + 1:]
+        argv = argv[:argv.index("--")]
+    args = parser.parse_args(argv)
+
+    sampler = ResourceSampler(args.target, args.target_pid)
+    writer = ResourceLogWriter(args.output)
+    child = subprocess.Popen(command) if command else None
+
+    running = True
+
+    def stop(*_):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop if child is None else signal.SIG_IGN)
+
+    samples = 0
+    sampling_time = 0.0
+    next_sample = time.monotonic()
+    while running and (child is None or child.poll() is None):
+        started = time.perf_counter()
+        writer.write(sampler.sample())
+        sampling_time += time.perf_counter() - started
+        samples += 1
+
+        next_sample += args.interval
+        delay = next_sample - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            next_sample = time.monotonic()
+
+    writer.close()
+    sampler.close()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    print(f"Recursos: {samples} muestras en {args.output} "
+          f"({sampling_time / max(samples, 1) * 1000:.2f}ms por muestra, CPU propia {usage.ru_utime + usage.ru_stime:.2f}s)")
+
+    if child is not None:
+        sys.exit(child.wait())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+import operator
+import re
+
+METRIC_PATHS = {
+    "response_time_p50": (("response_times", "p50"), 0),
+    "response_time_p95": (("response_times", "p95"), 0),
+    "response_time_p99": (("response_times", "p99"), 0),
+    "response_time_p999": (("response_times", "p999"), 0),
+    "corrected_response_time_p95": (("response_times_corrected", "p95"), 0),
+    "corrected_response_time_p99": (("response_times_corrected", "p99"), 0),
+    "error_rate": (("summary", "error_rate"), 0),
+    "throughput": (("summary", "throughput_rps"), 0),
+    "bdd_success_rate": (("bdd_metrics", "success_rate"), 100),
+    "cpu_usage": (("resources", "cpu_p95"), 0),
+    "memory_usage": (("resources", "memory_max"), 0),
+    "load_generator_bottleneck": (("resources", "load_generator_bottleneck"), False),
+    "late_arrival_pct": (("arrivals", "late_pct"), 0),
+    "missed_arrivals": (("arrivals", "missed"), 0)
+}
+
+# Métricas de un grupo de endpoints (sección endpoint_groups del reporte).
+# Se usan con prefijo en reglas globales (login.response_time_p95) o sin él
+# en reglas con por_endpoint, que se evalúan una vez por grupo.
+ENDPOINT_METRIC_PATHS = {
+    "response_time_p50": (("p50",), 0),
+    "response_time_p95": (("p95",), 0),
+    "response_time_p99": (("p99",), 0),
+    "response_time_p999": (("p999",), 0),
+    "corrected_response_time_p99": (("corrected", "p99"), 0),
+    "error_rate": (("error_rate",), 0),
+    "success_rate": (("success_rate",), 100),
+    "throughput": (("throughput_rps",), 0),
+    "gates_failed": (("gates_failed",), 0)
+}
+
+COMPARISONS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne
+}
+
+ARITHMETIC = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": lambda a, b: a / b if b else 0.0
+}
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_.]*)
+      | (?P<op>>=|<=|==|!=|[><+\-*/()])
+    )""", re.VERBOSE)
+
+
+class RuleSyntaxError(ValueError):
+    pass
+
+
+class _MetricNames:
+    def __contains__(self, name):
+        if name in METRIC_PATHS:
+            return True
+        group, _, metric = name.rpartition(".")
+        return bool(group) and metric in ENDPOINT_METRIC_PATHS
+
+
+METRIC_NAMES = _MetricNames()
+
+
+def tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if not match:
+            raise RuleSyntaxError(f"Carácter inesperado en '{expression}' (posición {position})")
+        position = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+class _Parser:
+    # Gramática restringida, compatible con las condiciones de alertas.yml:
+    #   expr       := and_expr ('or' and_expr)*
+    #   and_expr   := not_expr ('and' not_expr)*
+    #   not_expr   := 'not' not_expr | comparison
+    #   comparison := sum (('>' | '>=' | '<' | '<=' | '==' | '!=') sum)?
+    #   sum        := term (('+' | '-') term)*
+    #   term       := unary (('*' | '/') unary)*
+    #   unary      := '-' unary | NUMBER | NAME | '(' expr ')'
+
+    def __init__(self, expression, variables):
+        self.expression = expression
+        self.tokens = tokenize(expression)
+        self.position = 0
+        self.variables = variables
+        self.used = set()
+
+    def parse(self):
+        if not self.tokens:
+            raise RuleSyntaxError("Condición vacía")
+        node = self._or()
+        if self.position != len(self.tokens):
+            raise RuleSyntaxError(f"Token inesperado '{self.tokens[self.position][1]}' en '{self.expression}'")
+        return node
+
+    def _peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def _accept(self, *values):
+        kind, value = self._peek()
+        if kind in ("op", "name") and value in values:
+            self.position += 1
+            return value
+        return None
+
+    def _or(self):
+        node = self._and()
+        while self._accept("or"):
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self._accept("and"):
+            node = ("and", node, self._not())
+        return node
+
+    def _not(self):
+        if self._accept("not"):
+            return ("not", self._not())
+        return self._comparison()
+
+    def _comparison(self):
+        node = self._sum()
+        op = self._accept(*COMPARISONS)
+        if op:
+            node = ("cmp", op, node, self._sum())
+        return node
+
+    def _sum(self):
+        node = self._term()
+        while True:
+            op = self._accept("+", "-")
+            if not op:
+                return node
+            node = ("arith", op, node, self._term())
+
+    def _term(self):
+        node = self._unary()
+        while True:
+            op = self._accept("*", "/")
+            if not op:
+                return node
+            node = ("arith", op, node, self._unary())
+
+    def _unary(self):
+        if self._accept("-"):
+            return ("neg", self._unary())
+        if self._accept("("):
+            node = self._or()
+            if not self._accept(")"):
+                raise RuleSyntaxError(f"Falta ')' en '{self.expression}'")
+            return node
+
+        kind, value = self._peek()
+        if kind == "number":
+            self.position += 1
+            return ("const", float(value))
+        if kind == "name" and value not in ("and", "or", "not"):
+            if value not in self.variables:
+                raise RuleSyntaxError(f"Métrica desconocida '{value}' en '{self.expression}'")
+            self.position += 1
+            self.used.add(value)
+            return ("var", value)
+        raise RuleSyntaxError(f"Se esperaba un valor en '{self.expression}'")
+
+
+def _compile_scalar(node):
+    kind = node[0]
+    if kind == "const":
+        value = node[1]
+        return lambda values: value
+    if kind == "var":
+        name = node[1]
+        return lambda values: values[name]
+    if kind == "neg":
+        operand = _compile_scalar(node[1])
+        return lambda values: -operand(values)
+    if kind == "not":
+        operand = _compile_scalar(node[1])
+        return lambda values: not operand(values)
+    if kind in ("and", "or"):
+        left, right = _compile_scalar(node[1]), _compile_scalar(node[2])
+        if kind == "and":
+            return lambda values: bool(left(values)) and bool(right(values))
+        return lambda values: bool(left(values)) or bool(right(values))
+
+    function = COMPARISONS[node[1]] if kind == "cmp" else ARITHMETIC[node[1]]
+    left, right = _compile_scalar(node[2]), _compile_scalar(node[3])
+    return lambda values: function(left(values), right(values))
+
+
+def _compile_vector(node):
+    # Cada función recibe columnas (métrica -> lista de valores) y devuelve
+    # una lista; las constantes se devuelven como escalar y se expanden solo
+    # al combinarse con una columna.
+    kind = node[0]
+    if kind == "const":
+        value = node[1]
+        return lambda columns: value
+    if kind == "var":
+        name = node[1]
+        return lambda columns: columns[name]
+    if kind == "neg":
+        operand = _compile_vector(node[1])
+        return lambda columns: _apply_unary(operator.neg, operand(columns))
+    if kind == "not":
+        operand = _compile_vector(node[1])
+        return lambda columns: _apply_unary(operator.not_, operand(columns))
+
+    if kind == "and":
+        function = lambda a, b: bool(a) and bool(b)
+        left, right = _compile_vector(node[1]), _compile_vector(node[2])
+    elif kind == "or":
+        function = lambda a, b: bool(a) or bool(b)
+        left, right = _compile_vector(node[1]), _compile_vector(node[2])
+    else:
+        function = COMPARISONS[node[1]] if kind == "cmp" else ARITHMETIC[node[1]]
+        left, right = _compile_vector(node[2]), _compile_vector(node[3])
+    return lambda columns: _apply_binary(function, left(columns), right(columns))
+
+
+def _apply_unary(function, values):
+    if isinstance(values, list):
+        return list(map(function, values))
+    return function(values)
+
+
+def _apply_binary(function, left, right):
+    left_is_list, right_is_list = isinstance(left, list), isinstance(right, list)
+    if left_is_list and right_is_list:
+        return list(map(function, left, right))
+    if left_is_list:
+        return [function(value, right) for value in left]
+    if right_is_list:
+        return [function(left, value) for value in right]
+    return function(left, right)
+
+
+def extract_metric(snapshot, name, paths=METRIC_PATHS):
+    if name in paths:
+        path, default = paths[name]
+    else:
+        group, _, metric = name.rpartition(".")
+        group_path, default = ENDPOINT_METRIC_PATHS[metric]
+        path = ("endpoint_groups", group) + group_path
+    return _follow(snapshot, path, default)
+
+
+def _follow(snapshot, path, default):
+    value = snapshot
+    for key in path:
+        if not isinstance(value, dict):
+            return default
+        value = value.get(key)
+        if value is None:
+            return default
+    return value
+
+
+class CompiledRule:
+    def __init__(self, rule, variables=None):
+        for field in ("nombre", "condicion", "nivel"):
+            if field not in rule:
+                raise RuleSyntaxError(f"Regla sin campo '{field}': {rule}")
+
+        self.nombre = rule["nombre"]
+        self.condicion = rule["condicion"]
+        self.nivel = rule["nivel"]
+        self.mensaje = rule.get("mensaje", "")
+        self.canales = rule.get("canales", [])
+        self.por_endpoint = bool(rule.get("por_endpoint", False))
+        if variables is None:
+            variables = ENDPOINT_METRIC_PATHS if self.por_endpoint else METRIC_NAMES
+
+        try:
+            parser = _Parser(self.condicion, variables)
+            tree = parser.parse()
+        except RuleSyntaxError as e:
+            raise RuleSyntaxError(f"Regla '{self.nombre}': {e}") from None
+        self.variables = parser.used
+        self._predicate = _compile_scalar(tree)
+        self._vector_predicate = _compile_vector(tree)
+
+    def matches(self, values):
+        return bool(self._predicate(values))
+
+    def matches_series(self, columns, length):
+        result = self._vector_predicate(columns)
+        if not isinstance(result, list):
+            return [bool(result)] * length
+        return [bool(value) for value in result]
+
+
+class RuleEngine:
+    def __init__(self, rules):
+        self.rules = [CompiledRule(rule) for rule in rules]
+        self.variables = sorted({
+            name for rule in self.rules if not rule.por_endpoint for name in rule.variables
+        })
+        self.endpoint_variables = sorted({
+            name for rule in self.rules if rule.por_endpoint for name in rule.variables
+        })
+
+    def extract(self, snapshot):
+        return {name: extract_metric(snapshot, name) for name in self.variables}
+
+    def extract_endpoints(self, snapshot):
+        groups = snapshot.get("endpoint_groups") or {}
+        return {
+            group: {name: extract_metric(data, name, ENDPOINT_METRIC_PATHS) for name in self.endpoint_variables}
+            for group, data in groups.items()
+        }
+
+    def evaluate(self, snapshot):
+        # Devuelve pares (regla, grupo); el grupo es None en reglas globales.
+        values = self.extract(snapshot)
+        endpoint_values = self.extract_endpoints(snapshot) if self.endpoint_variables else {}
+        matches = []
+        for rule in self.rules:
+            if not rule.por_endpoint:
+                if rule.matches(values):
+                    matches.append((rule, None))
+                continue
+            for group, group_values in endpoint_values.items():
+                if rule.matches(group_values):
+                    matches.append((rule, group))
+        return matches
+
+    def columns(self, snapshots):
+        return {
+            name: [extract_metric(snapshot, name) for snapshot in snapshots]
+            for name in self.variables
+        }
+
+    def endpoint_columns(self, snapshots):
+        groups = sorted({group for snapshot in snapshots for group in (snapshot.get("endpoint_groups") or {})})
+        return {
+            group: {
+                name: [
+                    extract_metric((snapshot.get("endpoint_groups") or {}).get(group, {}), name, ENDPOINT_METRIC_PATHS)
+                    for snapshot in snapshots
+                ]
+                for name in self.endpoint_variables
+            }
+            for group in groups
+        }
+
+    def evaluate_series(self, snapshots, columns=None):
+        columns = columns if columns is not None else self.columns(snapshots)
+        length = len(snapshots) if snapshots is not None else len(next(iter(columns.values()), []))
+        results = {rule.nombre: rule.matches_series(columns, length) for rule in self.rules if not rule.por_endpoint}
+
+        if self.endpoint_variables and snapshots is not None:
+            for group, group_columns in self.endpoint_columns(snapshots).items():
+                for rule in self.rules:
+                    if rule.por_endpoint:
+                        results[f"{rule.nombre} [{group}]"] = rule.matches_series(group_columns, length)
+        return results
@@ -0,0 +1,208 @@
+import argparse
+import glob
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+FEATURE_KEYWORDS = ("Característica:", "Feature:")
+SCENARIO_KEYWORDS = ("Escenario:", "Scenario:")
+OUTLINE_KEYWORDS = ("Esquema del escenario:", "Scenario Outline:", "Scenario Template:")
+EXAMPLES_KEYWORDS = ("Ejemplos:", "Examples:", "Scenarios:")
+
+MEMORY_PER_WORKER_MB = 512
+# Escenarios que cambian el estado de una cuenta compartida (por ejemplo el
+# bloqueo tras intentos fallidos): se ejecutan todos en el mismo shard.
+PINNED_TAG = "@cuenta_compartida"
+
+
+def collect_scenarios(feature_paths):
+    locations = []
+    pinned = set()
+    for path in feature_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+
+        in_outline = False
+        in_examples = False
+        header_seen = False
+        feature_tags = set()
+        pending_tags = set()
+        outline_tags = set()
+        for number, raw_line in enumerate(lines, start=1):
+            line = raw_line.strip()
+            if line.startswith("@"):
+                pending_tags.update(tag for tag in line.split() if tag.startswith("@"))
+            elif line.startswith(FEATURE_KEYWORDS):
+                feature_tags, pending_tags = pending_tags, set()
+            elif line.startswith(OUTLINE_KEYWORDS):
+                in_outline, in_examples = True, False
+                outline_tags, pending_tags = feature_tags | pending_tags, set()
+            elif line.startswith(SCENARIO_KEYWORDS):
+                in_outline, in_examples = False, False
+                locations.append(f"{path}:{number}")
+                if PINNED_TAG in feature_tags | pending_tags:
+                    pinned.add(locations[-1])
+                pending_tags = set()
+            elif in_outline and line.startswith(EXAMPLES_KEYWORDS):
+                in_examples, header_seen = True, False
+                pending_tags = set()
+            elif in_examples and line.startswith("|"):
+                # La primera fila de la tabla es el encabezado.
+                if header_seen:
+                    locations.append(f"{path}:{number}")
+                    if PINNED_TAG in outline_tags:
+                        pinned.add(locations[-1])
+                header_seen = True
+            elif in_examples and line and not line.startswith("#"):
+                in_examples = False
+    return locations, pinned
+
+
+def default_worker_count():
+    workers = os.cpu_count() or 1
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    available_mb = int(line.split()[1]) // 1024
+                    workers = min(workers, max(1, available_mb // MEMORY_PER_WORKER_MB))
+                    break
+    except OSError:
+        pass
+    return workers
+
+
+def shard(locations, workers, pinned=()):
+    # Los escenarios fijados van al primer shard en el orden del archivo, como
+    # en una ejecución secuencial; el resto se reparte hacia los shards con
+    # menos escenarios.
+    shards = [[] for _ in range(workers)]
+    loads = [0] * workers
+    loads[0] = sum(1 for location in locations if location in pinned)
+    for location in locations:
+        if location in pinned:
+            shards[0].append(location)
+        else:
+            target = loads.index(min(loads))
+            shards[target].append(location)
+            loads[target] += 1
+    return [locations for locations in shards if locations]
+
+
+def _location_line(element):
+    match = re.search(r":(\d+)$", element.get("location", ""))
+    return int(match.group(1)) if match else 0
+
+
+def merge_results(result_files):
+    features = {}
+    order = []
+    for result_file in result_files:
+        if not os.path.exists(result_file) or os.path.getsize(result_file) == 0:
+            continue
+        with open(result_file, "r", encoding="utf-8") as f:
+            shard_features = json.load(f)
+
+        for feature in shard_features:
+            key = feature.get("location", "").rsplit(":", 1)[0] or feature.get("name")
+            if key not in features:
+                features[key] = dict(feature, elements=[])
+                order.append(key)
+
+            # Cada background del JSON de behave precede a su escenario: se
+            # agrupan para poder ordenar por la línea del escenario.
+            pending = []
+            for element in feature.get("elements", []):
+                if element.get("type") == "background":
+                    pending.append(element)
+                    continue
+                features[key]["elements"].append((_location_line(element), pending + [element]))
+                pending = []
+
+    merged = []
+    for key in order:
+        feature = features[key]
+        groups = sorted(feature["elements"], key=lambda group: group[0])
+        feature["elements"] = [element for _, elements in groups for element in elements]
+        merged.append(feature)
+    return merged
+
+
+def run_shards(shards, output_dir, behave_args):
+    os.makedirs(output_dir, exist_ok=True)
+    processes = []
+    for worker_id, locations in enumerate(shards):
+        result_file = os.path.join(output_dir, f"behave-results-{worker_id}.json")
+        command = [
+            sys.executable, "-m", "behave",
+            "--format", "json", "-o", result_file,
+            "--format", "progress",
+            *behave_args,
+            *locations
+        ]
+        env = dict(os.environ, HEADLESS="true", WORKER_ID=str(worker_id))
+        log = open(os.path.join(output_dir, f"behave-worker-{worker_id}.log"), "w")
+        processes.append((subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT), log, result_file))
+
+    result_files = []
+    exit_code = 0
+    for worker_id, (process, log, result_file) in enumerate(processes):
+        code = process.wait()
+        log.close()
+        print(f"Worker {worker_id}: {len(shards[worker_id])} escenarios, código de salida {code}")
+        exit_code = exit_code or code
+        result_files.append(result_file)
+    return exit_code, result_files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ejecuta los escenarios BDD repartidos en varios procesos",
+        epilog="Los argumentos después de -- se pasan tal cual a behave"
+    )
+    parser.add_argument("paths", nargs="*", default=["features"])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default="reports/behave-results.json")
+    parser.add_argument("--shard-dir", default="reports/shards")
+
+    argv = sys.argv[1:]
+    behave_args = []
+    if "--" in argv:
+        separator = argv.index("--")
+        argv, behave_args = argv[:separator], argv[separator + 1:]
+    args = parser.parse_args(argv)
+
+    feature_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            feature_paths.extend(sorted(glob.glob(os.path.join(path, "**", "*.feature"), recursive=True)))
+        else:
+            feature_paths.append(path)
+
+    locations, pinned = collect_scenarios(feature_paths)
+    if not locations:
+        print("No se encontraron escenarios para ejecutar")
+        return 1
+
+    workers = min(args.workers or default_worker_count(), len(locations))
+    shards = shard(locations, workers, pinned)
+    print(f"Ejecutando {len(locations)} escenarios en {len(shards)} workers")
+
+    started = time.perf_counter()
+    exit_code, result_files = run_shards(shards, args.shard_dir, behave_args)
+    elapsed = time.perf_counter() - started
+
+    merged = merge_results(result_files)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=2, ensure_ascii=False)
+
+    print(f"Resultados combinados en {args.output} ({elapsed:.1f}s)")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+import csv
+import json
+import math
+import os
+import random
+import time
+from statistics import NormalDist
+
+from latency_histogram import LatencyHistogram
+from locust_csv_stream import REQUEST_LOG_COLUMNS
+from metrics_store import ENDPOINT_METRICS, MetricsStore
+
+# Si cambia el formato de algún archivo, los datos ya generados se descartan.
+SYNTHETIC_VERSION = 1
+
+ENDPOINTS = [
+    ("POST", "Login - Credenciales Válidas"),
+    ("POST", "Login - Contraseña Inválida"),
+    ("POST", "Login - Email Inválido"),
+    ("GET", "Verificar Sesión"),
+    ("POST", "Stress Test - Login")
+]
+PERCENTILES = [("50%", 0.50), ("66%", 0.66), ("75%", 0.75), ("80%", 0.80), ("90%", 0.90), ("95%", 0.95),
+               ("98%", 0.98), ("99%", 0.99), ("99.9%", 0.999), ("99.99%", 0.9999), ("100%", 0.99999)]
+
+STATS_COLUMNS = ["Type", "Name", "Request Count", "Failure Count", "Median Response Time", "Average Response Time",
+                 "Min Response Time", "Max Response Time", "Average Content Size", "Requests/s", "Failures/s"]
+HISTORY_COLUMNS = ["Timestamp", "User Count", "Type", "Name", "Requests/s", "Failures/s"]
+HISTORY_TOTAL_COLUMNS = ["Total Request Count", "Total Failure Count", "Total Median Response Time",
+                         "Total Average Response Time", "Total Min Response Time", "Total Max Response Time",
+                         "Total Average Content Size"]
+
+LATENCY_MEDIAN_MS = 120.0
+LATENCY_SIGMA = 0.5
+ERROR_RATE = 0.02
+REQUESTS_PER_SECOND = 500
+START_TIMESTAMP = 1700000000
+WRITE_BATCH = 10000
+
+
+def latency_quantile(quantile, median=LATENCY_MEDIAN_MS, sigma=LATENCY_SIGMA):
+    # Percentil exacto de la distribución lognormal usada en los datos: es
+    # la verdad conocida contra la que se comparan los percentiles calculados.
+    return median * math.exp(sigma * NormalDist().inv_cdf(quantile))
+
+
+def _percentile_values():
+    return [f"{latency_quantile(quantile):.0f}" for _, quantile in PERCENTILES]
+
+
+def write_request_log(path, rows, seed=1):
+    rng = random.Random(seed)
+    mu = math.log(LATENCY_MEDIAN_MS)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(REQUEST_LOG_COLUMNS)
+        batch = []
+        for index in range(rows):
+            request_type, name = ENDPOINTS[index % len(ENDPOINTS)]
+            batch.append((
+                f"{START_TIMESTAMP + index / REQUESTS_PER_SECOND:.3f}",
+                request_type,
+                name,
+                f"{rng.lognormvariate(mu, LATENCY_SIGMA):.1f}",
+                "0" if rng.random() < ERROR_RATE else "1",
+                "",
+                ""
+            ))
+            if len(batch) >= WRITE_BATCH:
+                writer.writerows(batch)
+                batch.clear()
+        writer.writerows(batch)
+
+
+def write_stats(path, rows):
+    requests = max(1, rows // len(ENDPOINTS))
+    failures = int(requests * ERROR_RATE)
+    duration = max(1.0, rows / REQUESTS_PER_SECOND)
+    percentiles = _percentile_values()
+    average = f"{LATENCY_MEDIAN_MS * math.exp(LATENCY_SIGMA ** 2 / 2):.1f}"
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(STATS_COLUMNS + [column for column, _ in PERCENTILES])
+        for request_type, name in ENDPOINTS + [("", "Aggregated")]:
+            count = requests * (len(ENDPOINTS) if name == "Aggregated" else 1)
+            failed = failures * (len(ENDPOINTS) if name == "Aggregated" else 1)
+            writer.writerow([request_type, name, count, failed, percentiles[0], average, "5", percentiles[-1], "64",
+                             f"{count / duration:.2f}", f"{failed / duration:.2f}"] + percentiles)
+
+
+def write_stats_history(path, rows, seed=1, users=50, ramp_seconds=30):
+    # Una fila por endpoint y segundo, más la fila Aggregated, con
+    # contadores acumulados como los escribe Locust con --csv-full-history.
+    rng = random.Random(seed)
+    names = ENDPOINTS + [("", "Aggregated")]
+    seconds = max(1, rows // len(names))
+    per_endpoint = REQUESTS_PER_SECOND / len(ENDPOINTS)
+    percentiles = _percentile_values()
+    totals = {name: [0, 0] for _, name in names}
+
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(HISTORY_COLUMNS + [column for column, _ in PERCENTILES] + HISTORY_TOTAL_COLUMNS)
+        batch = []
+        for second in range(seconds):
+            ramp = min(1.0, (second + 1) / ramp_seconds)
+            aggregated = [0, 0]
+            for request_type, name in names:
+                if name == "Aggregated":
+                    requests, failures = aggregated
+                else:
+                    requests = int(per_endpoint * ramp * rng.uniform(0.9, 1.1))
+                    failures = int(requests * ERROR_RATE + rng.random())
+                    aggregated[0] += requests
+                    aggregated[1] += failures
+                total = totals[name]
+                total[0] += requests
+                total[1] += failures
+                batch.append([START_TIMESTAMP + second, int(users * ramp), request_type, name,
+                              requests, failures] + percentiles +
+                             [total[0], total[1], percentiles[0], percentiles[0], "5", percentiles[-1], "64"])
+            if len(batch) >= WRITE_BATCH:
+                writer.writerows(batch)
+                batch.clear()
+        writer.writerows(batch)
+
+
+def write_latency_file(path, rows, seed=1, max_samples=1000000):
+    # Los histogramas se llenan con hasta max_samples muestras y se escalan
+    # al total de filas; la forma de la distribución es la misma.
+    rng = random.Random(seed)
+    mu = math.log(LATENCY_MEDIAN_MS)
+    samples = min(rows, max_samples)
+    weight = max(1, rows // samples)
+    histograms = {name: LatencyHistogram() for _, name in ENDPOINTS}
+    for index in range(samples):
+        histograms[ENDPOINTS[index % len(ENDPOINTS)][1]].record(rng.lognormvariate(mu, LATENCY_SIGMA), weight)
+    with open(path, "w") as f:
+        json.dump({"endpoints": {name: histogram.to_dict() for name, histogram in histograms.items()}}, f)
+
+
+def write_behave_results(path, steps, steps_per_scenario=5, scenarios_per_feature=50, seed=1):
+    # Se escribe feature por feature para no tener el JSON completo en memoria.
+    rng = random.Random(seed)
+    scenarios = max(1, steps // steps_per_scenario)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for feature_index, first in enumerate(range(0, scenarios, scenarios_per_feature)):
+            elements = []
+            for scenario_index in range(first, min(first + scenarios_per_feature, scenarios)):
+                # behave repite el background antes de cada escenario.
+                elements.append({
+                    "type": "background",
+                    "keyword": "Antecedentes",
+                    "name": "",
+                    "steps": [{"keyword": "Dado", "name": "que estoy en la página de login",
+                               "result": {"status": "passed", "duration": 0.2}}]
+                })
+                failed_step = rng.randrange(steps_per_scenario) if rng.random() < 0.05 else None
+                scenario_steps = []
+                for step_index in range(steps_per_scenario):
+                    if failed_step is None or step_index < failed_step:
+                        result = {"status": "passed", "duration": round(rng.uniform(0.01, 0.5), 3)}
+                    elif step_index == failed_step:
+                        result = {"status": "failed", "duration": round(rng.uniform(0.5, 10), 3),
+                                  "error_message": [f"AssertionError: Error esperado en paso {step_index}",
+                                                    "  File \"features/steps/login_steps.py\", line 180"]}
+                    else:
+                        result = {"status": "skipped"}
+                    scenario_steps.append({"keyword": "Cuando" if step_index else "Y",
+                                           "name": f"paso {step_index} del escenario {scenario_index}",
+                                           "result": result})
+                elements.append({
+                    "type": "scenario",
+                    "keyword": "Escenario",
+                    "name": f"Escenario sintético {scenario_index} <login>",
+                    "status": "failed" if failed_step is not None else "passed",
+                    "steps": scenario_steps
+                })
+            if feature_index:
+                f.write(",\n")
+            json.dump({"keyword": "Característica", "name": f"Feature sintética {feature_index}",
+                       "status": "passed", "elements": elements}, f, ensure_ascii=False)
+        f.write("\n]\n")
+
+
+def metric_snapshot(rng, index, timestamp):
+    degraded = rng.random() < 0.1
+    factor = rng.uniform(1.5, 3.0) if degraded else rng.uniform(0.8, 1.2)
+    groups = {}
+    for group in ("login", "session"):
+        p95 = latency_quantile(0.95) * factor * (0.4 if group == "session" else 1.0)
+        groups[group] = {
+            "p50": round(p95 / 2.3, 2), "p95": round(p95, 2), "p99": round(p95 * 1.5, 2), "p999": round(p95 * 2.2, 2),
+            "error_rate": round(rng.uniform(0, 8 if degraded else 2), 2),
+            "success_rate": 0.0, "throughput_rps": round(rng.uniform(50, 300), 2),
+            "gates_failed": int(degraded)
+        }
+        groups[group]["success_rate"] = round(100 - groups[group]["error_rate"], 2)
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp)),
+        "summary": {"total_requests": 10000 + index, "error_rate": groups["login"]["error_rate"],
+                    "throughput_rps": round(groups["login"]["throughput_rps"] + groups["session"]["throughput_rps"], 2)},
+        "response_times": {key: groups["login"][key] for key in ("p50", "p95", "p99", "p999")},
+        "bdd_metrics": {"success_rate": round(rng.uniform(90, 100), 1)},
+        "endpoint_groups": groups
+    }
+
+
+def write_metric_snapshots(path, rows, seed=1):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        batch = []
+        for index in range(rows):
+            batch.append(json.dumps(metric_snapshot(rng, index, START_TIMESTAMP + index * 60)))
+            if len(batch) >= WRITE_BATCH:
+                f.write("\n".join(batch) + "\n")
+                batch.clear()
+        if batch:
+            f.write("\n".join(batch) + "\n")
+
+
+def write_metrics_history(path, rows, seed=1, days=89, branches=("main", "feature")):
+    # rows es el número de filas de endpoint_metrics; las ejecuciones se
+    # reparten en los últimos `days` días para que entren en las tendencias.
+    rng = random.Random(seed)
+    runs = max(1, rows // len(ENDPOINTS))
+    now = time.time()
+    step = days * 86400 / runs
+    store = MetricsStore(path)
+    run_rows = []
+    endpoint_rows = []
+
+    def flush():
+        with store.connection:
+            store.connection.executemany(
+                "INSERT INTO runs (id, timestamp, branch, commit_sha, status, total_requests, failed_requests, "
+                "tps, sustained_tps, error_rate, p50, p95, p99, p999) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                run_rows
+            )
+            store.connection.executemany(
+                f"INSERT INTO endpoint_metrics (endpoint, timestamp, run_id, branch, {', '.join(ENDPOINT_METRICS)}) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                endpoint_rows
+            )
+        run_rows.clear()
+        endpoint_rows.clear()
+
+    for run in range(runs):
+        timestamp = now - days * 86400 + run * step
+        branch = branches[run % len(branches)]
+        p95 = latency_quantile(0.95) * rng.uniform(0.8, 1.3)
+        run_rows.append((run + 1, timestamp, branch, f"{run:040x}", "PASS", 10000, 200, 300.0, 290.0, 2.0,
+                         p95 / 2.3, p95, p95 * 1.5, p95 * 2.2))
+        for _, name in ENDPOINTS:
+            endpoint_p95 = p95 * rng.uniform(0.7, 1.3)
+            endpoint_rows.append((name, timestamp, run + 1, branch, 2000, 40, 2.0,
+                                  endpoint_p95 / 2.3, endpoint_p95, endpoint_p95 * 1.5, endpoint_p95 * 2.2))
+        if len(endpoint_rows) >= WRITE_BATCH:
+            flush()
+    flush()
+    store.close()
+
+
+def generate(directory, rows, seed=1):
+    # Genera todos los archivos de un tamaño; si ya existen con la misma
+    # versión y semilla se reutilizan.
+    marker = os.path.join(directory, ".complete")
+    signature = f"{SYNTHETIC_VERSION}:{rows}:{seed}"
+    if os.path.exists(marker):
+        with open(marker) as f:
+            if f.read() == signature:
+                return False
+
+    os.makedirs(directory, exist_ok=True)
+    history_db = os.path.join(directory, "metrics_history.db")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(history_db + suffix):
+            os.remove(history_db + suffix)
+
+    write_request_log(os.path.join(directory, "performance_requests.csv"), rows, seed)
+    write_stats(os.path.join(directory, "performance_stats.csv"), rows)
+    write_stats_history(os.path.join(directory, "performance_stats_history.csv"), rows, seed)
+    write_latency_file(os.path.join(directory, "performance_latency.json"), rows, seed)
+    write_latency_file(os.path.join(directory, "baseline_latency.json"), rows, seed + 1)
+    write_behave_results(os.path.join(directory, "behave-results.json"), rows, seed=seed)
+    write_metric_snapshots(os.path.join(directory, "metric_snapshots.jsonl"), rows, seed)
+    write_metrics_history(history_db, rows, seed)
+
+    with open(marker, "w") as f:
+        f.write(signature)
+    return True
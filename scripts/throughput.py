@@ -0,0 +1,154 @@
+import math
+from collections import Counter, defaultdict
+
+AGGREGATED = "Aggregated"
+
+
+def _window_averages(series, window):
+    window = min(window, len(series))
+    if not window:
+        return []
+
+    running = sum(series[:window])
+    averages = [running / window]
+    for index in range(window, len(series)):
+        running += series[index] - series[index - window]
+        averages.append(running / window)
+    return averages
+
+
+class ThroughputSeries:
+    """Conteo de peticiones por segundo y por endpoint.
+
+    Se alimenta con timestamps reales (log de peticiones o historial de
+    Locust) y calcula TPS por segundo, en ventana deslizante y sobre la fase
+    estable de la prueba, descartando el arranque y la bajada de usuarios.
+    """
+
+    def __init__(self, window_seconds=10, steady_ratio=0.9):
+        self.window_seconds = window_seconds
+        self.steady_ratio = steady_ratio
+        self._requests = defaultdict(Counter)
+        self._failures = defaultdict(Counter)
+        self._users = {}
+
+    def add(self, second, endpoint, count=1, failures=0):
+        self._requests[endpoint][second] += count
+        self._requests[AGGREGATED][second] += count
+        if failures:
+            self._failures[endpoint][second] += failures
+            self._failures[AGGREGATED][second] += failures
+
+    def add_total(self, second, count, failures=0):
+        self._requests[AGGREGATED][second] += count
+        if failures:
+            self._failures[AGGREGATED][second] += failures
+
+    def set_users(self, second, users):
+        self._users[second] = users
+
+    def ingest_request_chunk(self, chunk):
+        seconds = [int(float(timestamp)) for timestamp in chunk["timestamp"]]
+        for (second, name), count in Counter(zip(seconds, chunk["name"])).items():
+            self._requests[name][second] += count
+            self._requests[AGGREGATED][second] += count
+
+        failed = [(second, name) for second, name, success in zip(seconds, chunk["name"], chunk["success"]) if success == "0"]
+        for (second, name), count in Counter(failed).items():
+            self._failures[name][second] += count
+            self._failures[AGGREGATED][second] += count
+
+    def endpoints(self):
+        return [name for name in self._requests if name != AGGREGATED]
+
+    def bounds(self):
+        seconds = self._requests[AGGREGATED]
+        if not seconds:
+            return None
+        return min(seconds), max(seconds)
+
+    def per_second(self, endpoint=AGGREGATED):
+        bounds = self.bounds()
+        if bounds is None:
+            return []
+        counts = self._requests.get(endpoint, {})
+        return [counts.get(second, 0) for second in range(bounds[0], bounds[1] + 1)]
+
+    def sliding_window(self, endpoint=AGGREGATED, window_seconds=None):
+        return _window_averages(self.per_second(endpoint), window_seconds or self.window_seconds)
+
+    def steady_state(self):
+        bounds = self.bounds()
+        if bounds is None:
+            return None
+        start, end = bounds
+
+        if self._users:
+            # Con el número de usuarios del historial se descarta primero todo
+            # lo que ocurre antes de alcanzar el máximo de usuarios lanzados.
+            peak = max(self._users.values())
+            at_peak = sorted(second for second, users in self._users.items() if users == peak)
+            if len(at_peak) > 1:
+                start, end = max(at_peak[0], start), min(at_peak[-1], end)
+
+        # Dentro de ese tramo, la fase estable es donde el TPS suavizado se
+        # mantiene cerca de la meseta; así se recortan el calentamiento y la
+        # bajada final aunque no haya datos de usuarios.
+        series = self.per_second()[start - bounds[0]:end - bounds[0] + 1]
+        smoothed = _window_averages(series, self.window_seconds)
+        if len(smoothed) < 3:
+            return start, end
+
+        plateau = sorted(smoothed)[int(len(smoothed) * 0.75)]
+        threshold = plateau * self.steady_ratio
+        above = [index for index, value in enumerate(smoothed) if value >= threshold]
+        if not above:
+            return start, end
+
+        # El promedio en la posición i cubre [i, i + ventana); los segundos de
+        # los bordes que quedan bajo el umbral se recortan uno a uno.
+        window = min(self.window_seconds, len(series))
+        first, last = above[0], min(above[-1] + window - 1, len(series) - 1)
+        while first < last and series[first] < threshold:
+            first += 1
+        while last > first and series[last] < threshold:
+            last -= 1
+        return start + first, start + last
+
+    def summarize(self, endpoint=AGGREGATED, window=None):
+        window = window or self.steady_state()
+        if window is None:
+            return None
+
+        bounds = self.bounds()
+        series = self.per_second(endpoint)[window[0] - bounds[0]:window[1] - bounds[0] + 1]
+        duration = len(series)
+        requests = sum(series)
+        failures = sum(
+            count for second, count in self._failures.get(endpoint, {}).items()
+            if window[0] <= second <= window[1]
+        )
+
+        sliding = sorted(_window_averages(series, self.window_seconds))
+
+        return {
+            "steady_start": window[0],
+            "steady_end": window[1],
+            "duration_s": duration,
+            "requests": requests,
+            "failures": failures,
+            "error_rate": failures / requests * 100 if requests else 0.0,
+            "min_tps": min(series) if series else 0,
+            "max_tps": max(series) if series else 0,
+            "mean_tps": requests / duration if duration else 0.0,
+            "sustained_tps": sliding[int(math.floor(len(sliding) * 0.05))] if sliding else 0.0
+        }
+
+    def summarize_all(self):
+        window = self.steady_state()
+        if window is None:
+            return {}
+        summaries = {AGGREGATED: self.summarize(AGGREGATED, window)}
+        for endpoint in self.endpoints():
+            summaries[endpoint] = self.summarize(endpoint, window)
+        return summaries
@@ -0,0 +1,244 @@
+import json
+import os
+import time
+from time import perf_counter_ns
+
+import gevent
+from gevent.pywsgi import WSGIServer
+
+from latency_histogram import LatencyHistogram
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+QUANTILES = (50, 95, 99, 99.9)
+OVERHEAD_SAMPLE_EVERY = 1024
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class LiveMetrics:
+    """Métricas en vivo de la prueba: contadores acumulados y una ventana móvil por segundo."""
+
+    def __init__(self, window_seconds=10):
+        self.window_seconds = window_seconds
+        self.current = {}
+        self.window = {}
+        self.totals = {}
+        self.pending = []
+        self.keep_pending = False
+        self.users = 0
+        self.started = time.time()
+        self.calls = 0
+        self.overhead_ns = 0
+        self.overhead_samples = 0
+        self._greenlets = []
+        self._server = None
+
+    def record(self, name, response_time, failed):
+        # Sin locks: con gevent los hooks de cada worker corren en un solo
+        # hilo y aquí no se cede el control, así que el bloque del segundo
+        # actual solo lo toca una petición a la vez.
+        slot = self.current.get(name)
+        if slot is None:
+            slot = self.current[name] = [0, 0, LatencyHistogram()]
+        slot[0] += 1
+        if failed:
+            slot[1] += 1
+        slot[2].record(response_time)
+
+    def observe(self, name, response_time, failed):
+        # Una de cada OVERHEAD_SAMPLE_EVERY llamadas se cronometra para
+        # publicar el costo del exportador sin medir todas.
+        self.calls += 1
+        if self.calls % OVERHEAD_SAMPLE_EVERY:
+            self.record(name, response_time, failed)
+            return
+        started = perf_counter_ns()
+        self.record(name, response_time, failed)
+        self.overhead_ns += perf_counter_ns() - started
+        self.overhead_samples += 1
+
+    def rotate(self, now=None):
+        now = now if now is not None else time.time()
+        closed, self.current = self.current, {}
+        if closed:
+            second = int(now) - 1
+            self._add_bucket(second, closed)
+            if self.keep_pending:
+                self.pending.append((second, closed))
+
+        oldest = int(now) - self.window_seconds
+        for second in [second for second in self.window if second < oldest]:
+            del self.window[second]
+
+    def _add_bucket(self, second, bucket):
+        slots = self.window.setdefault(second, {})
+        for name, (count, failures, histogram) in bucket.items():
+            total = self.totals.setdefault(name, [0, 0])
+            total[0] += count
+            total[1] += failures
+            slot = slots.get(name)
+            if slot is None:
+                # Se copia: el bloque original puede seguir pendiente de envío.
+                slots[name] = [count, failures, LatencyHistogram().merge(histogram)]
+            else:
+                slot[0] += count
+                slot[1] += failures
+                slot[2].merge(histogram)
+
+    def drain(self):
+        # Bloques cerrados desde el último reporte del worker al master.
+        pending, self.pending = self.pending, []
+        return [
+            (second, {name: [count, failures, histogram.to_dict()] for name, (count, failures, histogram) in bucket.items()})
+            for second, bucket in pending
+        ]
+
+    def merge_remote(self, buckets):
+        for second, bucket in buckets:
+            self._add_bucket(second, {
+                name: (count, failures, LatencyHistogram.from_dict(histogram))
+                for name, (count, failures, histogram) in bucket.items()
+            })
+
+    def snapshot(self, now=None):
+        now = now if now is not None else time.time()
+        oldest = int(now) - self.window_seconds
+        span = max(1.0, min(self.window_seconds, now - self.started))
+
+        endpoints = {}
+        overall = [0, 0, LatencyHistogram()]
+        for second, slots in self.window.items():
+            if second < oldest:
+                continue
+            for name, (count, failures, histogram) in slots.items():
+                endpoint = endpoints.get(name)
+                if endpoint is None:
+                    endpoint = endpoints[name] = [0, 0, LatencyHistogram()]
+                endpoint[0] += count
+                endpoint[1] += failures
+                endpoint[2].merge(histogram)
+                overall[0] += count
+                overall[1] += failures
+                overall[2].merge(histogram)
+
+        total_requests = sum(total[0] for total in self.totals.values())
+        total_failures = sum(total[1] for total in self.totals.values())
+        # Mismo formato que reports/performance_metrics.json para que
+        # AlertManager pueda evaluar las reglas durante la prueba.
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)),
+            "origen": "en_vivo",
+            "window_seconds": self.window_seconds,
+            "summary": dict(self._window_summary(overall, span), total_requests=total_requests,
+                            failed_requests=total_failures, usuarios=self.users),
+            "response_times": self._percentiles(overall[2]),
+            "endpoints": {
+                name: dict(self._window_summary(endpoint, span), **self._percentiles(endpoint[2]))
+                for name, endpoint in sorted(endpoints.items())
+            },
+            "exporter": {
+                "overhead_ns": self.overhead_ns / self.overhead_samples if self.overhead_samples else None,
+                "samples": self.overhead_samples
+            }
+        }
+
+    def _window_summary(self, slot, span):
+        count, failures = slot[0], slot[1]
+        return {
+            "throughput_rps": round(count / span, 2),
+            "error_rate": round(failures / count * 100, 2) if count else 0.0
+        }
+
+    def _percentiles(self, histogram):
+        values = histogram.percentiles(QUANTILES)
+        return {
+            "p50": round(values[50], 2),
+            "p95": round(values[95], 2),
+            "p99": round(values[99], 2),
+            "p999": round(values[99.9], 2)
+        }
+
+    def to_prometheus(self, now=None):
+        snapshot = self.snapshot(now)
+        lines = [
+            "# HELP locust_requests_total Peticiones completadas por endpoint.",
+            "# TYPE locust_requests_total counter"
+        ]
+        for name, (count, _) in sorted(self.totals.items()):
+            lines.append(f'locust_requests_total{{endpoint="{_label(name)}"}} {count}')
+        lines += ["# HELP locust_failures_total Peticiones fallidas por endpoint.",
+                  "# TYPE locust_failures_total counter"]
+        for name, (_, failures) in sorted(self.totals.items()):
+            lines.append(f'locust_failures_total{{endpoint="{_label(name)}"}} {failures}')
+
+        lines += [f"# HELP locust_requests_per_second Peticiones por segundo en los últimos {self.window_seconds}s.",
+                  "# TYPE locust_requests_per_second gauge"]
+        lines += [f'locust_requests_per_second{{endpoint="{_label(name)}"}} {endpoint["throughput_rps"]}'
+                  for name, endpoint in snapshot["endpoints"].items()]
+        lines += ["# HELP locust_error_rate_percent Porcentaje de error en la ventana.",
+                  "# TYPE locust_error_rate_percent gauge"]
+        lines += [f'locust_error_rate_percent{{endpoint="{_label(name)}"}} {endpoint["error_rate"]}'
+                  for name, endpoint in snapshot["endpoints"].items()]
+
+        # "quantile" es exclusiva de las métricas summary; como gauge la
+        # etiqueta se llama "percentile".
+        lines += ["# HELP locust_response_time_ms Percentiles de latencia en la ventana.",
+                  "# TYPE locust_response_time_ms gauge"]
+        for name, endpoint in snapshot["endpoints"].items():
+            for percentile, key in (("50", "p50"), ("95", "p95"), ("99", "p99"), ("99.9", "p999")):
+                lines.append(f'locust_response_time_ms{{endpoint="{_label(name)}",percentile="{percentile}"}} {endpoint[key]}')
+
+        lines += ["# HELP locust_users Usuarios concurrentes.", "# TYPE locust_users gauge",
+                  f"locust_users {self.users}"]
+        if snapshot["exporter"]["overhead_ns"] is not None:
+            lines += ["# HELP locust_live_exporter_overhead_ns Costo medio del hook por petición (muestreado).",
+                      "# TYPE locust_live_exporter_overhead_ns gauge",
+                      f"locust_live_exporter_overhead_ns {snapshot['exporter']['overhead_ns']:.0f}"]
+        return "\n".join(lines) + "\n"
+
+    def wsgi_app(self, environ, start_response):
+        path = environ.get("PATH_INFO", "/")
+        if path == "/metrics":
+            body, content_type = self.to_prometheus(), PROMETHEUS_CONTENT_TYPE
+        elif path == "/metrics.json":
+            body, content_type = json.dumps(self.snapshot()), "application/json"
+        else:
+            start_response("404 Not Found", [("Content-Type", "text/plain")])
+            return [b"Rutas disponibles: /metrics, /metrics.json\n"]
+        data = body.encode("utf-8")
+        start_response("200 OK", [("Content-Type", content_type), ("Content-Length", str(len(data)))])
+        return [data]
+
+    def write_json(self, path):
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(self.snapshot(), f, indent=2)
+        os.replace(temporary, path)
+
+    def start(self, runner, port=None, json_file=None, keep_pending=False):
+        self.keep_pending = keep_pending
+        self.started = time.time()
+        if port:
+            self._server = WSGIServer(("0.0.0.0", int(port)), self.wsgi_app, log=None)
+            self._server.start()
+            print(f"Métricas en vivo en http://0.0.0.0:{port}/metrics")
+        if json_file:
+            os.makedirs(os.path.dirname(json_file) or ".", exist_ok=True)
+        self._greenlets.append(gevent.spawn(self._tick, runner, json_file))
+
+    def _tick(self, runner, json_file):
+        while True:
+            gevent.sleep(1.0 - time.time() % 1.0)
+            self.rotate()
+            self.users = runner.user_count if runner is not None else 0
+            if json_file:
+                self.write_json(json_file)
+
+    def stop(self):
+        gevent.killall(self._greenlets)
+        self._greenlets = []
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
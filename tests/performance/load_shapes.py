@@ -0,0 +1,173 @@
+import math
+import re
+import time
+
+import gevent
+from locust import LoadTestShape
+
+from performance_config import LOAD_TEST_SCENARIOS
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(duration):
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smh]?)\s*", str(duration))
+    if not match:
+        raise ValueError(f"Duración inválida: {duration}")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2) or "s"]
+
+
+def get_profile(name):
+    if name not in LOAD_TEST_SCENARIOS:
+        raise ValueError(f"Perfil de carga desconocido: {name}. Disponibles: {', '.join(LOAD_TEST_SCENARIOS)}")
+    return LOAD_TEST_SCENARIOS[name]
+
+
+class ProfileLoadShape(LoadTestShape):
+    abstract = True
+    profile = None
+
+    def __init__(self):
+        super().__init__()
+        scenario = get_profile(self.profile)
+        self.users = scenario["users"]
+        self.spawn_rate = scenario["spawn_rate"]
+        self.duration = parse_duration(scenario["duration"])
+
+    def tick(self):
+        if self.get_run_time() >= self.duration:
+            return None
+        return self.users, self.spawn_rate
+
+
+class ArrivalScheduler:
+    """Agenda las iteraciones de los usuarios a una tasa fija (modelo abierto)."""
+
+    def __init__(self, rate, late_tolerance=0.05, max_lateness=1.0):
+        # La agenda se lleva en nanosegundos de perf_counter_ns: monótono y
+        # sin pérdida de precisión en pruebas largas.
+        self.rate = rate
+        self.late_tolerance = int(late_tolerance * 1e9)
+        self.max_lateness = int(max_lateness * 1e9)
+        self.next_at = None
+        self.partition(0, 1)
+        self.counters = {"scheduled": 0, "late": 0, "missed": 0, "lateness_sum": 0.0, "max_lateness": 0.0}
+
+    def partition(self, worker_index, worker_count):
+        # Cada worker genera su parte de la tasa sin coordinarse con los demás;
+        # el desfase intercala sus llegadas en lugar de enviarlas juntas.
+        self.interval = max(1, round(worker_count * 1e9 / self.rate))
+        self.offset = round(worker_index * 1e9 / self.rate)
+        self.next_at = None
+
+    def next_slot(self):
+        now = time.perf_counter_ns()
+        if self.next_at is None:
+            self.next_at = now + self.offset
+        slot = self.next_at
+        lateness = now - slot
+        if lateness > self.max_lateness:
+            # No hubo un usuario libre a tiempo: esas llegadas se pierden y la
+            # agenda salta a la primera que todavía puede salir.
+            missed = (lateness - self.max_lateness) // self.interval + 1
+            self.counters["missed"] += missed
+            slot += missed * self.interval
+            lateness = now - slot
+        self.next_at = slot + self.interval
+
+        self.counters["scheduled"] += 1
+        if lateness > self.late_tolerance:
+            self.counters["late"] += 1
+            self.counters["lateness_sum"] += lateness / 1e9
+            self.counters["max_lateness"] = max(self.counters["max_lateness"], lateness / 1e9)
+        return slot, max(0.0, -lateness / 1e9)
+
+    def drain(self):
+        counters = dict(self.counters)
+        for key in self.counters:
+            self.counters[key] = 0
+        return counters
+
+    def merge(self, counters):
+        for key, value in counters.items():
+            if key == "max_lateness":
+                self.counters[key] = max(self.counters[key], value)
+            else:
+                self.counters[key] += value
+
+
+def apply_arrival_rate(user_classes, scheduler):
+    # Cada usuario toma la próxima llegada libre de la agenda en lugar de
+    # esperar un tiempo propio; la hora prevista queda en arrival_slot_ns.
+    def wait_time_func(user):
+        user.arrival_slot_ns, delay = scheduler.next_slot()
+        user.send_delay_ns = None
+        return delay
+
+    def scheduled_start(on_start):
+        # Sin esto la primera tarea de cada usuario nuevo saldría fuera de la
+        # agenda, en ráfaga con las de los demás usuarios lanzados.
+        def on_start_func(user):
+            on_start(user)
+            gevent.sleep(user.wait_time())
+        return on_start_func
+
+    for user_class in user_classes:
+        user_class.wait_time = wait_time_func
+        user_class.on_start = scheduled_start(user_class.on_start)
+
+
+def track_think_time(user_classes):
+    # En el modelo cerrado no hay hora prevista de envío; el tiempo de espera
+    # recién usado es el intervalo con que el usuario habría seguido enviando
+    # peticiones si el servidor no lo hubiera retenido.
+    def remember(wait_time):
+        def wait_time_func(user):
+            seconds = wait_time(user)
+            user.think_time_ms = seconds * 1000
+            return seconds
+        return wait_time_func
+
+    for user_class in user_classes:
+        user_class.wait_time = remember(user_class.wait_time)
+
+
+class ArrivalRateShape(LoadTestShape):
+    abstract = True
+    rate = None
+    duration = None
+    scheduler = None
+    max_users = None
+    # Tiempo de iteración supuesto hasta que haya percentiles medidos.
+    initial_latency = 0.5
+    headroom = 1.5
+
+    def __init__(self):
+        super().__init__()
+        self.users = self.required_users(self.initial_latency)
+        self.last_missed = 0
+
+    def required_users(self, latency):
+        # Ley de Little: usuarios ocupados = llegadas por segundo x segundos
+        # por iteración, con margen para la variación de la latencia.
+        users = max(1, math.ceil(self.rate * latency * self.headroom))
+        return min(users, self.max_users) if self.max_users else users
+
+    def tick(self):
+        if self.get_run_time() >= self.duration:
+            return None
+
+        p95 = self.runner.stats.total.get_current_response_time_percentile(0.95)
+        if p95:
+            self.users = max(self.users, self.required_users(p95 / 1000))
+
+        # Si igual se perdieron llegadas, la latencia observada no alcanza:
+        # se agrega un 25% más de usuarios.
+        missed = self.scheduler.counters["missed"] if self.scheduler else 0
+        if missed > self.last_missed:
+            self.users = max(self.users + 1, math.ceil(self.users * 1.25))
+            if self.max_users:
+                self.users = min(self.users, self.max_users)
+        self.last_missed = missed
+
+        return self.users, self.users
@@ -1,41 +1,289 @@
-from locust import HttpUser, task, between
+from locust import HttpUser, TaskSet, task, between, events
+from locust.contrib.fasthttp import FastHttpUser
+from locust.runners import MasterRunner, WorkerRunner
+from itertools import cycle
 import json
+import os
 import random
+import sys
 import time
 
-class LoginPerformanceTest(HttpUser):
-    wait_time = between(1, 3)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+from credential_feeder import CredentialFeeder, CredentialTable
+from latency_histogram import LatencyHistogram
+from locust_csv_stream import RequestLogWriter
+from load_shapes import (ArrivalRateShape, ArrivalScheduler, ProfileLoadShape, apply_arrival_rate, get_profile,
+                         parse_duration, track_think_time)
+from live_metrics import LiveMetrics
+from performance_config import SESSION_ENDPOINTS
+
+LATENCY_OUTPUT = os.environ.get("LATENCY_OUTPUT", "reports/performance_latency.json")
+REQUEST_LOG = os.environ.get("REQUEST_LOG")
+LOAD_PROFILE = os.environ.get("LOAD_PROFILE")
+# Modelo abierto: iteraciones por segundo del total de usuarios, en lugar de
+# una espera entre tareas por usuario.
+ARRIVAL_RATE = float(os.environ.get("ARRIVAL_RATE", "0"))
+ARRIVAL_MAX_USERS = int(os.environ.get("ARRIVAL_MAX_USERS", "0"))
+LIVE_METRICS_PORT = os.environ.get("LIVE_METRICS_PORT")
+LIVE_METRICS_FILE = os.environ.get("LIVE_METRICS_FILE")
+# Tabla de credenciales de scripts/credential_feeder.py; sin ella se usan las
+# tablas pequeñas de abajo.
+CREDENTIALS_FILE = os.environ.get("CREDENTIALS_FILE")
+# "standard" usa HttpUser (python-requests); "fast" usa FastHttpUser con
+# cuerpos ya serializados y consume bastante menos CPU por petición.
+LOCUST_MODE = os.environ.get("LOCUST_MODE", "standard")
+FAST_MODE = LOCUST_MODE == "fast"
+
+# Tablas compartidas por todos los usuarios simulados del proceso. Se
+# construyen una vez al importar el locustfile y no se modifican.
+VALID_CREDENTIALS = tuple(
+    {"email": f"usuario{i}@ejemplo.com", "password": f"Password{i}!23"}
+    for i in range(1, 11)
+)
+VALID_LOGIN_BODIES = tuple(json.dumps(credentials).encode("utf-8") for credentials in VALID_CREDENTIALS)
+INVALID_PASSWORD_BODY = json.dumps({"email": "usuario@ejemplo.com", "password": "ContraseñaIncorrecta"}).encode("utf-8")
+INVALID_EMAIL_BODY = json.dumps({"email": "emailinvalido", "password": "Password123!"}).encode("utf-8")
+STRESS_LOGIN_BODIES = tuple(
+    json.dumps({"email": f"stress_user_{i}@test.com", "password": "StressTest123!"}).encode("utf-8")
+    for i in range(1, 1001)
+)
+# Incluye Accept-Encoding para que FastHttpSession no tenga que agregarlo.
+JSON_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate"
+}
+
+SESSION_CHECK_NAME, DASHBOARD_NAME = SESSION_ENDPOINTS["hit"]
+SESSION_LOGIN_NAME = SESSION_ENDPOINTS["miss"][0]
+SESSION_SECONDS = float(os.environ.get("SESSION_SECONDS", "1800"))
+# Los usuarios con sesión cambian la mezcla de peticiones de cualquier perfil,
+# así que solo se lanzan si se piden.
+SESSION_USERS = os.environ.get("SESSION_USERS") == "1"
+# El token se renueva un poco antes de vencer para no enviarlo justo cuando
+# el servidor lo está descartando.
+SESSION_RENEW_FRACTION = 0.95
+
+arrival_scheduler = ArrivalScheduler(ARRIVAL_RATE) if ARRIVAL_RATE else None
+
+# Locust admite una sola forma de carga por locustfile: con ARRIVAL_RATE el
+# perfil solo aporta la duración.
+if ARRIVAL_RATE:
+    class ArrivalShape(ArrivalRateShape):
+        rate = ARRIVAL_RATE
+        duration = parse_duration(get_profile(LOAD_PROFILE)["duration"] if LOAD_PROFILE else os.environ.get("ARRIVAL_DURATION", "5m"))
+        scheduler = arrival_scheduler
+        max_users = ARRIVAL_MAX_USERS or None
+elif LOAD_PROFILE:
+    class ProfileShape(ProfileLoadShape):
+        profile = LOAD_PROFILE
+
+credential_feeder = CredentialFeeder(CredentialTable(CREDENTIALS_FILE)) if CREDENTIALS_FILE else None
+latency_histograms = {}
+# Mismas peticiones medidas desde la hora en que debieron enviarse (corrección
+# de omisión coordinada).
+corrected_histograms = {}
+session_counters = {"logins": 0, "hits": 0, "expired": 0, "rejected": 0, "login_failures": 0}
+request_log = RequestLogWriter(REQUEST_LOG) if REQUEST_LOG else None
+live_metrics = LiveMetrics() if LIVE_METRICS_PORT or LIVE_METRICS_FILE else None
+
+@events.init.add_listener
+def start_live_metrics(environment, runner=None, **kwargs):
+    if live_metrics is None:
+        return
+    # Los workers solo acumulan y envían sus bloques por segundo al master,
+    # que es quien publica el endpoint y el archivo JSON.
+    if isinstance(runner, WorkerRunner):
+        live_metrics.start(runner, keep_pending=True)
+    else:
+        live_metrics.start(runner, port=LIVE_METRICS_PORT, json_file=LIVE_METRICS_FILE)
+
+@events.test_start.add_listener
+def partition_credentials(environment, **kwargs):
+    if credential_feeder is None or isinstance(environment.runner, MasterRunner):
+        return
+    # El master asigna el índice al conectarse cada worker; con --expect-workers
+    # cada uno toma un tramo propio de la tabla y ninguna cuenta se repite
+    # entre workers.
+    if isinstance(environment.runner, WorkerRunner):
+        credential_feeder.partition(max(environment.runner.worker_index, 0), environment.parsed_options.expect_workers)
+    else:
+        credential_feeder.partition(0, 1)
+    print(f"Credenciales: cuentas {credential_feeder.start} a {credential_feeder.stop - 1} de {CREDENTIALS_FILE}")
+
+@events.test_start.add_listener
+def partition_arrivals(environment, **kwargs):
+    if arrival_scheduler is None or isinstance(environment.runner, MasterRunner):
+        return
+    if isinstance(environment.runner, WorkerRunner):
+        arrival_scheduler.partition(max(environment.runner.worker_index, 0), environment.parsed_options.expect_workers)
+    else:
+        arrival_scheduler.partition(0, 1)
+
+def user_context(user):
+    return {"user": user}
+
+def corrected_latency(user, response_time):
+    slot = getattr(user, "arrival_slot_ns", None)
+    if slot is None:
+        # Modelo cerrado: sin hora prevista, se completan las peticiones que
+        # el usuario no envió mientras esperaba la respuesta.
+        return response_time, getattr(user, "think_time_ms", 0.0)
+    # Con agenda, el retraso con que arrancó la iteración se suma a todas sus
+    # peticiones: ninguna habría salido tan tarde sin ese retraso. El evento
+    # llega al terminar la petición; Locust mide response_time con el mismo
+    # reloj que perf_counter_ns.
+    if user.send_delay_ns is None:
+        started = time.perf_counter_ns() - int(response_time * 1e6)
+        user.send_delay_ns = max(0, started - slot)
+    return response_time + user.send_delay_ns / 1e6, 0.0
+
+@events.request.add_listener
+def record_latency(request_type, name, response_time, exception=None, context=None, **kwargs):
+    histogram = latency_histograms.get(name)
+    if histogram is None:
+        histogram = latency_histograms[name] = LatencyHistogram()
+    histogram.record(response_time)
+    
+    user = context.get("user") if context else None
+    corrected = None
+    if user is not None:
+        corrected = corrected_latency(user, response_time)
+        corrected_histogram = corrected_histograms.get(name)
+        if corrected_histogram is None:
+            corrected_histogram = corrected_histograms[name] = LatencyHistogram()
+        corrected_histogram.record_corrected(*corrected)
+    
+    if live_metrics is not None:
+        live_metrics.observe(name, response_time, exception is not None)
+    
+    if request_log is not None:
+        request_log.write(time.time(), request_type, name, response_time, exception is None, corrected)
+
+@events.report_to_master.add_listener
+def send_latency_histograms(client_id, data, **kwargs):
+    data["latency_histograms"] = {name: histogram.to_dict() for name, histogram in latency_histograms.items()}
+    latency_histograms.clear()
+    data["corrected_histograms"] = {name: histogram.to_dict() for name, histogram in corrected_histograms.items()}
+    corrected_histograms.clear()
+    data["session_counters"] = dict(session_counters)
+    for key in session_counters:
+        session_counters[key] = 0
+    if arrival_scheduler is not None:
+        data["arrivals"] = arrival_scheduler.drain()
+    if live_metrics is not None:
+        data["live_metrics"] = live_metrics.drain()
+
+@events.worker_report.add_listener
+def merge_latency_histograms(client_id, data, **kwargs):
+    for name, histogram_data in data.get("latency_histograms", {}).items():
+        histogram = LatencyHistogram.from_dict(histogram_data)
+        if name in latency_histograms:
+            latency_histograms[name].merge(histogram)
+        else:
+            latency_histograms[name] = histogram
+    for name, histogram_data in data.get("corrected_histograms", {}).items():
+        histogram = LatencyHistogram.from_dict(histogram_data)
+        if name in corrected_histograms:
+            corrected_histograms[name].merge(histogram)
+        else:
+            corrected_histograms[name] = histogram
+    
+    for key, value in data.get("session_counters", {}).items():
+        session_counters[key] = session_counters.get(key, 0) + value
+    
+    if arrival_scheduler is not None and "arrivals" in data:
+        arrival_scheduler.merge(data["arrivals"])
+    
+    if live_metrics is not None:
+        live_metrics.merge_remote(data.get("live_metrics", []))
+
+@events.quitting.add_listener
+def save_latency_histograms(environment, **kwargs):
+    if request_log is not None:
+        request_log.close()
+    if live_metrics is not None:
+        live_metrics.stop()
+    if credential_feeder is not None and not isinstance(environment.runner, MasterRunner):
+        print(f"Credenciales entregadas: {credential_feeder.claimed} de {credential_feeder.stop - credential_feeder.start}")
+        if credential_feeder.wraps:
+            print("Advertencia: el tramo de cuentas se agotó y se reutilizaron credenciales")
+    
+    if isinstance(environment.runner, WorkerRunner) or not latency_histograms:
+        return
+    
+    os.makedirs(os.path.dirname(LATENCY_OUTPUT) or ".", exist_ok=True)
+    with open(LATENCY_OUTPUT, "w") as f:
+        json.dump({
+            "profile": LOAD_PROFILE,
+            "arrival_rate": ARRIVAL_RATE or None,
+            "session_users": SESSION_USERS,
+            "endpoints": {name: histogram.to_dict() for name, histogram in latency_histograms.items()},
+            "corrected_endpoints": {name: histogram.to_dict() for name, histogram in corrected_histograms.items()},
+            "sessions": session_counters,
+            "arrivals": dict(arrival_scheduler.counters, target_rps=ARRIVAL_RATE) if arrival_scheduler else None
+        }, f)
+    
+    if arrival_scheduler is not None:
+        counters = arrival_scheduler.counters
+        print(f"Llegadas a {ARRIVAL_RATE:g}/s: {counters['scheduled']} agendadas, {counters['late']} tardías "
+              f"(máx. {counters['max_lateness'] * 1000:.0f}ms), {counters['missed']} perdidas")
+    
+    if session_counters["logins"] or session_counters["hits"]:
+        hit_rate = session_counters["hits"] / (session_counters["hits"] + session_counters["logins"]) * 100
+        print(f"Sesiones: {session_counters['logins']} logins, {session_counters['hits']} reutilizadas "
+              f"({hit_rate:.1f}%), {session_counters['expired']} vencidas, {session_counters['rejected']} rechazadas")
+
+def credential_cycle(table):
+    # Cada usuario recorre la tabla compartida desde una posición al azar;
+    # next() sobre el ciclo no crea objetos nuevos en cada tarea.
+    bodies = cycle(table)
+    for _ in range(random.randrange(len(table))):
+        next(bodies)
+    return bodies
+
+def login_bodies(default_table):
+    if credential_feeder is not None:
+        return credential_feeder.bodies()
+    return credential_cycle(default_table)
+
+def print_login_stats(user):
+    print("Estadísticas del usuario:")
+    print(f"  - Intentos de login: {user.login_attempts}")
+    print(f"  - Logins exitosos: {user.successful_logins}")
+    print(f"  - Logins fallidos: {user.failed_logins}")
+    if user.login_attempts > 0:
+        success_rate = (user.successful_logins / user.login_attempts) * 100
+        print(f"  - Tasa de éxito: {success_rate:.2f}%")
+
+class LoginTasks(TaskSet):
+    """Logins válidos e inválidos y verificación de sesión, compartidos por los modos standard y fast."""
     
     def on_start(self):
-        self.client.verify = False
-        self.users = [
-            {"email": f"usuario{i}@ejemplo.com", "password": f"Password{i}!23"} 
-            for i in range(1, 11)
-        ]
+        self.credentials = login_bodies(VALID_LOGIN_BODIES)
         self.login_attempts = 0
         self.successful_logins = 0
         self.failed_logins = 0
     
     @task(3)
     def login_valid_user(self):
-        user = random.choice(self.users)
-        start_time = time.time()
-        
         with self.client.post(
             "/api/login",
-            json=user,
+            data=next(self.credentials),
+            headers=JSON_HEADERS,
             catch_response=True,
             name="Login - Credenciales Válidas"
         ) as response:
             self.login_attempts += 1
-            response_time = (time.time() - start_time) * 1000
             
             if response.status_code == 200:
                 self.successful_logins += 1
-                response.success()
-                
+                # Tiempo medido por Locust con perf_counter, sin un segundo reloj.
+                response_time = response.request_meta["response_time"]
                 if response_time > 2000:
                     response.failure(f"Tiempo de respuesta alto: {response_time:.0f}ms")
+                else:
+                    response.success()
             else:
                 self.failed_logins += 1
                 response.failure(f"Login falló: {response.status_code}")
@@ -44,26 +292,23 @@ class LoginPerformanceTest(HttpUser):
     def login_invalid_password(self):
         with self.client.post(
             "/api/login",
-            json={
-                "email": "usuario@ejemplo.com",
-                "password": "ContraseñaIncorrecta"
-            },
+            data=INVALID_PASSWORD_BODY,
+            headers=JSON_HEADERS,
             catch_response=True,
             name="Login - Contraseña Inválida"
         ) as response:
-            if response.status_code == 401:
+            # Tras 3 intentos fallidos la cuenta se bloquea (423), que también es correcto.
+            if response.status_code in (401, 423):
                 response.success()
             else:
-                response.failure(f"Código esperado 401, recibido: {response.status_code}")
+                response.failure(f"Código esperado 401 o 423, recibido: {response.status_code}")
     
     @task(1)
     def login_invalid_email(self):
         with self.client.post(
             "/api/login",
-            json={
-                "email": "emailinvalido",
-                "password": "Password123!"
-            },
+            data=INVALID_EMAIL_BODY,
+            headers=JSON_HEADERS,
             catch_response=True,
             name="Login - Email Inválido"
         ) as response:
@@ -79,39 +324,153 @@ class LoginPerformanceTest(HttpUser):
             catch_response=True,
             name="Verificar Sesión"
         ) as response:
-            if response.status_code in [200, 401]:
+            if response.status_code in (200, 401):
                 response.success()
             else:
                 response.failure(f"Error inesperado: {response.status_code}")
     
     def on_stop(self):
-        print(f"Estadísticas del usuario:")
-        print(f"  - Intentos de login: {self.login_attempts}")
-        print(f"  - Logins exitosos: {self.successful_logins}")
-        print(f"  - Logins fallidos: {self.failed_logins}")
-        if self.login_attempts > 0:
-            success_rate = (self.successful_logins / self.login_attempts) * 100
-            print(f"  - Tasa de éxito: {success_rate:.2f}%")
+        print_login_stats(self)
 
-class ApiStressTest(HttpUser):
-    wait_time = between(0.5, 1.5)
+class StressTasks(TaskSet):
+    """Logins con cuentas de estrés, compartidos por los modos standard y fast."""
+    
+    def on_start(self):
+        self.bodies = login_bodies(STRESS_LOGIN_BODIES)
     
     @task
     def stress_login_endpoint(self):
-        payload = {
-            "email": f"stress_user_{random.randint(1, 1000)}@test.com",
-            "password": "StressTest123!"
-        }
-        
         with self.client.post(
             "/api/login",
-            json=payload,
+            data=next(self.bodies),
+            headers=JSON_HEADERS,
             catch_response=True,
             name="Stress Test - Login"
         ) as response:
-            if response.elapsed.total_seconds() > 3:
+            if response.request_meta["response_time"] > 3000:
                 response.failure("Timeout: respuesta mayor a 3 segundos")
-            elif response.status_code in [200, 401, 400]:
+            elif response.status_code in (200, 401, 400):
                 response.success()
             else:
-                response.failure(f"Error del servidor: {response.status_code}")
\ No newline at end of file
+                response.failure(f"Error del servidor: {response.status_code}")
+
+# Cada modo solo cambia el cliente HTTP: las tareas son las mismas y el modo
+# que no se usa queda abstracto.
+class LoginPerformanceTest(HttpUser):
+    abstract = FAST_MODE
+    wait_time = between(1, 3)
+    tasks = [LoginTasks]
+    
+    def on_start(self):
+        self.client.verify = False
+
+class ApiStressTest(HttpUser):
+    abstract = FAST_MODE
+    wait_time = between(0.5, 1.5)
+    tasks = [StressTasks]
+
+class FastLoginPerformanceTest(FastHttpUser):
+    abstract = not FAST_MODE
+    wait_time = between(1, 3)
+    tasks = [LoginTasks]
+
+class FastApiStressTest(FastHttpUser):
+    abstract = not FAST_MODE
+    wait_time = between(0.5, 1.5)
+    tasks = [StressTasks]
+
+class AuthenticatedSession(TaskSet):
+    """Usuario que inicia sesión una vez y reutiliza su token hasta que vence o el servidor lo rechaza."""
+    
+    def on_start(self):
+        # Con la tabla de credenciales cada usuario conserva una cuenta propia.
+        if credential_feeder is not None:
+            self.login_body = credential_feeder.next_body()
+        else:
+            self.login_body = random.choice(VALID_LOGIN_BODIES)
+        self.auth_headers = None
+        self.expires_at = 0.0
+    
+    def ensure_session(self):
+        if self.auth_headers is not None:
+            if time.monotonic() < self.expires_at:
+                session_counters["hits"] += 1
+                return True
+            session_counters["expired"] += 1
+        return self.login()
+    
+    def login(self):
+        self.auth_headers = None
+        with self.client.post(
+            "/api/login",
+            data=self.login_body,
+            headers=JSON_HEADERS,
+            catch_response=True,
+            name=SESSION_LOGIN_NAME
+        ) as response:
+            if response.status_code != 200:
+                session_counters["login_failures"] += 1
+                response.failure(f"Login falló: {response.status_code}")
+                return False
+            try:
+                data = response.json()
+                token = data["token"]
+            except (ValueError, KeyError, TypeError):
+                session_counters["login_failures"] += 1
+                response.failure("Respuesta de login sin token")
+                return False
+            
+            session_counters["logins"] += 1
+            # Los encabezados se arman una vez por sesión y se reutilizan en
+            # cada petición autenticada.
+            self.auth_headers = {"Authorization": f"Bearer {token}", "Accept-Encoding": "gzip, deflate"}
+            self.expires_at = time.monotonic() + data.get("expires_in", SESSION_SECONDS) * SESSION_RENEW_FRACTION
+            return True
+    
+    def authenticated_get(self, path, name):
+        if not self.ensure_session():
+            return
+        with self.client.get(path, headers=self.auth_headers, catch_response=True, name=name) as response:
+            if response.status_code == 401:
+                # El servidor descartó la sesión antes de tiempo; un cliente
+                # real volvería a autenticarse, así que no cuenta como error.
+                session_counters["rejected"] += 1
+                self.auth_headers = None
+                response.success()
+            elif response.status_code == 200:
+                response.success()
+            else:
+                response.failure(f"Error inesperado: {response.status_code}")
+    
+    @task(5)
+    def check_session(self):
+        self.authenticated_get("/api/session", SESSION_CHECK_NAME)
+    
+    @task(1)
+    def open_dashboard(self):
+        self.authenticated_get("/dashboard", DASHBOARD_NAME)
+
+class SessionUser(HttpUser):
+    abstract = FAST_MODE or not SESSION_USERS
+    # El tráfico real es mayoritariamente de usuarios ya autenticados.
+    weight = 3
+    wait_time = between(1, 3)
+    tasks = [AuthenticatedSession]
+    
+    def on_start(self):
+        self.client.verify = False
+
+class FastSessionUser(FastHttpUser):
+    abstract = not FAST_MODE or not SESSION_USERS
+    weight = 3
+    wait_time = between(1, 3)
+    tasks = [AuthenticatedSession]
+
+USER_CLASSES = [LoginPerformanceTest, ApiStressTest, FastLoginPerformanceTest, FastApiStressTest, SessionUser, FastSessionUser]
+
+if arrival_scheduler is not None:
+    apply_arrival_rate(USER_CLASSES, arrival_scheduler)
+else:
+    track_think_time(USER_CLASSES)
+for user_class in USER_CLASSES:
+    user_class.context = user_context
@@ -17,10 +17,33 @@ PERFORMANCE_THRESHOLDS = {
         "max_error_rate": 5.0,
         "min_throughput": 100,
         "max_cpu_usage": 80,
-        "max_memory_usage": 75
+        "max_memory_usage": 75,
+        "max_load_generator_cpu": 90,
+        "max_late_arrival_pct": 1.0
     }
 }
 
+# Cada grupo usa el bloque homónimo de PERFORMANCE_THRESHOLDS; los nombres
+# de Locust se asignan por prefijo.
+ENDPOINT_GROUPS = {
+    "login": ["Login - ", "Stress Test - Login"],
+    "session": ["Verificar Sesión", "Dashboard - Caché"]
+}
+
+# Peticiones del modelo de sesión: las autenticadas con un token en caché
+# (hit) y el login que se hace cuando no hay token válido (miss).
+SESSION_ENDPOINTS = {
+    "hit": ["Verificar Sesión - Caché", "Dashboard - Caché"],
+    "miss": ["Login - Sesión Nueva"]
+}
+
+REGRESSION_SETTINGS = {
+    "alpha": 0.01,
+    "min_effect_size": 0.147,
+    "min_samples": 100,
+    "max_throughput_drop_pct": 10.0
+}
+
 LOAD_TEST_SCENARIOS = {
     "smoke": {
         "users": 5,
@@ -0,0 +1,61 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+from alert_state import AlertStateStore
+
+COOLDOWN = 30 * 60
+
+
+def make_alert(level):
+    return {"nombre": "Latencia Alta", "nivel": level, "mensaje": "P95 alto", "canales": ["slack"]}
+
+
+def states(notifications):
+    return [notification["estado"] for notification in notifications]
+
+
+def test_refire_within_cooldown_notifies_once_cooldown_passes(tmp_path):
+    store = AlertStateStore({"archivo": str(tmp_path / "alert_state.db"), "cooldown_minutos": 30})
+    alert = make_alert("critical")
+
+    assert states(store.process([alert], now=0)) == ["disparada"]
+    assert states(store.process([], now=60)) == ["resuelta"]
+    # Vuelve a dispararse dentro del cooldown: se suprime.
+    assert states(store.process([alert], now=120)) == []
+    assert states(store.process([alert], now=60 + COOLDOWN - 1)) == []
+    # Sigue activa pasado el cooldown: se avisa una sola vez.
+    assert states(store.process([alert], now=60 + COOLDOWN)) == ["disparada"]
+    assert states(store.process([alert], now=60 + COOLDOWN + 60)) == []
+    assert states(store.process([], now=60 + COOLDOWN + 120)) == ["resuelta"]
+    store.close()
+
+
+def test_resolve_after_suppressed_refire_is_silent(tmp_path):
+    store = AlertStateStore({"archivo": str(tmp_path / "alert_state.db"), "cooldown_minutos": 30})
+    alert = make_alert("critical")
+
+    store.process([alert], now=0)
+    store.process([], now=60)
+    store.process([alert], now=120)
+    # Nunca se avisó que volvió a dispararse, así que no hay otra resolución.
+    assert states(store.process([], now=180)) == []
+    store.close()
+
+
+def test_reopened_warning_escalates_from_the_new_fire(tmp_path):
+    store = AlertStateStore({
+        "archivo": str(tmp_path / "alert_state.db"),
+        "cooldown_minutos": 30,
+        "escalar_warning_minutos": 60
+    })
+    alert = make_alert("warning")
+
+    store.process([alert], now=0)
+    store.process([], now=3500)
+    reopened = 3600
+    store.process([alert], now=reopened)
+    assert states(store.process([alert], now=reopened + 100)) == []
+    assert states(store.process([alert], now=3500 + COOLDOWN)) == ["disparada"]
+    assert states(store.process([alert], now=reopened + 3600)) == ["escalada"]
+    store.close()
@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+from analyze_performance import PerformanceAnalyzer
+from locust_csv_stream import RequestLogWriter
+
+
+def test_latency_gates_use_only_the_steady_window(tmp_path):
+    request_log = str(tmp_path / "performance_requests.csv")
+    writer = RequestLogWriter(request_log)
+    # Calentamiento lento, tramo estable rápido y bajada lenta.
+    for second, response_time in [(100, 900.0), (101, 80.0), (102, 90.0), (103, 950.0)]:
+        for _ in range(10):
+            writer.write(second + 0.5, "POST", "/api/auth/login", response_time, True, (response_time, 0.0))
+    writer.close()
+
+    analyzer = PerformanceAnalyzer()
+    metrics = analyzer._empty_metrics()
+    analyzer.analyze_request_latency(request_log, metrics, window=(101, 102))
+
+    assert metrics["histogram"].total_count == 20
+    assert metrics["histogram"].max < 100
+    assert metrics["corrected_histogram"].total_count == 20
+    assert metrics["endpoints"]["/api/auth/login"]["histogram"].total_count == 20
+
+
+def test_endpoint_counts_come_from_the_steady_window(tmp_path):
+    request_log = str(tmp_path / "performance_requests.csv")
+    writer = RequestLogWriter(request_log)
+    # Fallas solo en el calentamiento, y un endpoint que solo aparece ahí.
+    for _ in range(10):
+        writer.write(100.5, "POST", "/api/auth/login", 500.0, False)
+        writer.write(100.5, "GET", "/warmup", 20.0, True)
+    for _ in range(10):
+        writer.write(101.5, "POST", "/api/auth/login", 80.0, True)
+    writer.write(101.5, "POST", "/api/auth/login", 85.0, False)
+    writer.close()
+
+    analyzer = PerformanceAnalyzer()
+    metrics = analyzer._empty_metrics()
+    analyzer._endpoint(metrics, "/api/auth/login")["requests"] = 21
+    analyzer._endpoint(metrics, "/warmup")["requests"] = 10
+    analyzer.analyze_request_latency(request_log, metrics, window=(101, 101))
+
+    login = metrics["endpoints"]["/api/auth/login"]
+    assert (login["requests"], login["failures"]) == (11, 1)
+    assert "/warmup" not in metrics["endpoints"]
@@ -0,0 +1,75 @@
+import csv
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+from alert_state import AlertStateStore
+from monitor_daemon import HistoryTail, MonitorDaemon, merge_snapshot
+from rule_engine import RuleEngine
+
+RULES = [{"nombre": "BDD Degradado", "condicion": "bdd_success_rate < 90", "nivel": "warning", "canales": ["slack"]}]
+HISTORY_COLUMNS = ["Name", "Requests/s", "Failures/s", "50%", "95%", "99%", "99.9%", "Total Request Count", "Total Failure Count"]
+
+
+class RecordingManager:
+    def __init__(self, state_file):
+        self.rule_engine = RuleEngine(RULES)
+        self.state_store = AlertStateStore({"archivo": state_file})
+        self.notifications = []
+
+    def handle_metrics(self, metrics_data):
+        alerts = [
+            {"nombre": rule.nombre, "nivel": rule.nivel, "mensaje": rule.mensaje, "canales": rule.canales}
+            for rule, _ in self.rule_engine.evaluate(metrics_data)
+        ]
+        self.notifications.extend(self.state_store.process(alerts))
+
+
+def write_history(path, rows):
+    with open(path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if f.tell() == 0:
+            writer.writerow(HISTORY_COLUMNS)
+        for requests_per_second, p95 in rows:
+            writer.writerow(["Aggregated", requests_per_second, 0, p95 / 2, p95, p95 * 2, p95 * 3, 100, 0])
+
+
+def test_alert_from_metrics_file_stays_firing_after_history_pass(tmp_path):
+    metrics_file = tmp_path / "performance_metrics.json"
+    history_file = tmp_path / "performance_stats_history.csv"
+    metrics_file.write_text(json.dumps({
+        "summary": {"throughput_rps": 50.0, "error_rate": 0.0},
+        "response_times": {"p95": 300.0},
+        "bdd_metrics": {"success_rate": 80.0}
+    }))
+    write_history(history_file, [(40.0, 250.0)])
+
+    manager = RecordingManager(str(tmp_path / "alert_state.db"))
+    daemon = MonitorDaemon(None, None, metrics_file=str(metrics_file), history_file=str(history_file))
+    daemon.manager = manager
+
+    daemon.check()
+    # Solo el historial trae filas nuevas; el reporte no cambió.
+    write_history(history_file, [(45.0, 260.0)])
+    daemon.check()
+
+    assert [notification["estado"] for notification in manager.notifications] == ["disparada"]
+    assert [row["rule"] for row in manager.state_store.active_alerts()] == ["BDD Degradado"]
+
+
+def test_history_replaces_every_percentile_of_the_report(tmp_path):
+    metrics = {
+        "response_times": {"p50": 100.0, "p95": 300.0, "p99": 5000.0, "p999": 9000.0},
+        "response_times_corrected": {"p95": 400.0, "p99": 6000.0},
+        "bdd_metrics": {"success_rate": 99.0}
+    }
+    history_file = tmp_path / "performance_stats_history.csv"
+    write_history(history_file, [(40.0, 250.0)])
+
+    snapshot = HistoryTail(str(history_file)).read_latest_snapshot()
+    merged = merge_snapshot(metrics, snapshot)
+
+    assert merged["response_times"] == {"p50": 125.0, "p95": 250.0, "p99": 500.0, "p999": 750.0}
+    assert "response_times_corrected" not in merged
+    assert merged["bdd_metrics"] == {"success_rate": 99.0}
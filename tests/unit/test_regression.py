@@ -0,0 +1,52 @@
+import math
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "scripts"))
+from latency_histogram import LatencyHistogram
+from regression import compare_endpoint, compare_runs, mann_whitney_u
+
+SETTINGS = {"min_samples": 3, "alpha": 0.05, "min_effect_size": 0.5, "max_throughput_drop_pct": 10}
+
+
+def histogram(values):
+    result = LatencyHistogram()
+    for value in values:
+        result.record(value)
+    return result
+
+
+def test_mann_whitney_u_without_ties():
+    test = mann_whitney_u(histogram([1, 2, 3]), histogram([4, 5, 6]))
+    # Rangos del run actual: 4 + 5 + 6 = 15, U = 15 - 3 * 4 / 2 = 9.
+    assert test["u"] == 9
+    assert math.isclose(test["z"], 4 / math.sqrt(5.25))
+    assert math.isclose(test["p_value"], 0.0404, abs_tol=1e-4)
+    assert test["effect_size"] == 1.0
+
+
+def test_mann_whitney_u_with_ties():
+    test = mann_whitney_u(histogram([10, 10, 20]), histogram([20, 30, 30]))
+    # Rangos promedio 1.5, 3.5 y 5.5; tres grupos de dos empates.
+    assert test["u"] == 8.5
+    assert math.isclose(test["z"], 3.5 / math.sqrt(9 / 12 * (7 - 18 / 30)))
+    assert math.isclose(test["effect_size"], 2 * 8.5 / 9 - 1)
+
+
+def test_compare_endpoint_statuses():
+    slower = compare_endpoint(histogram([1, 2, 3]), histogram([4, 5, 6]), SETTINGS)
+    assert slower["status"] == "FAIL"
+    same = compare_endpoint(histogram([1, 2, 3]), histogram([1, 2, 3]), SETTINGS)
+    assert same["status"] == "PASS"
+    assert same["effect_size"] == 0.0
+    few = compare_endpoint(histogram([1, 2]), histogram([4, 5, 6]), SETTINGS)
+    assert few["status"] == "SKIP"
+
+
+def test_compare_runs_skips_everything_with_another_profile():
+    baseline = {"profile": "stress", "throughput": 100.0, "histograms": {"Login": histogram([1, 2, 3])}}
+    current = {"profile": "smoke", "throughput": 10.0, "histograms": {"Login": histogram([40, 50, 60])}}
+    result = compare_runs(baseline, current, SETTINGS)
+    assert result["status"] == "SKIP"
+    assert result["endpoints"] == {}
+    assert result["throughput"]["status"] == "SKIP"